@@ -0,0 +1,101 @@
+import hashlib
+import json
+import os
+import sqlite3
+import time
+
+from contextlib import closing
+from typing import Dict
+
+from src.analysis.html_analysis import HTMLElementReference
+
+"""
+Candidate Cache module
+
+Persists the constraint candidates of form fields on disk, so extractions against unchanged JavaScript neither record
+traces nor wait for the service to analyse them again.
+"""
+
+
+def get_candidate_key(
+    reference: HTMLElementReference,
+    input_type: str | None,
+    script_hashes: Dict[str, str],
+    value_specification_hash: str,
+) -> str:
+    """Returns the key of the constraint candidates of a field
+
+    Parameters:
+    reference (HTMLElementReference): The reference of the field
+    input_type (str | None): The type of the field
+    script_hashes (Dict[str, str]): The content hashes of the original scripts of the page by their url
+    value_specification_hash (str): The hash of the specification the magic values of the field were generated for
+
+    Returns:
+    str: The key
+    """
+    content = {
+        "reference": reference.get_as_dict(),
+        "type": input_type,
+        "scripts": sorted(script_hashes.values()),
+        "values": value_specification_hash,
+    }
+    return hashlib.sha256(json.dumps(content, sort_keys=True).encode()).hexdigest()
+
+
+class CandidateCache:
+    """CandidateCache class
+
+    SQLite-backed store of the constraint candidate responses of the analysis service keyed by get_candidate_key.
+    """
+
+    def __init__(self, database_path: str = "corpus/candidates.db") -> None:
+        """Initializes the cache and creates the database if it does not exist yet
+
+        Parameters:
+        database_path (str): Path to the SQLite database file (default "corpus/candidates.db")
+        """
+        self.__database_path = database_path
+        directory = os.path.dirname(database_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with closing(self.__connect()) as connection, connection:
+            connection.execute("""CREATE TABLE IF NOT EXISTS constraint_candidates (
+                    candidate_key TEXT PRIMARY KEY,
+                    candidates TEXT NOT NULL,
+                    created REAL NOT NULL
+                )""")
+
+    def get(self, key: str) -> Dict | None:
+        """Returns the stored candidate response for a key
+
+        Parameters:
+        key (str): The key of the field
+
+        Returns:
+        Dict | None: The response of the analysis service or None if there is none for the key
+        """
+        with closing(self.__connect()) as connection:
+            row = connection.execute(
+                "SELECT candidates FROM constraint_candidates WHERE candidate_key = ?",
+                (key,),
+            ).fetchone()
+
+        return json.loads(row[0]) if row is not None else None
+
+    def put(self, key: str, candidates: Dict) -> None:
+        """Stores the candidate response for a key, replacing an earlier one
+
+        Parameters:
+        key (str): The key of the field
+        candidates (Dict): The response of the analysis service
+        """
+        with closing(self.__connect()) as connection, connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO constraint_candidates VALUES (?, ?, ?)",
+                (key, json.dumps(candidates), time.time()),
+            )
+
+    def __connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.__database_path, timeout=30)
@@ -1,25 +1,36 @@
-import os
 import re
 
+from abc import ABC, abstractmethod
 from enum import Enum
 from lxml.html import Element
 from selenium.webdriver import Chrome
 from seleniumwire.request import Request
 from typing import List, Literal, Dict, Tuple
 
+from src.analysis.candidate_cache import CandidateCache, get_candidate_key
 from src.analysis.html_analysis import (
     HTMLConstraints,
     HTMLElementReference,
     HTMLInputSpecification,
     HTMLRadioGroupSpecification,
 )
-from src.generation.input_generation import InputGenerator, ValidityEnum
+from src.analysis.specification_model import FormSpecification
+from src.generation.input_generation import (
+    GenerationRequest,
+    InputGenerator,
+    ValidityEnum,
+)
 from src.proxy.interception import (
     NetworkInterceptor,
     decode_bytes,
     submission_interception_header,
 )
+from src.utility.grammar import Grammar, optimize_specification, rename_in_formula
 from src.utility.pattern_translation import PatternConverter
+from src.utility.specification_registry import (
+    SpecificationRegistry,
+    get_specification_registry,
+)
 from src.utility.helpers import *
 
 """
@@ -176,10 +187,14 @@ class ConstraintCandidateFinder:
         stop_on_first_success: bool,
         exit_method,
         evaluation=None,
+        workers: int | str = 1,
+        corpus_path: str | None = None,
+        candidate_cache_path: str | None = None,
+        script_hashes: Dict[str, str] | None = None,
     ) -> None:
         self.__driver = web_driver
         self.__exit_method = exit_method
-        self.__generator = InputGenerator()
+        self.__generator = InputGenerator(workers=workers, corpus_path=corpus_path)
         self.__interceptor = interceptor
         self.__magic_value_map: Dict[
             HTMLInputSpecification | HTMLRadioGroupSpecification, List[str]
@@ -187,6 +202,17 @@ class ConstraintCandidateFinder:
         self.__stop_on_first_success = stop_on_first_success
         self.__submit_element = submit_element
         self.__evaluation = evaluation
+        # The scripts of the initial page load, later responses must not change the keys of the cache
+        self.__script_hashes = dict(script_hashes) if script_hashes is not None else None
+        self.__candidate_cache = (
+            CandidateCache(candidate_cache_path)
+            if candidate_cache_path is not None and script_hashes is not None
+            else None
+        )
+        # The specification the magic values of every field were generated for
+        self.__value_specification_hashes: Dict[
+            HTMLInputSpecification | HTMLRadioGroupSpecification, str
+        ] = {}
 
     def set_valid_value_sequence(
         self,
@@ -204,6 +230,39 @@ class ConstraintCandidateFinder:
                 html_specification, grammar, formula, amount
             )
 
+    def set_valid_value_sequences(
+        self,
+        specifications: List[
+            Tuple[
+                HTMLInputSpecification | HTMLRadioGroupSpecification, str, str | None
+            ]
+        ],
+        amount=1,
+    ) -> List[List[str]]:
+        """Generates the magic value sequences for several independent fields at once.
+
+        The fields are solved concurrently if the generator has more than one worker.
+        """
+        results = self.__generator.generate_inputs_in_parallel(
+            [
+                GenerationRequest(grammar, formula, ValidityEnum.VALID, amount)
+                for _, grammar, formula in specifications
+            ]
+        )
+
+        sequences = []
+        for (html_specification, grammar, formula), generated_values in zip(
+            specifications, results
+        ):
+            values = list(map(lambda v: v.value, generated_values))
+            self.__magic_value_map[html_specification] = values
+            self.__value_specification_hashes[html_specification] = (
+                get_specification_hash(grammar, formula)
+            )
+            sequences.append(values)
+
+        return sequences
+
     def fill_with_valid_values(
         self, current: HTMLInputSpecification | HTMLRadioGroupSpecification
     ):
@@ -231,6 +290,21 @@ class ConstraintCandidateFinder:
             else InputType.RADIO.value
         )
         values = self.__magic_value_map.get(spec)
+
+        # The candidates only depend on the field, its magic values and the scripts of the page
+        cache_key = None
+        if self.__candidate_cache is not None:
+            cache_key = get_candidate_key(
+                spec.reference,
+                type,
+                self.__script_hashes,
+                self.__value_specification_hashes.get(spec, ""),
+            )
+            cached_candidates = self.__candidate_cache.get(cache_key)
+            if cached_candidates is not None:
+                print("Reusing cached candidates for", spec.reference.get_as_dict())
+                return ConstraintCandidateResult(cached_candidates)
+
         print(
             "Now getting candidates for",
             spec.reference.get_as_dict(),
@@ -269,7 +343,11 @@ class ConstraintCandidateFinder:
 
         constraint_candidate_response = get_constraint_candidates()
         response_str = decode_bytes(constraint_candidate_response.content)
-        return ConstraintCandidateResult(json.loads(response_str))
+        candidates = json.loads(response_str)
+        if cache_key is not None and constraint_candidate_response.ok:
+            self.__candidate_cache.put(cache_key, candidates)
+
+        return ConstraintCandidateResult(candidates)
 
     def __set_magic_value_sequence_for_input(
         self,
@@ -283,6 +361,9 @@ class ConstraintCandidateFinder:
         )
         values = list(map(lambda v: v.value, generated_values))
         self.__magic_value_map[html_specification] = values
+        self.__value_specification_hashes[html_specification] = get_specification_hash(
+            grammar, formula
+        )
         return values
 
     def __set_magic_value_sequence_for_radio_group(
@@ -297,6 +378,9 @@ class ConstraintCandidateFinder:
         )
         values = list(map(lambda v: v.value, generated_values))
         self.__magic_value_map[html_specification] = values
+        self.__value_specification_hashes[html_specification] = get_specification_hash(
+            grammar, formula
+        )
         return values
 
     def __attempt_submit(self) -> None:
@@ -333,8 +417,261 @@ class ISLa(Enum):
     DIV = "div"
 
 
+FORMULA_TERM = (
+    r'str\.len\(<[^<>\s]+>\)|str\.to\.int\(<[^<>\s]+>\)|<[^<>\s]+>|-?\d+|"[^"]*"'
+)
+COMPARISON_PATTERN = re.compile(
+    rf"^\s*({FORMULA_TERM})\s*(>=|<=|=|>|<)\s*({FORMULA_TERM})\s*$"
+)
+INTEGER_PATTERN = re.compile(r"^-?\d+$")
+# Terms whose values are integers, so their bounds can be compared and merged
+BOUNDED_TERM_PATTERN = re.compile(r"^str\.(len|to\.int)\(<[^<>\s]+>\)$")
+FLIPPED_OPERATORS = {">=": "<=", "<=": ">=", ">": "<", "<": ">", "=": "="}
+
+
+class Formula(ABC):
+    """Formula class
+
+    Node of the formula AST that SpecificationBuilder builds formulas with.
+    Clauses are added with combine_formulas, which keeps the formula free of duplicate and subsumed clauses,
+    and the formula is only turned into ISLa syntax with str when it is handed out.
+    """
+
+    @abstractmethod
+    def key(self) -> Tuple:
+        """Returns a normalised representation of the formula that equal formulas share"""
+        pass
+
+    @abstractmethod
+    def __str__(self) -> str:
+        pass
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, Formula) and self.key() == other.key()
+
+    def __hash__(self) -> int:
+        return hash(self.key())
+
+
+class FormulaAtom(Formula):
+    """FormulaAtom class
+
+    A clause that is not analysed any further, e.g. the formula of a pre-built specification
+    """
+
+    def __init__(self, text: str) -> None:
+        self.text = text
+
+    def key(self) -> Tuple:
+        return ("atom", " ".join(self.text.split()))
+
+    def __str__(self) -> str:
+        return self.text
+
+
+class FormulaConstant(Formula):
+    def __init__(self, value: bool) -> None:
+        self.value = value
+
+    def key(self) -> Tuple:
+        return ("constant", self.value)
+
+    def __str__(self) -> str:
+        return "true" if self.value else "false"
+
+
+class FormulaComparison(Formula):
+    """FormulaComparison class
+
+    A comparison of two terms, normalised so that a constant is always on the right
+    """
+
+    def __init__(self, left: str, operator: str, right: str) -> None:
+        if INTEGER_PATTERN.match(left) and not INTEGER_PATTERN.match(right):
+            left, operator, right = right, FLIPPED_OPERATORS[operator], left
+
+        self.left = left
+        self.operator = operator
+        self.right = right
+
+    @property
+    def bound(self) -> Tuple[str, int] | None:
+        """The direction and the inclusive integer value of a lower or upper bound, None for other comparisons"""
+        if not BOUNDED_TERM_PATTERN.match(self.left) or not INTEGER_PATTERN.match(
+            self.right
+        ):
+            return None
+
+        value = int(self.right)
+        match self.operator:
+            case ISLa.GTE.value:
+                return "lower", value
+            case ISLa.GT.value:
+                return "lower", value + 1
+            case ISLa.LTE.value:
+                return "upper", value
+            case ISLa.LT.value:
+                return "upper", value - 1
+            case _:
+                return None
+
+    def key(self) -> Tuple:
+        return ("comparison", self.left, self.operator, self.right)
+
+    def __str__(self) -> str:
+        return f"{self.left} {self.operator} {self.right}"
+
+
+class FormulaConnective(Formula):
+    """FormulaConnective class
+
+    A conjunction or disjunction, serialised as left-nested binary connectives like "((a) and (b)) and (c)"
+    """
+
+    def __init__(self, operator: ISLa, children: List[Formula]) -> None:
+        self.operator = operator
+        self.children = children
+
+    def key(self) -> Tuple:
+        return ("connective", self.operator.value, tuple(self.children))
+
+    def __str__(self) -> str:
+        result = str(self.children[0])
+        for child in self.children[1:]:
+            result = f"({result}) {self.operator.value} ({child})"
+        return result
+
+
+def parse_formula(text: str | None) -> Formula | None:
+    """Turns a clause in ISLa syntax into a formula node
+
+    Comparisons of simple terms become FormulaComparison nodes, comparisons of two integer constants are folded
+    and everything else is kept as FormulaAtom.
+
+    Parameters:
+    text (str | None): The clause
+
+    Returns:
+    Formula | None: The node or None if there is no clause
+    """
+    if text is None or len(text.strip()) == 0:
+        return None
+
+    match = COMPARISON_PATTERN.match(text)
+    if match is None:
+        return FormulaAtom(text)
+
+    left, operator, right = match.groups()
+    if INTEGER_PATTERN.match(left) and INTEGER_PATTERN.match(right):
+        return FormulaConstant(_compare(int(left), operator, int(right)))
+
+    return FormulaComparison(left, operator, right)
+
+
+def combine_formulas(formula: Formula | None, part: Formula, operator: ISLa) -> Formula:
+    """Adds a clause to a formula with a connective
+
+    Chains of the same connective are flattened, so a clause that is already part of the chain is not added again.
+    Of two bounds of the same term in a conjunction the tighter one is kept, in a disjunction the looser one.
+    Constants are folded.
+
+    Parameters:
+    formula (Formula | None): The formula, None for an empty one
+    part (Formula): The clause to add
+    operator (ISLa): AND or OR
+
+    Returns:
+    Formula: The combined formula
+    """
+    if formula is None:
+        return part
+
+    children = (
+        list(formula.children)
+        if isinstance(formula, FormulaConnective) and formula.operator == operator
+        else [formula]
+    )
+    parts = (
+        part.children
+        if isinstance(part, FormulaConnective) and part.operator == operator
+        else [part]
+    )
+    for clause in parts:
+        children = _add_clause(children, clause, operator)
+
+    return children[0] if len(children) == 1 else FormulaConnective(operator, children)
+
+
+def _add_clause(
+    children: List[Formula], clause: Formula, operator: ISLa
+) -> List[Formula]:
+    # The neutral element of the connective changes nothing, the absorbing one replaces everything
+    absorbing = FormulaConstant(operator == ISLa.OR)
+    if clause == FormulaConstant(operator == ISLa.AND) or absorbing in children:
+        return children
+    if clause == absorbing:
+        return [absorbing]
+    if clause in children:
+        return children
+
+    bound = clause.bound if isinstance(clause, FormulaComparison) else None
+    if bound is not None:
+        direction, value = bound
+        for index, child in enumerate(children):
+            if (
+                not isinstance(child, FormulaComparison)
+                or child.left != clause.left
+                or child.bound is None
+                or child.bound[0] != direction
+            ):
+                continue
+
+            # A conjunction keeps the tighter bound, a disjunction the looser one
+            tighter = (
+                value > child.bound[1]
+                if direction == "lower"
+                else value < child.bound[1]
+            )
+            if tighter == (operator == ISLa.AND):
+                children = list(children)
+                children[index] = clause
+            return children
+
+    return children + [clause]
+
+
+def _compare(left: int, operator: str, right: int) -> bool:
+    match operator:
+        case ISLa.GTE.value:
+            return left >= right
+        case ISLa.LTE.value:
+            return left <= right
+        case ISLa.GT.value:
+            return left > right
+        case ISLa.LT.value:
+            return left < right
+        case _:
+            return left == right
+
+
 class SpecificationBuilder:
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        registry: SpecificationRegistry | None = None,
+        specification: FormSpecification | None = None,
+    ) -> None:
+        """Initializes the builder
+
+        Parameters:
+        registry (SpecificationRegistry | None): The pre-built specifications (default None; the registry loaded at startup)
+        specification (FormSpecification | None): The in-memory specification of the form (default None; an empty one)
+        """
+        self.__registry = get_specification_registry() if registry is None else registry
+        self.__specification = (
+            FormSpecification() if specification is None else specification
+        )
+        # The formulas of all inputs as AST, they are only serialised when they are handed out
+        self.__formulas: Dict[HTMLElementReference, Formula | None] = {}
         self.reference_to_spec_map: Dict[
             HTMLElementReference, Tuple[str, str | None, int]
         ] = {}
@@ -344,9 +681,7 @@ class SpecificationBuilder:
         html_radio_group_specification: HTMLRadioGroupSpecification,
         file_index: int,
     ) -> Tuple[str, str | None]:
-        grammar = load_file_content(
-            f"{pre_built_specifications_path}/radio-group/radio-group.bnf"
-        )
+        grammar = self.__registry.get_grammar("radio-group/radio-group")
         grammar = self.__replace_by_list_options(
             grammar,
             get_grammar_identifier_for_type_string(InputType.RADIO.value),
@@ -416,6 +751,8 @@ class SpecificationBuilder:
                     f"The provided type '{html_input_specification.constraints.type}' does not match any known html input type"
                 )
 
+        self.__formulas[html_input_specification.reference] = formula
+        formula = self.__formula_to_string(formula)
         self.reference_to_spec_map[html_input_specification.reference] = (
             grammar,
             formula,
@@ -423,16 +760,49 @@ class SpecificationBuilder:
         )
         return grammar, formula
 
+    def reuse_specification(
+        self,
+        reference: HTMLElementReference,
+        grammar: str,
+        formula: str | None,
+        file_index: int,
+    ) -> None:
+        """Registers the grammar and formula of a field from an earlier extraction
+
+        Parameters:
+        reference (HTMLElementReference): The reference of the field
+        grammar (str): The grammar of the field
+        formula (str | None): The formula of the field
+        file_index (int): The index of the grammar and formula files of the field
+        """
+        self.__formulas[reference] = parse_formula(formula)
+        self.reference_to_spec_map[reference] = grammar, formula, file_index
+
+    @property
+    def specification(self) -> FormSpecification:
+        return self.__specification
+
     def write_specification_to_file(
         self, name: str, grammar: str, formula: str = None
     ) -> Tuple[str, str]:
-        os.makedirs("specification", exist_ok=True)
         grammar_file_name = f"{name}.bnf"
         formula_file_name = f"{name}.isla"
 
-        write_to_file(f"specification/{grammar_file_name}", grammar)
-        write_to_file(
-            f"specification/{formula_file_name}", formula if formula is not None else ""
+        optimized_grammar, metrics = optimize_specification(grammar, formula)
+        if optimized_grammar != grammar:
+            grammar = optimized_grammar
+            print(
+                f"optimised grammar {grammar_file_name}:",
+                ", ".join(
+                    f"{key} {before} -> {after}"
+                    for key, (before, after) in metrics.items()
+                ),
+            )
+
+        # The files are only written when the specification is flushed
+        self.__specification.set_file(grammar_file_name, grammar)
+        self.__specification.set_file(
+            formula_file_name, formula if formula is not None else ""
         )
 
         return grammar_file_name, formula_file_name
@@ -451,6 +821,11 @@ class SpecificationBuilder:
             index = 50
         else:
             grammar, formula, index = existing_spec
+            formula = (
+                self.__formulas[reference]
+                if reference in self.__formulas
+                else parse_formula(formula)
+            )
 
         for candidate in new_constraints.candidates:
             constraint_type = candidate.type
@@ -480,6 +855,8 @@ class SpecificationBuilder:
                 case _:
                     raise TypeError(f"type {constraint_type} not recognized")
 
+        self.__formulas[reference] = formula
+        formula = self.__formula_to_string(formula)
         self.reference_to_spec_map[reference] = grammar, formula, index
         self.write_specification_to_file(str(index), grammar, formula)
 
@@ -489,9 +866,9 @@ class SpecificationBuilder:
         self,
         input_type: str,
         grammar: str,
-        formula: str,
+        formula: Formula | None,
         candidate: LiteralCompCandidate,
-    ) -> Tuple[str, str | None]:
+    ) -> Tuple[str, Formula | None]:
         grammar_identifier = get_grammar_identifier_for_type_string(input_type)
         new_part = self.__get_formula_for_operator(
             f"<{grammar_identifier}>", f'"{candidate.other_value}"', candidate.operator
@@ -503,9 +880,9 @@ class SpecificationBuilder:
         self,
         input_type: str,
         grammar: str,
-        formula: str,
+        formula: Formula | None,
         candidate: LiteralCompCandidate,
-    ) -> Tuple[str, str | None]:
+    ) -> Tuple[str, Formula | None]:
         grammar_identifier = get_grammar_identifier_for_type_string(input_type)
         new_part = self.__get_formula_for_operator(
             f"str.len(<{grammar_identifier}>)",
@@ -522,69 +899,39 @@ class SpecificationBuilder:
     def __handle_var_comparison_candidate(
         self,
         grammar: str,
-        formula: str,
+        formula: Formula | None,
         candidate: VarCompCandidate,
         other_reference: HTMLElementReference,
         index: int,
-    ) -> Tuple[str, str | None]:
+    ) -> Tuple[str, Formula | None]:
         if candidate.other_value_type == ConstraintOtherValueType.REFERENCE.value:
             other_spec = self.reference_to_spec_map.get(candidate.other_value)
             if other_spec is not None:
                 other_grammar, other_formula, _ = other_spec
-                other_grammar_dict = self.__grammar_string_to_dict(other_grammar)
-                grammar_dict = self.__grammar_string_to_dict(grammar)
-                new_grammar_dict, formula = self.__combine_grammars_and_formulas(
-                    grammar_dict,
-                    other_grammar_dict,
-                    formula,
+                new_grammar, new_formula = self.__combine_grammars_and_formulas(
+                    Grammar.from_bnf(grammar),
+                    Grammar.from_bnf(other_grammar),
+                    self.__formula_to_string(formula),
                     other_formula,
                     candidate.operator,
                 )
-                grammar = self.__grammar_dict_to_string(new_grammar_dict)
-
-            # Combine fields in existing specification file
-            overall_spec = load_json_from_file("specification/specification.json")
-            first_input = None
-            second_input = None
-            new_controls = []
-            combined_controls = {
-                "combined": True,
-                "fields": [],
-                "grammar": f"{index}.bnf",
-                "formula": f"{index}.isla",
-            }
-
-            for c in overall_spec["controls"]:
-                if c["reference"] == other_reference.get_as_dict():
-                    second_input = c
-                elif c["reference"] == candidate.other_value.get_as_dict():
-                    first_input = c
-                else:
-                    new_controls.append(c)
-
-            if first_input is not None and second_input is not None:
-                first_input = self.__omit_keys(first_input, ["grammar", "formula"])
-                second_input = self.__omit_keys(second_input, ["grammar", "formula"])
-                combined_controls["fields"] = [first_input, second_input]
-                overall_spec["controls"] = new_controls + [combined_controls]
-                write_to_file("specification/specification.json", overall_spec)
+                grammar = new_grammar.to_bnf()
+                formula = parse_formula(new_formula)
 
-        return grammar, formula
+            # Combine fields in the specification of the form
+            self.__specification.combine_controls(
+                candidate.other_value, other_reference, index
+            )
 
-    def __omit_keys(self, original_dict: Dict, keys_to_omit: Dict | List):
-        return {
-            key: value
-            for key, value in original_dict.items()
-            if key not in keys_to_omit
-        }
+        return grammar, formula
 
     def __handle_pattern_candidate(
         self,
         input_type: str,
         grammar: str,
-        formula: str,
+        formula: Formula | None,
         candidate: PatternMatchCandidate,
-    ) -> Tuple[str, str | None]:
+    ) -> Tuple[str, Formula | None]:
         grammar_identifier = get_grammar_identifier_for_type_string(input_type)
         if not candidate.is_regex:
             formula = self.__add_to_formula(
@@ -611,9 +958,9 @@ class SpecificationBuilder:
         self,
         input_type: str,
         grammar: str,
-        formula: str,
+        formula: Formula | None,
         candidate: ExpressionCandidate,
-    ) -> Tuple[str, str | None]:
+    ) -> Tuple[str, Formula | None]:
         if self.__is_valid_expression(candidate.expression):
             converted_formula = self.__get_isla_formula_for_expression(
                 candidate.expression, input_type
@@ -640,20 +987,18 @@ class SpecificationBuilder:
         expression = expression.replace("<FIELD-VALUE>", f"<{input_type}>")
         return expression
 
-    def __add_constraints_for_binary(self, required: str) -> Tuple[str, str | None]:
-        grammar = load_file_content(
-            f"{pre_built_specifications_path}/binary/binary.bnf"
-            if required is None
-            else f"{pre_built_specifications_path}/binary/binary-required.bnf"
+    def __add_constraints_for_binary(self, required: str) -> Tuple[str, Formula | None]:
+        grammar = self.__registry.get_grammar(
+            "binary/binary" if required is None else "binary/binary-required"
         )
 
         return grammar, None
 
     def __add_constraints_for_date(
         self, html_constraints: HTMLConstraints, use_datalist_options=False
-    ) -> Tuple[str, str | None]:
-        grammar = load_file_content(f"{pre_built_specifications_path}/date/date.bnf")
-        formula = load_file_content(f"{pre_built_specifications_path}/date/date.isla")
+    ) -> Tuple[str, Formula | None]:
+        grammar = self.__registry.get_grammar("date/date")
+        formula = parse_formula(self.__registry.get_formula("date/date"))
 
         if use_datalist_options and html_constraints.list is not None:
             grammar = self.__replace_by_list_options(
@@ -688,13 +1033,9 @@ class SpecificationBuilder:
 
     def __add_constraints_for_datetime(
         self, html_constraints: HTMLConstraints, use_datalist_options=False
-    ) -> Tuple[str, str | None]:
-        grammar = load_file_content(
-            f"{pre_built_specifications_path}/datetime/datetime.bnf"
-        )
-        formula = load_file_content(
-            f"{pre_built_specifications_path}/datetime/datetime.isla"
-        )
+    ) -> Tuple[str, Formula | None]:
+        grammar = self.__registry.get_grammar("datetime/datetime")
+        formula = parse_formula(self.__registry.get_formula("datetime/datetime"))
 
         if use_datalist_options and html_constraints.list is not None:
             grammar = self.__replace_by_list_options(
@@ -738,9 +1079,9 @@ class SpecificationBuilder:
 
     def __add_constraints_for_email(
         self, html_constraints: HTMLConstraints, use_datalist_options=False
-    ) -> Tuple[str, str | None]:
-        grammar = load_file_content(f"{pre_built_specifications_path}/email/email.bnf")
-        # formula = load_file_content(f"{pre_built_specifications_path}/email/email.isla")
+    ) -> Tuple[str, Formula | None]:
+        grammar = self.__registry.get_grammar("email/email")
+        # formula = self.__registry.get_formula("email/email")
         formula = None
 
         if use_datalist_options and html_constraints.list is not None:
@@ -776,9 +1117,9 @@ class SpecificationBuilder:
 
     def __add_constraints_for_month(
         self, html_constraints: HTMLConstraints, use_datalist_options=False
-    ) -> Tuple[str, str | None]:
-        grammar = load_file_content(f"{pre_built_specifications_path}/month/month.bnf")
-        formula = load_file_content(f"{pre_built_specifications_path}/month/month.isla")
+    ) -> Tuple[str, Formula | None]:
+        grammar = self.__registry.get_grammar("month/month")
+        formula = parse_formula(self.__registry.get_formula("month/month"))
 
         if use_datalist_options and html_constraints.list is not None:
             grammar = self.__replace_by_list_options(
@@ -811,10 +1152,8 @@ class SpecificationBuilder:
 
     def __add_constraints_for_multi_line_text(
         self, html_constraints: HTMLConstraints
-    ) -> Tuple[str, str | None]:
-        grammar = load_file_content(
-            f"{pre_built_specifications_path}/text/multi-line-text.bnf"
-        )
+    ) -> Tuple[str, Formula | None]:
+        grammar = self.__registry.get_grammar("text/multi-line-text")
         formula = None
 
         if html_constraints.required is not None and html_constraints.minlength is None:
@@ -836,8 +1175,8 @@ class SpecificationBuilder:
 
     def __add_constraints_for_number(
         self, html_constraints: HTMLConstraints, use_datalist_options=False
-    ) -> Tuple[str, str | None]:
-        grammar = load_file_content(f"{pre_built_specifications_path}/number/whole.bnf")
+    ) -> Tuple[str, Formula | None]:
+        grammar = self.__registry.get_grammar("number/whole")
         formula = None
 
         if use_datalist_options and html_constraints.list is not None:
@@ -877,10 +1216,8 @@ class SpecificationBuilder:
 
     def __add_constraints_for_one_line_text(
         self, html_constraints: HTMLConstraints, use_datalist_options: bool
-    ) -> Tuple[str, str | None]:
-        grammar = load_file_content(
-            f"{pre_built_specifications_path}/text/one-line-text.bnf"
-        )
+    ) -> Tuple[str, Formula | None]:
+        grammar = self.__registry.get_grammar("text/one-line-text")
         formula = None
 
         if use_datalist_options and html_constraints.list is not None:
@@ -913,9 +1250,9 @@ class SpecificationBuilder:
 
     def __add_constraints_for_time(
         self, html_constraints: HTMLConstraints, use_datalist_options=False
-    ) -> Tuple[str, str | None]:
-        grammar = load_file_content(f"{pre_built_specifications_path}/time/time.bnf")
-        formula = load_file_content(f"{pre_built_specifications_path}/time/time.isla")
+    ) -> Tuple[str, Formula | None]:
+        grammar = self.__registry.get_grammar("time/time")
+        formula = parse_formula(self.__registry.get_formula("time/time"))
 
         if use_datalist_options and html_constraints.list is not None:
             grammar = self.__replace_by_list_options(
@@ -948,9 +1285,9 @@ class SpecificationBuilder:
 
     def __add_constraints_for_url(
         self, html_constraints: HTMLConstraints, use_datalist_options=False
-    ) -> Tuple[str, str | None]:
-        grammar = load_file_content(f"{pre_built_specifications_path}/url/url.bnf")
-        formula = load_file_content(f"{pre_built_specifications_path}/url/url.isla")
+    ) -> Tuple[str, Formula | None]:
+        grammar = self.__registry.get_grammar("url/url")
+        formula = parse_formula(self.__registry.get_formula("url/url"))
 
         if use_datalist_options and html_constraints.list is not None:
             grammar = self.__replace_by_list_options(
@@ -983,9 +1320,9 @@ class SpecificationBuilder:
 
     def __add_constraints_for_week(
         self, html_constraints: HTMLConstraints, use_datalist_options=False
-    ) -> Tuple[str, str | None]:
-        grammar = load_file_content(f"{pre_built_specifications_path}/week/week.bnf")
-        formula = load_file_content(f"{pre_built_specifications_path}/week/week.isla")
+    ) -> Tuple[str, Formula | None]:
+        grammar = self.__registry.get_grammar("week/week")
+        formula = parse_formula(self.__registry.get_formula("week/week"))
 
         if use_datalist_options and html_constraints.list is not None:
             grammar = self.__replace_by_list_options(
@@ -1017,12 +1354,20 @@ class SpecificationBuilder:
         return grammar, formula
 
     def __add_to_formula(
-        self, additional_part: str, formula: str, operator: ISLa
-    ) -> str:
-        if formula is None or len(formula) == 0:
-            return additional_part
-        else:
-            return f"({formula}) {operator.value} ({additional_part})"
+        self, additional_part: str, formula: Formula | None, operator: ISLa
+    ) -> Formula:
+        part = parse_formula(additional_part)
+        if part is None:
+            return formula
+
+        return combine_formulas(formula, part, operator)
+
+    def __formula_to_string(self, formula: Formula | None) -> str | None:
+        # A formula that always holds does not constrain the input at all
+        if formula is None or formula == FormulaConstant(True):
+            return None
+
+        return str(formula)
 
     def __get_compare_month_string(self, year, month, operator) -> str:
         return f"str.to.int(<year>) {operator} {year} {ISLa.OR.value} (str.to.int(<year>) {ISLa.EQ.value} {year} {ISLa.AND.value} str.to.int(<month>) {operator} {month})"
@@ -1041,9 +1386,10 @@ class SpecificationBuilder:
     def __replace_by_list_options(
         self, grammar: str, option_identifier: str, list_options: List[str]
     ) -> str:
-        head, sep, _ = grammar.partition(f"<{option_identifier}> ::= ")
-        options = " | ".join(list_options)
-        return f"{head}{sep}{options}"
+        structured_grammar = Grammar.from_bnf(grammar)
+        structured_grammar.set_expansions(f"<{option_identifier}>", list_options)
+        structured_grammar.remove_unreachable()
+        return structured_grammar.to_bnf()
 
     def __replace_by_any_string(
         self, grammar: str, option_identifier: str, replacement: str
@@ -1051,38 +1397,19 @@ class SpecificationBuilder:
         head, sep, _ = grammar.partition(f"<{option_identifier}> ::= ")
         return f"{head}{sep}{replacement}"
 
-    def __grammar_string_to_dict(self, grammar: str) -> Dict[str, List[str]]:
-        result: Dict[str, List[str]] = {}
-        lines = split_on_newline(grammar)
-        for line in lines:
-            if line.startswith("<start> ::="):
-                continue
-            head, _, tail = line.partition(" ::= ")
-            result[head] = tail.split(" | ")
-
-        return result
-
-    def __grammar_dict_to_string(self, grammar_dict: Dict[str, List[str]]) -> str:
-        result: List[str] = []
-        for key, values in grammar_dict.items():
-            line = f'{key} ::= {(" | ").join(values)}'
-            result.append(line)
-
-        return ("\n").join(result)
-
     def __combine_grammars_and_formulas(
         self,
-        grammar: Dict[str, List[str]],
-        other_grammar: Dict[str, List[str]],
+        grammar: Grammar,
+        other_grammar: Grammar,
         formula: str | None,
         other_formula: str | None,
         compOperator: str,
-    ) -> Tuple[Dict[str, List[str]], str]:
+    ) -> Tuple[Grammar, str]:
         start_number = 1
-        grammar, formula, next_nt_number = self.__convert_non_terminals(
+        formula, next_nt_number = self.__convert_non_terminals(
             grammar, formula, start_number
         )
-        other_grammar, other_formula, _ = self.__convert_non_terminals(
+        other_formula, _ = self.__convert_non_terminals(
             other_grammar, other_formula, next_nt_number
         )
 
@@ -1090,9 +1417,10 @@ class SpecificationBuilder:
         nt2 = f"<nt{next_nt_number}>"
         compFormula = self.__get_formula_for_operator(nt1, nt2, compOperator)
 
-        start = {"<start>": [f'{nt1} "###" {nt2} "###"']}
+        start = Grammar()
+        start.set_expansions("<start>", [f'{nt1} "###" {nt2} "###"'])
 
-        return (start | grammar | other_grammar), (f" {ISLa.AND.value} ").join(
+        return start.merge(grammar).merge(other_grammar), (f" {ISLa.AND.value} ").join(
             filter(None, (f"({formula})", f"({other_formula})", f"({compFormula})"))
         )
 
@@ -1106,26 +1434,11 @@ class SpecificationBuilder:
         return f"{value} {operator} {other_value}"
 
     def __convert_non_terminals(
-        self, grammar_dict: Dict[str, List[str]], formula: str | None, start_number
-    ) -> Tuple[Dict[str, List[str]], str, int]:
-        new_grammar = {}
-        current_nt_number = start_number
-
-        if formula is not None:
-            formula = formula.replace("<start>", f"<nt{start_number}>")
-
-        for key in grammar_dict.keys():
-            new_key = f"<nt{current_nt_number}>"
-
-            for values in grammar_dict.values():
-                for idx, v in enumerate(values):
-                    new_v = v.replace(key, new_key)
-                    values[idx] = new_v
-
-            new_grammar[new_key] = grammar_dict[key]
-            if formula is not None:
-                formula = formula.replace(key, new_key)
-
-            current_nt_number += 1
-
-        return new_grammar, formula, current_nt_number
+        self, grammar: Grammar, formula: str | None, start_number: int
+    ) -> Tuple[str | None, int]:
+        # The start rule is replaced by the combined one, its nonterminal becomes the first numbered one
+        grammar.remove("<start>")
+        mapping, next_number = grammar.number_nonterminals(start_number)
+        mapping["<start>"] = f"<nt{start_number}>"
+
+        return rename_in_formula(formula, mapping), next_number
@@ -0,0 +1,166 @@
+import hashlib
+import json
+import os
+
+from typing import Dict, List
+
+from src.analysis.html_analysis import (
+    HTMLElementReference,
+    HTMLInputSpecification,
+    HTMLRadioGroupSpecification,
+)
+from src.analysis.specification_model import FormSpecification
+
+"""
+Fingerprinting module
+
+Fingerprints of form fields, so a repeated extraction can reuse the grammar and formula of every field whose HTML
+constraints and JavaScript did not change and only analyses the others again.
+"""
+
+FINGERPRINT_FILE = "fingerprints.json"
+FINGERPRINT_VERSION = 1
+
+
+def get_field_fingerprint(
+    specification: HTMLInputSpecification | HTMLRadioGroupSpecification,
+    script_hashes: Dict[str, str],
+    settings: Dict,
+) -> str:
+    """Returns the fingerprint of a form field
+
+    Validation code cannot be attributed to a field without tracing it, so the fingerprint covers all scripts
+    of the page. A changed script therefore invalidates every field, a changed HTML attribute only its field.
+
+    Parameters:
+    specification (HTMLInputSpecification | HTMLRadioGroupSpecification): The field with its HTML constraints
+    script_hashes (Dict[str, str]): The content hashes of all scripts of the page by their url
+    settings (Dict): The extraction settings the specification of the field depends on
+
+    Returns:
+    str: The fingerprint
+    """
+    content = {
+        "version": FINGERPRINT_VERSION,
+        "type": specification.type,
+        "field": specification.get_as_dict(),
+        "scripts": sorted(script_hashes.values()),
+        "settings": settings,
+    }
+    return hashlib.sha256(
+        json.dumps(content, sort_keys=True, default=str).encode()
+    ).hexdigest()
+
+
+def get_reference_key(reference: HTMLElementReference | Dict) -> str:
+    if isinstance(reference, HTMLElementReference):
+        reference = reference.get_as_dict()
+    return json.dumps(reference, sort_keys=True)
+
+
+class PreviousExtraction:
+    """PreviousExtraction class
+
+    The controls of the last extraction of a form together with the fingerprints of their fields. A control can be
+    reused if the fingerprints of all of its fields are unchanged.
+    """
+
+    def __init__(self, controls: List[Dict]) -> None:
+        """Initializes the previous extraction
+
+        Parameters:
+        controls (List[Dict]): The stored controls, each with the fingerprints of its fields, the control as in
+        specification.json without files and the content of its grammar and formula
+        """
+        self.__controls = controls
+        self.__controls_by_field: Dict[str, Dict] = {
+            key: control
+            for control in controls
+            for key in control["fingerprints"].keys()
+        }
+
+    @classmethod
+    def from_directory(cls, directory: str = "specification"):
+        """Reads the fingerprints of the last extraction
+
+        Parameters:
+        directory (str): The specification directory (default "specification")
+
+        Returns:
+        PreviousExtraction | None: The previous extraction or None if there is none or it has another format
+        """
+        try:
+            with open(os.path.join(directory, FINGERPRINT_FILE)) as file:
+                content = json.load(file)
+        except (OSError, json.JSONDecodeError):
+            return None
+
+        if content.get("version") != FINGERPRINT_VERSION:
+            return None
+
+        return cls(content["controls"])
+
+    def get_control(
+        self, reference: HTMLElementReference, fingerprints: Dict[str, str]
+    ) -> Dict | None:
+        """Returns the stored control of a field if none of its fields changed
+
+        Parameters:
+        reference (HTMLElementReference): The reference of the field
+        fingerprints (Dict[str, str]): The current fingerprints of all fields by their reference key
+
+        Returns:
+        Dict | None: The stored control or None if the field has to be analysed again
+        """
+        control = self.__controls_by_field.get(get_reference_key(reference))
+        if control is None:
+            return None
+
+        for key, fingerprint in control["fingerprints"].items():
+            if fingerprints.get(key) != fingerprint:
+                return None
+
+        return control
+
+    def is_unchanged(self, fingerprints: Dict[str, str]) -> bool:
+        """Checks whether the form has the same fields with the same fingerprints as in the last extraction"""
+        return set(fingerprints.keys()) == set(self.__controls_by_field.keys()) and all(
+            self.__controls_by_field[key]["fingerprints"][key] == fingerprint
+            for key, fingerprint in fingerprints.items()
+        )
+
+
+def create_fingerprint_file(
+    form_specification: FormSpecification, fingerprints: Dict[str, str]
+) -> str:
+    """Returns the content of the fingerprint file for a completed extraction
+
+    Parameters:
+    form_specification (FormSpecification): The extracted specification of the form
+    fingerprints (Dict[str, str]): The fingerprints of all fields by their reference key
+
+    Returns:
+    str: The content of the fingerprint file
+    """
+    controls = []
+    for control in form_specification.controls:
+        fields = control["fields"] if control.get("combined") else [control]
+        controls.append(
+            {
+                "fingerprints": {
+                    get_reference_key(field["reference"]): fingerprints.get(
+                        get_reference_key(field["reference"])
+                    )
+                    for field in fields
+                },
+                "control": {
+                    key: value
+                    for key, value in control.items()
+                    if key not in ["grammar", "formula"]
+                },
+                "grammar": form_specification.get_file(control["grammar"]),
+                "formula": form_specification.get_file(control["formula"]),
+            }
+        )
+
+    return json.dumps({"version": FINGERPRINT_VERSION, "controls": controls}, indent=2)
@@ -0,0 +1,163 @@
+import hashlib
+import json
+import os
+
+from typing import Dict, List
+
+from src.analysis.html_analysis import HTMLElementReference
+
+"""
+Specification Model module
+
+Keeps the specification of the whole form in memory while constraints are extracted, so the specification
+directory is only written at checkpoints instead of after every constraint candidate.
+"""
+
+SPECIFICATION_FILE = "specification.json"
+
+
+class FormSpecification:
+    """FormSpecification class
+
+    The form specification, i.e. the content of specification.json, and the grammar and formula files of all
+    controls. Changes are collected in memory and written by flush, which replaces every file atomically and
+    skips files whose content has not changed since they were last written.
+    """
+
+    def __init__(
+        self,
+        url: str | None = None,
+        submit: Dict | None = None,
+        directory: str = "specification",
+    ) -> None:
+        """Initializes an empty specification
+
+        Parameters:
+        url (str | None): The url of the form page (default None)
+        submit (Dict | None): The reference of the submit element (default None)
+        directory (str): The directory the specification is written to (default "specification")
+        """
+        self.__directory = directory
+        self.__specification: Dict = {"url": url, "controls": [], "submit": submit}
+        self.__files: Dict[str, str] = {}
+        self.__written_hashes: Dict[str, str] = {}
+
+    @property
+    def directory(self) -> str:
+        return self.__directory
+
+    @property
+    def specification(self) -> Dict:
+        return self.__specification
+
+    @property
+    def controls(self) -> List[Dict]:
+        return self.__specification["controls"]
+
+    def add_control(self, control: Dict) -> None:
+        self.__specification["controls"].append(control)
+
+    def set_file(self, file_name: str, content: str) -> None:
+        """Sets the content of a grammar or formula file
+
+        Parameters:
+        file_name (str): The name of the file in the specification directory, e.g. 1.bnf
+        content (str): The content of the file
+        """
+        self.__files[file_name] = content
+
+    def get_file(self, file_name: str) -> str | None:
+        return self.__files.get(file_name)
+
+    def combine_controls(
+        self,
+        first_reference: HTMLElementReference,
+        second_reference: HTMLElementReference,
+        index: int,
+    ) -> bool:
+        """Replaces two controls whose values are compared by one combined control
+
+        Parameters:
+        first_reference (HTMLElementReference): The reference of the control the value is compared to
+        second_reference (HTMLElementReference): The reference of the control with the comparison
+        index (int): The index of the grammar and formula files of the combined control
+
+        Returns:
+        bool: True if both controls were found and combined, False otherwise
+        """
+        first_input = None
+        second_input = None
+        new_controls = []
+
+        for control in self.controls:
+            if control.get("reference") == second_reference.get_as_dict():
+                second_input = control
+            elif control.get("reference") == first_reference.get_as_dict():
+                first_input = control
+            else:
+                new_controls.append(control)
+
+        if first_input is None or second_input is None:
+            return False
+
+        combined_control = {
+            "combined": True,
+            "fields": [
+                _omit_keys(first_input, ["grammar", "formula"]),
+                _omit_keys(second_input, ["grammar", "formula"]),
+            ],
+            "grammar": f"{index}.bnf",
+            "formula": f"{index}.isla",
+        }
+        self.__specification["controls"] = new_controls + [combined_control]
+        return True
+
+    def flush(self) -> List[str]:
+        """Writes all changed files of the specification to the directory
+
+        Returns:
+        List[str]: The names of the files that were written
+        """
+        os.makedirs(self.__directory, exist_ok=True)
+        contents = self.__files | {
+            SPECIFICATION_FILE: json.dumps(self.__specification, indent=2)
+        }
+
+        written: List[str] = []
+        for file_name, content in contents.items():
+            content_hash = hashlib.sha256(content.encode()).hexdigest()
+            if self.__get_written_hash(file_name) == content_hash:
+                continue
+
+            self.__write_atomically(file_name, content)
+            self.__written_hashes[file_name] = content_hash
+            written.append(file_name)
+
+        return written
+
+    def __get_written_hash(self, file_name: str) -> str | None:
+        # Files of an earlier extraction only count as written if their content is the same
+        if file_name not in self.__written_hashes:
+            path = os.path.join(self.__directory, file_name)
+            if not os.path.isfile(path):
+                return None
+
+            with open(path, "rb") as file:
+                self.__written_hashes[file_name] = hashlib.sha256(
+                    file.read()
+                ).hexdigest()
+
+        return self.__written_hashes[file_name]
+
+    def __write_atomically(self, file_name: str, content: str) -> None:
+        path = os.path.join(self.__directory, file_name)
+        temporary_path = f"{path}.{os.getpid()}.tmp"
+        with open(temporary_path, "w") as file:
+            file.write(content)
+        os.replace(temporary_path, path)
+
+
+def _omit_keys(original_dict: Dict, keys_to_omit: List[str]) -> Dict:
+    return {
+        key: value for key, value in original_dict.items() if key not in keys_to_omit
+    }
@@ -0,0 +1,72 @@
+from typing import List
+
+from src.generation.grammar_fuzzer import GrammarFuzzer
+from src.generation.interval_solver import IntervalSolver, get_interval_solvers
+
+"""
+Boundary Values module
+
+Derives targeted invalid values from the bounds in a formula, i.e. the min, max, minlength, maxlength, step and
+required constraints SpecificationBuilder translates from the HTML attributes of an input.
+"""
+
+
+class BoundaryValueGenerator:
+    """BoundaryValueGenerator class
+
+    Invalid values right at the bounds of a formula, e.g. min - 1, max + 1, maxlength + 1, an off step value
+    or the empty value of a required input. The formula may contain further conjuncts that cannot be modelled,
+    a value that violates one of the bounds is invalid no matter what these conjuncts require.
+    """
+
+    def __init__(self, solvers: List[IntervalSolver]) -> None:
+        """Initializes the generator
+
+        Parameters:
+        solvers (List[IntervalSolver]): One solver per bounded function, holding the bounds of the formula
+        """
+        self.__solvers = solvers
+
+    @classmethod
+    def from_formula(cls, formula: str | None):
+        """Creates a generator for the bounds of a formula
+
+        Parameters:
+        formula (str | None): The ISLa formula
+
+        Returns:
+        BoundaryValueGenerator | None: The generator or None if the formula does not bound the input
+        """
+        if formula is None:
+            return None
+
+        solvers = get_interval_solvers(formula)
+        if len(solvers) == 0:
+            return None
+
+        return cls(solvers)
+
+    def get_invalid_values(self, fuzzer: GrammarFuzzer) -> List[str]:
+        """Returns the invalid values of the grammar at the bounds, the empty value first
+
+        Parameters:
+        fuzzer (GrammarFuzzer): The fuzzer of the grammar, used for words of a given length and membership checks
+
+        Returns:
+        List[str]: The values, each of them violates at least one bound
+        """
+        values: List[str] = []
+        # An empty number input is left out of the submission in HTML rather than compared to the bounds,
+        # so only length bounds say something about the empty value
+        if fuzzer.contains("") and any(
+            solver.function == "len" and not solver.contains("")
+            for solver in self.__solvers
+        ):
+            values.append("")
+
+        for solver in self.__solvers:
+            for value in solver.get_boundary_values(fuzzer):
+                if value not in values:
+                    values.append(value)
+
+        return values
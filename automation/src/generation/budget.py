@@ -0,0 +1,217 @@
+import math
+import threading
+
+from typing import Dict, List
+
+from src.utility.helpers import get_specification_hash
+
+"""
+Budget module
+
+Distributes a limited amount of value generation time over all fields of a test campaign.
+"""
+
+
+class FieldBudget:
+    """FieldBudget class
+
+    Generation time statistics of a single specification and validity
+    """
+
+    def __init__(self, label: str) -> None:
+        self.label = label
+        self.requests = 0
+        self.timeouts = 0
+        self.consecutive_timeouts = 0
+        self.skipped = 0
+        self.spent_seconds = 0.0
+        self.solve_times: List[float] = []
+        self.native_values = 0
+        self.last_timeout = 0
+        self.verdict: str | None = None
+
+
+class GenerationBudget:
+    """GenerationBudget class
+
+    Time budget for value generation that is shared across fields and test rounds.
+    The timeout of a request is derived from the time previous solver requests for the same field needed to succeed,
+    so easy fields do not reserve the full timeout. Fields that keep timing out only get short attempts until
+    they succeed again, and no time is handed out anymore once the budget is used up.
+    """
+
+    def __init__(
+        self,
+        total_seconds: float | None = None,
+        max_timeout_seconds: int = 60,
+        min_timeout_seconds: int = 1,
+        timeout_factor: float = 3.0,
+        max_consecutive_timeouts: int = 2,
+    ) -> None:
+        """Initializes the budget
+
+        Parameters:
+        total_seconds (float | None): The time all generation requests may take together (default None; unlimited)
+        max_timeout_seconds (int): The timeout for a field without any successful request yet (default 60)
+        min_timeout_seconds (int): The lower bound of adaptive timeouts and the timeout of deprioritised fields (default 1)
+        timeout_factor (float): Adaptive timeouts are this multiple of the slowest successful request of the field (default 3.0)
+        max_consecutive_timeouts (int): Timeouts in a row after which a field is deprioritised (default 2)
+        """
+        self.__total_seconds = total_seconds
+        self.__max_timeout_seconds = max_timeout_seconds
+        self.__min_timeout_seconds = min(min_timeout_seconds, max_timeout_seconds)
+        self.__timeout_factor = timeout_factor
+        self.__max_consecutive_timeouts = max_consecutive_timeouts
+        self.__spent_seconds = 0.0
+        self.__fields: Dict[str, FieldBudget] = {}
+        self.__lock = threading.Lock()
+
+    @property
+    def spent_seconds(self) -> float:
+        return self.__spent_seconds
+
+    @property
+    def remaining_seconds(self) -> float:
+        if self.__total_seconds is None:
+            return math.inf
+        return max(0.0, self.__total_seconds - self.__spent_seconds)
+
+    def get_key(self, grammar: str, formula: str | None, validity: str) -> str:
+        return f"{get_specification_hash(grammar, formula)}:{validity}"
+
+    def set_label(self, grammar: str, formula: str | None, label: str) -> None:
+        """Names a specification in the report, e.g. after the field it belongs to
+
+        Parameters:
+        grammar (str): The grammar of the specification
+        formula (str | None): The formula of the specification
+        label (str): The name shown in the report
+        """
+        with self.__lock:
+            for validity in ["VALID", "INVALID"]:
+                self.__get_field(self.get_key(grammar, formula, validity)).label = (
+                    f"{label} ({validity.lower()})"
+                )
+
+    def set_verdict(self, key: str, verdict: str) -> None:
+        """Stores whether values of the field exist at all, see SatisfiabilityChecker"""
+        with self.__lock:
+            self.__get_field(key).verdict = verdict
+
+    def get_timeout(self, key: str, requested_seconds: int | None = None) -> int:
+        """Returns the timeout for the next request of a field
+
+        Parameters:
+        key (str): The key of the field, see get_key
+        requested_seconds (int | None): The timeout the caller asked for, used as upper bound (default None)
+
+        Returns:
+        int: The timeout in seconds, 0 if the request should not be attempted at all
+        """
+        with self.__lock:
+            field = self.__get_field(key)
+            max_timeout = self.__max_timeout_seconds
+            if requested_seconds is not None:
+                max_timeout = min(max_timeout, requested_seconds)
+
+            if field.consecutive_timeouts >= self.__max_consecutive_timeouts:
+                timeout = self.__min_timeout_seconds
+            elif len(field.solve_times) > 0:
+                # Every timeout in a row doubles the timeout until the field gets deprioritised
+                timeout = math.ceil(self.__timeout_factor * max(field.solve_times))
+                timeout = max(self.__min_timeout_seconds, timeout)
+                timeout *= 2**field.consecutive_timeouts
+            else:
+                timeout = max_timeout
+
+            timeout = min(timeout, max_timeout)
+            if self.__total_seconds is not None:
+                timeout = min(timeout, math.floor(self.remaining_seconds))
+            if timeout <= 0:
+                field.skipped += 1
+                timeout = 0
+
+            field.last_timeout = timeout
+            return timeout
+
+    def record(
+        self,
+        key: str,
+        seconds: float,
+        timed_out: bool,
+        values: int = 1,
+        solved: bool = True,
+    ) -> None:
+        """Books the time a request took
+
+        Only requests that ran a solver or search adapt the timeout. Values of native generators take microseconds
+        and would otherwise shrink the timeout of the next solver request to the minimum.
+
+        Parameters:
+        key (str): The key of the field, see get_key
+        seconds (float): The time the request took
+        timed_out (bool): Whether the request failed to produce a value
+        values (int): The number of values the request generated (default 1)
+        solved (bool): Whether the request ran a solver or search instead of a native generator (default True)
+        """
+        with self.__lock:
+            field = self.__get_field(key)
+            field.requests += 1
+            field.spent_seconds += seconds
+            self.__spent_seconds += seconds
+
+            if timed_out:
+                field.timeouts += 1
+                field.consecutive_timeouts += 1
+            elif not solved:
+                field.native_values += values
+            else:
+                field.consecutive_timeouts = 0
+                field.solve_times.append(seconds / values)
+
+    def is_deprioritised(self, key: str) -> bool:
+        with self.__lock:
+            return (
+                self.__get_field(key).consecutive_timeouts
+                >= self.__max_consecutive_timeouts
+            )
+
+    def get_report(self) -> Dict[str, Dict]:
+        """Returns the budget use per field
+
+        Returns:
+        Dict[str, Dict]: The statistics per field label and the totals under "total"
+        """
+        with self.__lock:
+            report: Dict[str, Dict] = {}
+            for field in self.__fields.values():
+                # Unsatisfiable fields are reported although no time is spent on them
+                if (
+                    field.requests == 0
+                    and field.skipped == 0
+                    and field.verdict != "UNSAT"
+                ):
+                    continue
+
+                report[field.label] = {
+                    "requests": field.requests,
+                    "timeouts": field.timeouts,
+                    "skipped": field.skipped,
+                    "native_values": field.native_values,
+                    "spent_seconds": round(field.spent_seconds, 3),
+                    "last_timeout": field.last_timeout,
+                    "deprioritised": field.consecutive_timeouts
+                    >= self.__max_consecutive_timeouts,
+                    "satisfiability": field.verdict,
+                }
+
+            report["total"] = {
+                "budget_seconds": self.__total_seconds,
+                "spent_seconds": round(self.__spent_seconds, 3),
+            }
+            return report
+
+    def __get_field(self, key: str) -> FieldBudget:
+        if key not in self.__fields:
+            self.__fields[key] = FieldBudget(key)
+        return self.__fields[key]
@@ -0,0 +1,382 @@
+import calendar
+import datetime
+import random
+import re
+
+from typing import List, Tuple
+
+from src.generation.interval_solver import is_wrapped_in_parentheses
+from src.utility.grammar import optimize_specification
+from src.utility.specification_registry import get_specification_registry
+
+"""
+Calendar Generation module
+
+Generates values for the pre-built date, datetime, month, time and week specifications natively.
+Their formulas encode calendar rules like leap years and the number of days per month, which are cheap to
+follow in Python but expensive to solve with ISLa every time.
+"""
+
+CALENDAR_TYPES = ["date", "datetime", "month", "time", "week"]
+
+# The nonterminals compared by the bound clauses SpecificationBuilder adds, week bounds use the month comparison
+BOUND_FIELDS = {
+    "date": ["year", "month", "day"],
+    "datetime": ["year", "month", "day", "hour", "minute"],
+    "month": ["year", "month"],
+    "time": ["hour", "minute"],
+    "week": ["year", "month"],
+}
+
+VALUE_PATTERNS = {
+    "date": re.compile(r"^(\d{4})-(\d{2})-(\d{2})$"),
+    "datetime": re.compile(r"^(\d{4})-(\d{2})-(\d{2})[T ](\d{2}):(\d{2})$"),
+    "month": re.compile(r"^(\d{4})-(\d{2})$"),
+    "time": re.compile(r"^(\d{2}):(\d{2})$"),
+    "week": re.compile(r"^(\d{4})-W(\d{2})$"),
+}
+
+REQUIRED_CLAUSE = "str.len(<start>) > 0"
+MINUTES_PER_DAY = 24 * 60
+WEEKS_PER_YEAR = 52
+MAX_YEAR = 9999
+
+
+class CalendarGenerator:
+    """CalendarGenerator class
+
+    Values of a pre-built calendar specification between an optional minimum and maximum.
+    Every value of a type is mapped to an ordinal, e.g. the number of minutes since 0001-01-01T00:00 for datetimes,
+    so bounds become a plain interval. Bounds follow the HTML semantics of min and max, i.e. the order of the values.
+    """
+
+    def __init__(
+        self,
+        input_type: str,
+        lower: int | None = None,
+        upper: int | None = None,
+        required: bool = False,
+    ) -> None:
+        """Initializes the generator
+
+        Parameters:
+        input_type (str): One of date, datetime, month, time and week
+        lower (int | None): The ordinal of the earliest valid value (default None; unbounded)
+        upper (int | None): The ordinal of the latest valid value (default None; unbounded)
+        required (bool): Whether the empty value is invalid (default False)
+        """
+        self.__type = input_type
+        self.__first, self.__last = _get_ordinal_range(input_type)
+        self.__lower = self.__first if lower is None else max(lower, self.__first)
+        self.__upper = self.__last if upper is None else min(upper, self.__last)
+        self.__required = required
+
+    @classmethod
+    def from_specification(cls, grammar: str, formula: str | None):
+        """Creates a generator for a specification that is still the pre-built one of a calendar type
+
+        The formula may only extend the pre-built formula by the required and bound clauses SpecificationBuilder adds.
+
+        Parameters:
+        grammar (str): The grammar of the specification
+        formula (str | None): The formula of the specification
+
+        Returns:
+        CalendarGenerator | None: The generator or None if the specification has to be left to ISLa
+        """
+        if formula is None:
+            return None
+
+        normalized_grammar = _normalize(grammar)
+        for input_type in CALENDAR_TYPES:
+            pre_built_grammar, pre_built_formula = _get_pre_built_specification(
+                input_type
+            )
+            if normalized_grammar not in [
+                pre_built_grammar,
+                _get_optimized_pre_built_grammar(input_type, formula),
+            ]:
+                continue
+
+            clauses = _split_added_clauses(_normalize(formula), pre_built_formula)
+            if clauses is None:
+                return None
+
+            return cls.__from_clauses(input_type, clauses)
+
+        return None
+
+    @classmethod
+    def __from_clauses(cls, input_type: str, clauses: List[str]):
+        lower = None
+        upper = None
+        required = False
+        for clause in clauses:
+            if clause == REQUIRED_CLAUSE:
+                required = True
+                continue
+
+            bound = _parse_bound_clause(clause, BOUND_FIELDS[input_type])
+            if bound is None:
+                return None
+
+            operator, numbers = bound
+            ordinal = _to_ordinal(input_type, numbers)
+            if ordinal is None:
+                return None
+
+            if operator == ">=":
+                lower = ordinal if lower is None else max(lower, ordinal)
+            else:
+                upper = ordinal if upper is None else min(upper, ordinal)
+
+        return cls(input_type, lower, upper, required)
+
+    @property
+    def input_type(self) -> str:
+        return self.__type
+
+    @property
+    def bounds(self) -> Tuple[str, str]:
+        return self.__format(self.__lower), self.__format(self.__upper)
+
+    def is_satisfiable(self) -> bool:
+        return self.__lower <= self.__upper
+
+    def contains(self, value: str) -> bool:
+        """Checks whether a value satisfies the calendar rules and bounds of the specification"""
+        if value == "":
+            return not self.__required
+
+        ordinal = _parse_value(self.__type, value)
+        return ordinal is not None and self.__lower <= ordinal <= self.__upper
+
+    def sample_valid(self) -> str | None:
+        """Samples a value between the bounds
+
+        Returns:
+        str | None: The value or None if the bounds exclude all values
+        """
+        if not self.is_satisfiable():
+            return None
+
+        return self.__format(random.randint(self.__lower, self.__upper))
+
+    def sample_invalid(self) -> str | None:
+        """Samples a value of the grammar that lies just outside the bounds or breaks a calendar rule
+
+        Returns:
+        str | None: The value or None if there is no invalid value
+        """
+        candidates = [
+            candidate
+            for candidate in self.__get_invalid_candidates()
+            if not self.contains(candidate)
+        ]
+        return random.choice(candidates) if len(candidates) > 0 else None
+
+    def __get_invalid_candidates(self) -> List[str]:
+        candidates: List[str] = []
+        if self.__required:
+            candidates.append("")
+
+        if self.__lower > self.__first:
+            candidates.append(self.__format(self.__lower - 1))
+            candidates.append(
+                self.__format(random.randint(self.__first, self.__lower - 1))
+            )
+        if self.__upper < self.__last:
+            candidates.append(self.__format(self.__upper + 1))
+            candidates.append(
+                self.__format(random.randint(self.__upper + 1, self.__last))
+            )
+
+        candidates.extend(self.__get_rule_violations())
+        return candidates
+
+    def __get_rule_violations(self) -> List[str]:
+        """Values in the format of the type whose parts are out of range, e.g. the 30th of February"""
+        year = random.randint(1, MAX_YEAR)
+        month = random.randint(1, 12)
+        violations: List[str] = []
+
+        if self.__type in ["date", "datetime"]:
+            days = calendar.monthrange(year, month)[1]
+            non_leap_year = year if not calendar.isleap(year) else year - 1
+            dates = [
+                f"0000-{month:02d}-01",
+                f"{year:04d}-00-01",
+                f"{year:04d}-{random.randint(13, 99)}-01",
+                f"{year:04d}-{month:02d}-00",
+                f"{year:04d}-{month:02d}-{random.randint(days + 1, 99)}",
+                f"{non_leap_year:04d}-02-29",
+            ]
+            if self.__type == "date":
+                return dates
+
+            time = self.__get_time_string(random.randint(0, 23), random.randint(0, 59))
+            violations.extend(f"{date}{random.choice('T ')}{time}" for date in dates)
+            date = self.__format(random.randint(self.__first, self.__last))[:10]
+            violations.extend(
+                f"{date}{random.choice('T ')}{time}"
+                for time in self.__get_time_violations()
+            )
+        elif self.__type == "month":
+            violations.extend(
+                [
+                    f"0000-{month:02d}",
+                    f"{year:04d}-00",
+                    f"{year:04d}-{random.randint(13, 99)}",
+                ]
+            )
+        elif self.__type == "week":
+            violations.extend(
+                [
+                    f"0000-W{random.randint(1, WEEKS_PER_YEAR):02d}",
+                    f"{year:04d}-W00",
+                    f"{year:04d}-W{random.randint(WEEKS_PER_YEAR + 1, 99)}",
+                ]
+            )
+        elif self.__type == "time":
+            violations.extend(self.__get_time_violations())
+
+        return violations
+
+    def __get_time_violations(self) -> List[str]:
+        return [
+            self.__get_time_string(random.randint(24, 99), random.randint(0, 59)),
+            self.__get_time_string(random.randint(0, 23), random.randint(60, 99)),
+        ]
+
+    def __get_time_string(self, hour: int, minute: int) -> str:
+        return f"{hour:02d}:{minute:02d}"
+
+    def __format(self, ordinal: int) -> str:
+        if self.__type == "date":
+            return datetime.date.fromordinal(ordinal).isoformat()
+        if self.__type == "datetime":
+            days, minutes = divmod(ordinal, MINUTES_PER_DAY)
+            date = datetime.date.fromordinal(days + 1).isoformat()
+            return f"{date}{random.choice('T ')}{self.__get_time_string(*divmod(minutes, 60))}"
+        if self.__type == "month":
+            return f"{ordinal // 12 + 1:04d}-{ordinal % 12 + 1:02d}"
+        if self.__type == "week":
+            return f"{ordinal // WEEKS_PER_YEAR + 1:04d}-W{ordinal % WEEKS_PER_YEAR + 1:02d}"
+        return self.__get_time_string(*divmod(ordinal, 60))
+
+
+def _get_ordinal_range(input_type: str) -> Tuple[int, int]:
+    last_date = datetime.date(MAX_YEAR, 12, 31).toordinal()
+    if input_type == "date":
+        return 1, last_date
+    if input_type == "datetime":
+        return 0, last_date * MINUTES_PER_DAY - 1
+    if input_type == "month":
+        return 0, MAX_YEAR * 12 - 1
+    if input_type == "week":
+        return 0, MAX_YEAR * WEEKS_PER_YEAR - 1
+    return 0, MINUTES_PER_DAY - 1
+
+
+def _to_ordinal(input_type: str, numbers: List[int]) -> int | None:
+    """Maps the parts of a value to its ordinal, None if a part is out of range"""
+    if input_type in ["date", "datetime"]:
+        try:
+            ordinal = datetime.date(*numbers[:3]).toordinal()
+        except ValueError:
+            return None
+        if input_type == "date":
+            return ordinal
+
+        minutes = _to_ordinal("time", numbers[3:])
+        if minutes is None:
+            return None
+        return (ordinal - 1) * MINUTES_PER_DAY + minutes
+
+    if input_type == "time":
+        [hour, minute] = numbers
+        return hour * 60 + minute if 0 <= hour <= 23 and 0 <= minute <= 59 else None
+
+    [year, part] = numbers
+    parts = 12 if input_type == "month" else WEEKS_PER_YEAR
+    if not (1 <= year <= MAX_YEAR and 1 <= part <= parts):
+        return None
+    return (year - 1) * parts + part - 1
+
+
+def _parse_value(input_type: str, value: str) -> int | None:
+    match = VALUE_PATTERNS[input_type].match(value)
+    if match is None:
+        return None
+
+    return _to_ordinal(input_type, [int(group) for group in match.groups()])
+
+
+def _parse_bound_clause(clause: str, fields: List[str]) -> Tuple[str, List[int]] | None:
+    """Parses a clause built by the compare strings of SpecificationBuilder, e.g. for a month
+    str.to.int(<year>) >= 2024 or (str.to.int(<year>) = 2024 and str.to.int(<month>) >= 5)
+
+    Returns:
+    Tuple[str, List[int]] | None: The operator and the bound per field or None if the clause has another form
+    """
+    numbers = re.findall(r"-?\d+", clause)
+    operator_match = re.match(r"^str\.to\.int\(<\w+>\) (>=|<=) ", clause)
+    if operator_match is None or len(numbers) != 2 * len(fields) - 1:
+        return None
+
+    operator = operator_match.group(1)
+    bound = [int(number) for number in numbers[::2]]
+    if _get_bound_clause(fields, bound, operator) != clause:
+        return None
+
+    return operator, bound
+
+
+def _get_bound_clause(fields: List[str], bound: List[int], operator: str) -> str:
+    clause = f"str.to.int(<{fields[-1]}>) {operator} {bound[-1]}"
+    for field, number in reversed(list(zip(fields[:-1], bound[:-1]))):
+        clause = f"str.to.int(<{field}>) {operator} {number} or (str.to.int(<{field}>) = {number} and {clause})"
+    return clause
+
+
+def _split_added_clauses(formula: str, pre_built_formula: str) -> List[str] | None:
+    """Peels off the clauses SpecificationBuilder appended in the form (formula) and (clause)
+
+    Returns:
+    List[str] | None: The appended clauses or None if the formula does not extend the pre-built formula
+    """
+    clauses: List[str] = []
+    while formula != pre_built_formula:
+        if not formula.startswith("("):
+            return None
+
+        depth = 0
+        for index, character in enumerate(formula):
+            depth += {"(": 1, ")": -1}.get(character, 0)
+            if depth == 0:
+                break
+
+        rest = formula[index + 1 :]
+        if not rest.startswith(" and (") or not is_wrapped_in_parentheses(rest[5:]):
+            return None
+
+        clauses.insert(0, rest[6:-1])
+        formula = formula[1:index]
+
+    return clauses
+
+
+def _normalize(specification: str) -> str:
+    specification = " ".join(specification.split())
+    return re.sub(r"\(\s+", "(", re.sub(r"\s+\)", ")", specification))
+
+
+def _get_pre_built_specification(input_type: str) -> Tuple[str, str]:
+    specification = get_specification_registry().get(f"{input_type}/{input_type}")
+    return _normalize(specification.grammar), _normalize(specification.formula)
+
+
+def _get_optimized_pre_built_grammar(input_type: str, formula: str) -> str:
+    # Written specifications contain the grammar after optimize_specification
+    specification = get_specification_registry().get(f"{input_type}/{input_type}")
+    return _normalize(optimize_specification(specification.grammar, formula)[0])
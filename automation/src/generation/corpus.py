@@ -0,0 +1,106 @@
+import os
+import sqlite3
+import time
+
+from contextlib import closing
+from typing import List
+
+from src.utility.helpers import get_specification_hash
+
+"""
+Corpus module
+
+Persists generated values on disk so that runs against an unchanged specification can reuse them.
+"""
+
+
+class ValueCorpus:
+    """ValueCorpus class
+
+    SQLite-backed store of generated values keyed by a content hash of grammar and formula and by validity.
+    """
+
+    def __init__(self, database_path: str = "corpus/values.db") -> None:
+        """Initializes the corpus and creates the database if it does not exist yet
+
+        Parameters:
+        database_path (str): Path to the SQLite database file (default "corpus/values.db")
+        """
+        self.__database_path = database_path
+        directory = os.path.dirname(database_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with closing(self.__connect()) as connection, connection:
+            connection.execute(
+                """CREATE TABLE IF NOT EXISTS generated_values (
+                    specification_hash TEXT NOT NULL,
+                    validity TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    created REAL NOT NULL,
+                    PRIMARY KEY (specification_hash, validity, value)
+                )"""
+            )
+
+    def add(
+        self, grammar: str, formula: str | None, validity: str, values: List[str]
+    ) -> None:
+        """Stores values of one validity for a specification
+
+        Parameters:
+        grammar (str): The grammar the values were generated for
+        formula (str | None): The (not negated) formula the values were generated for
+        validity (str): The validity of the values
+        values (List[str]): The generated values
+        """
+        if len(values) == 0:
+            return
+
+        key = get_specification_hash(grammar, formula)
+        created = time.time()
+        with closing(self.__connect()) as connection, connection:
+            connection.executemany(
+                "INSERT OR IGNORE INTO generated_values VALUES (?, ?, ?, ?)",
+                [(key, validity, value, created) for value in values],
+            )
+
+    def sample(
+        self, grammar: str, formula: str | None, validity: str, amount: int = 1
+    ) -> List[str]:
+        """Returns up to amount distinct stored values for a specification in random order
+
+        Parameters:
+        grammar (str): The grammar of the specification
+        formula (str | None): The (not negated) formula of the specification
+        validity (str): The requested validity
+        amount (int): The maximum number of values (default 1)
+
+        Returns:
+        List[str]: The stored values, fewer than amount if the corpus does not hold enough
+        """
+        if amount < 1:
+            return []
+
+        with closing(self.__connect()) as connection:
+            rows = connection.execute(
+                """SELECT value FROM generated_values
+                WHERE specification_hash = ? AND validity = ?
+                ORDER BY RANDOM() LIMIT ?""",
+                (get_specification_hash(grammar, formula), validity, amount),
+            ).fetchall()
+
+        return [row[0] for row in rows]
+
+    def count(self, grammar: str, formula: str | None, validity: str) -> int:
+        with closing(self.__connect()) as connection:
+            (result,) = connection.execute(
+                """SELECT COUNT(*) FROM generated_values
+                WHERE specification_hash = ? AND validity = ?""",
+                (get_specification_hash(grammar, formula), validity),
+            ).fetchone()
+
+        return result
+
+    def __connect(self) -> sqlite3.Connection:
+        # A new connection per operation keeps the corpus usable from the pre-generation thread
+        return sqlite3.connect(self.__database_path, timeout=30)
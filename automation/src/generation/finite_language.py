@@ -0,0 +1,135 @@
+from isla.helpers import is_nonterminal
+from itertools import product
+from typing import Callable, Dict, List, Set, Tuple
+
+from src.generation.grammar_fuzzer import GrammarFuzzer
+
+"""
+Finite Language module
+
+Enumerates the complete language of small grammars, e.g. of radio groups, binary inputs and datalist options,
+so values can be drawn from it directly instead of being solved.
+"""
+
+
+class FiniteLanguage:
+    """FiniteLanguage class
+
+    All words of a grammar without recursion whose number of derivations stays below a threshold.
+    """
+
+    def __init__(self, words: List[str]) -> None:
+        self.__words = words
+
+    @classmethod
+    def from_fuzzer(cls, fuzzer: GrammarFuzzer, max_size: int = 256):
+        """Enumerates the language of the grammar of a fuzzer
+
+        Parameters:
+        fuzzer (GrammarFuzzer): The fuzzer of the grammar
+        max_size (int): The maximum number of derivations that are enumerated (default 256)
+
+        Returns:
+        FiniteLanguage | None: The language or None if the grammar is recursive or its language is too large
+        """
+        grammar = fuzzer.grammar
+        start_symbol = fuzzer.start_symbol
+        if not cls.__is_acyclic(grammar, start_symbol):
+            return None
+
+        sizes: Dict[str, int] = {}
+        if cls.__count_derivations(grammar, start_symbol, sizes, max_size) > max_size:
+            return None
+
+        words: Dict[str, List[str]] = {}
+        return cls(sorted(set(cls.__enumerate(grammar, start_symbol, words))))
+
+    @property
+    def words(self) -> List[str]:
+        return self.__words
+
+    def split(self, evaluate: Callable[[str], bool]) -> Tuple[List[str], List[str]]:
+        """Splits the language into the words that satisfy a formula and the words that do not
+
+        Parameters:
+        evaluate (Callable[[str], bool]): Evaluates the formula for a word
+
+        Returns:
+        Tuple[List[str], List[str]]: The valid and the invalid words
+        """
+        valid: List[str] = []
+        invalid: List[str] = []
+        for word in self.__words:
+            (valid if evaluate(word) else invalid).append(word)
+
+        return valid, invalid
+
+    def __len__(self) -> int:
+        return len(self.__words)
+
+    @staticmethod
+    def __is_acyclic(grammar: Dict[str, List[List[str]]], start_symbol: str) -> bool:
+        visiting: Set[str] = set()
+        finished: Set[str] = set()
+
+        def visit(nonterminal: str) -> bool:
+            if nonterminal in finished:
+                return True
+            if nonterminal in visiting or nonterminal not in grammar:
+                return False
+
+            visiting.add(nonterminal)
+            for expansion in grammar[nonterminal]:
+                for symbol in expansion:
+                    if is_nonterminal(symbol) and not visit(symbol):
+                        return False
+            visiting.remove(nonterminal)
+            finished.add(nonterminal)
+            return True
+
+        return visit(start_symbol)
+
+    @staticmethod
+    def __count_derivations(
+        grammar: Dict[str, List[List[str]]],
+        nonterminal: str,
+        sizes: Dict[str, int],
+        max_size: int,
+    ) -> int:
+        if nonterminal not in sizes:
+            total = 0
+            for expansion in grammar[nonterminal]:
+                count = 1
+                for symbol in expansion:
+                    if symbol in grammar:
+                        count *= FiniteLanguage.__count_derivations(
+                            grammar, symbol, sizes, max_size
+                        )
+                    # Counts beyond the threshold are not needed, capping them keeps the numbers small
+                    count = min(count, max_size + 1)
+                total = min(total + count, max_size + 1)
+            sizes[nonterminal] = total
+
+        return sizes[nonterminal]
+
+    @staticmethod
+    def __enumerate(
+        grammar: Dict[str, List[List[str]]],
+        nonterminal: str,
+        words: Dict[str, List[str]],
+    ) -> List[str]:
+        if nonterminal not in words:
+            result: List[str] = []
+            for expansion in grammar[nonterminal]:
+                parts = [
+                    (
+                        FiniteLanguage.__enumerate(grammar, symbol, words)
+                        if symbol in grammar
+                        else [symbol]
+                    )
+                    for symbol in expansion
+                ]
+                result.extend("".join(combination) for combination in product(*parts))
+            words[nonterminal] = result
+
+        return words[nonterminal]
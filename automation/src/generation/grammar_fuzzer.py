@@ -0,0 +1,341 @@
+import math
+import random
+
+from isla.helpers import RE_NONTERMINAL, is_nonterminal
+from isla.language import parse_bnf
+from isla.parser import EarleyParser
+from typing import Dict, List, Set, Tuple
+
+from src.utility.grammar import Grammar
+
+"""
+Grammar Fuzzer module
+
+Produces random words of a context-free grammar without going through the ISLa solver.
+Used for specifications that do not come with a formula.
+"""
+
+Expansion = List[str]
+ParseTree = Tuple[str, List["ParseTree"]]
+
+
+class GrammarFuzzer:
+    """GrammarFuzzer class
+
+    Random derivation of grammar words guided by precomputed minimal derivation costs.
+    Every nonterminal knows the shortest word and the fewest expansion steps it can derive, so the fuzzer can
+    keep the derived word within a length budget and is guaranteed to terminate once the budget is spent.
+    """
+
+    def __init__(
+        self,
+        grammar: str | Grammar,
+        start_symbol: str = "<start>",
+        max_length: int = 32,
+    ) -> None:
+        """Initializes the fuzzer and precomputes the derivation costs
+
+        Parameters:
+        grammar (str | Grammar): The grammar in BNF format or already parsed
+        start_symbol (str): The nonterminal words are derived from (default "<start>")
+        max_length (int): The default upper bound for the length of generated words (default 32)
+        """
+        self.__start_symbol = start_symbol
+        self.__max_length = max_length
+        self.__bnf_grammar = (
+            grammar.to_isla_grammar()
+            if isinstance(grammar, Grammar)
+            else parse_bnf(grammar)
+        )
+        self.__grammar: Dict[str, List[Expansion]] = {
+            nonterminal: [
+                [symbol for symbol in RE_NONTERMINAL.split(expansion) if symbol != ""]
+                for expansion in expansions
+            ]
+            for nonterminal, expansions in self.__bnf_grammar.items()
+        }
+        self.__parser: EarleyParser | None = None
+        self.__membership: Dict[str, bool] = {}
+
+        self.__min_length = self.__compute_min_costs()
+        self.__max_lengths = self.__compute_max_lengths()
+        self.__cheapest_expansions: Dict[str, List[Expansion]] = {}
+
+        if math.isinf(self.__min_length[start_symbol][0]):
+            raise ValueError(f"{start_symbol} does not derive any word")
+
+    @property
+    def grammar(self) -> Dict[str, List[Expansion]]:
+        return self.__grammar
+
+    @property
+    def start_symbol(self) -> str:
+        return self.__start_symbol
+
+    @property
+    def terminal_characters(self) -> Set[str]:
+        """All characters that occur in terminals of the grammar"""
+        return {
+            character
+            for expansions in self.__grammar.values()
+            for expansion in expansions
+            for symbol in expansion
+            if not is_nonterminal(symbol)
+            for character in symbol
+        }
+
+    @property
+    def min_word_length(self) -> int:
+        return self.__min_length[self.__start_symbol][0]
+
+    def get_min_length(self, nonterminal: str) -> float:
+        """The length of the shortest word of a nonterminal, infinite if it does not derive any word"""
+        return self.__min_length[nonterminal][0]
+
+    @property
+    def max_word_length(self) -> float:
+        """The length of the longest word of the grammar, infinite for recursive grammars"""
+        return self.__max_lengths[self.__start_symbol]
+
+    def fuzz(
+        self,
+        min_length: int = 0,
+        max_length: int | None = None,
+        symbol: str | None = None,
+    ) -> str:
+        """Derives a random word of the grammar.
+
+        The length of the word is aimed at a random target between min_length and max_length.
+        If the grammar cannot derive a word within these bounds, the closest word that can be derived is returned.
+
+        Parameters:
+        min_length (int): Lower bound for the length of the word (default 0)
+        max_length (int | None): Upper bound for the length of the word (default None; use the fuzzer default)
+        symbol (str | None): The nonterminal the word is derived from (default None; the start symbol)
+
+        Returns:
+        str: The derived word
+        """
+        if max_length is None:
+            max_length = max(self.__max_length, min_length)
+        if symbol is None:
+            symbol = self.__start_symbol
+
+        lower = max(min_length, self.__min_length[symbol][0])
+        upper = min(max_length, self.__max_lengths[symbol])
+        target = random.randint(lower, int(upper)) if lower <= upper else lower
+
+        # Zero length cycles could keep the derivation busy forever, so the amount of random steps is bounded
+        remaining_random_steps = 10 * max(target, 1) + 100
+
+        result: List[str] = []
+        length = 0
+        # Symbols that still have to be derived, the next one is at the end of the list
+        pending: List[str] = []
+        # Bounds of the words the pending symbols can derive, infinite maxima are counted separately
+        # because subtracting them again would yield nan
+        pending_min = 0
+        pending_max = 0
+        pending_unbounded = 0
+
+        def push(expansion: Expansion, sign: int = 1) -> None:
+            nonlocal pending_min, pending_max, pending_unbounded
+            for symbol in expansion:
+                if is_nonterminal(symbol):
+                    pending_min += sign * self.__min_length[symbol][0]
+                    if math.isinf(self.__max_lengths[symbol]):
+                        pending_unbounded += sign
+                    else:
+                        pending_max += sign * self.__max_lengths[symbol]
+
+        pending.append(symbol)
+        push(pending)
+
+        while len(pending) > 0:
+            symbol = pending.pop()
+
+            if not is_nonterminal(symbol):
+                result.append(symbol)
+                length += len(symbol)
+                continue
+
+            push([symbol], -1)
+
+            if (
+                length + pending_min + self.__min_length[symbol][0] < target
+                and remaining_random_steps > 0
+            ):
+                remaining_random_steps -= 1
+                expansion = self.__choose_random_expansion(
+                    symbol,
+                    length + pending_min,
+                    math.inf if pending_unbounded > 0 else length + pending_max,
+                    target,
+                    upper,
+                )
+            else:
+                expansion = self.__choose_cheapest_expansion(symbol)
+
+            push(expansion)
+            pending.extend(reversed(expansion))
+
+        return "".join(result)
+
+    def contains(self, word: str) -> bool:
+        """Checks whether the word belongs to the language of the grammar, results are cached per word
+
+        Parameters:
+        word (str): The word to check
+
+        Returns:
+        bool: True if the grammar derives the word, False otherwise
+        """
+        if word not in self.__membership:
+            self.__membership[word] = self.parse(word) is not None
+
+        return self.__membership[word]
+
+    def parse(self, word: str) -> ParseTree | None:
+        """Returns a derivation tree of the word in the (symbol, children) format of ISLa parse trees
+
+        Parameters:
+        word (str): The word to parse
+
+        Returns:
+        ParseTree | None: The tree or None if the grammar does not derive the word
+        """
+        if self.__parser is None:
+            self.__parser = EarleyParser(
+                self.__bnf_grammar, start_symbol=self.__start_symbol
+            )
+
+        try:
+            return next(self.__parser.parse(word))
+        except SyntaxError:
+            return None
+
+    def __choose_random_expansion(
+        self,
+        nonterminal: str,
+        fixed_min: int,
+        fixed_max: float,
+        target: int,
+        upper: float,
+    ) -> Expansion:
+        # Keep only expansions after which the target length is still reachable without exceeding the budget
+        candidates = [
+            expansion
+            for expansion in self.__grammar[nonterminal]
+            if not math.isinf(self.__expansion_min_length(expansion))
+            and fixed_min + self.__expansion_min_length(expansion) <= upper
+            and fixed_max + self.__expansion_max_length(expansion) >= target
+        ]
+
+        if len(candidates) == 0:
+            return self.__choose_cheapest_expansion(nonterminal)
+
+        return random.choice(candidates)
+
+    def __choose_cheapest_expansion(self, nonterminal: str) -> Expansion:
+        cheapest = self.__cheapest_expansions.get(nonterminal)
+        if cheapest is None:
+            cost = self.__min_length[nonterminal]
+            cheapest = [
+                expansion
+                for expansion in self.__grammar[nonterminal]
+                if self.__expansion_cost(expansion) == cost
+            ]
+            self.__cheapest_expansions[nonterminal] = cheapest
+
+        # Choosing among all equally cheap expansions avoids always closing words with the same characters
+        return random.choice(cheapest)
+
+    def __expansion_min_length(self, expansion: Expansion) -> float:
+        return self.__expansion_cost(expansion)[0]
+
+    def __expansion_max_length(self, expansion: Expansion) -> float:
+        return sum(
+            self.__max_lengths[symbol] if is_nonterminal(symbol) else len(symbol)
+            for symbol in expansion
+        )
+
+    def __expansion_cost(
+        self,
+        expansion: Expansion,
+        costs: Dict[str, Tuple[float, float]] | None = None,
+    ) -> Tuple[float, float]:
+        costs = self.__min_length if costs is None else costs
+        length = 0
+        steps = 1
+        for symbol in expansion:
+            if is_nonterminal(symbol):
+                symbol_length, symbol_steps = costs[symbol]
+                length += symbol_length
+                steps += symbol_steps
+            else:
+                length += len(symbol)
+
+        return length, steps
+
+    def __compute_min_costs(self) -> Dict[str, Tuple[float, float]]:
+        """Fixpoint of the shortest derivable word and the fewest expansion steps per nonterminal"""
+        costs: Dict[str, Tuple[float, float]] = {
+            nonterminal: (math.inf, math.inf) for nonterminal in self.__grammar
+        }
+
+        changed = True
+        while changed:
+            changed = False
+            for nonterminal, expansions in self.__grammar.items():
+                cost = min(
+                    self.__expansion_cost(expansion, costs) for expansion in expansions
+                )
+                if cost < costs[nonterminal]:
+                    costs[nonterminal] = cost
+                    changed = True
+
+        return costs
+
+    def __compute_max_lengths(self) -> Dict[str, float]:
+        """Fixpoint of the longest derivable word per nonterminal, infinite if it lies on a growing cycle"""
+        productive = {
+            nonterminal
+            for nonterminal, cost in self.__min_length.items()
+            if not math.isinf(cost[0])
+        }
+        lengths: Dict[str, float] = {nonterminal: 0 for nonterminal in productive}
+
+        def expansion_length(expansion: Expansion) -> float | None:
+            length = 0
+            for symbol in expansion:
+                if is_nonterminal(symbol):
+                    if symbol not in productive:
+                        return None
+                    length += lengths[symbol]
+                else:
+                    length += len(symbol)
+            return length
+
+        rounds = 0
+        changed = True
+        while changed:
+            changed = False
+            rounds += 1
+            for nonterminal in productive:
+                candidates = [
+                    length
+                    for length in map(expansion_length, self.__grammar[nonterminal])
+                    if length is not None
+                ]
+                length = max(candidates)
+                if length > lengths[nonterminal]:
+                    # Longest words only keep growing after all acyclic paths were explored if there is a cycle
+                    lengths[nonterminal] = (
+                        math.inf if rounds > len(productive) else length
+                    )
+                    changed = True
+
+        for nonterminal in self.__grammar:
+            lengths.setdefault(nonterminal, 0)
+
+        return lengths
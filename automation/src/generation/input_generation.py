@@ -1,11 +1,34 @@
-import re
+import math
+import multiprocessing
+import os
+import random
 import time
 
+from concurrent.futures import Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
 from enum import Enum
 from isla.solver import ISLaSolver
-from typing import Dict, List, Set
+from itertools import islice
+from typing import Callable, Dict, Iterator, List, Set, Tuple
 
-from src.generation.mutation import ValueMutator
+from src.generation.boundary_values import BoundaryValueGenerator
+from src.generation.budget import GenerationBudget
+from src.generation.calendar_generation import CalendarGenerator
+from src.generation.corpus import ValueCorpus
+from src.generation.finite_language import FiniteLanguage
+from src.generation.grammar_fuzzer import GrammarFuzzer
+from src.generation.interval_solver import IntervalSolver
+from src.generation.invalid_construction import InvalidValueConstructor
+from src.generation.mutation import BatchValueMutator, StructuralMutator
+from src.generation.satisfiability import Satisfiability, SatisfiabilityChecker
+from src.generation.solver_cache import SolverCache
+from src.generation.solver_tuning import SolverTuner
+from src.utility.grammar import Grammar, optimize_specification
+from src.utility.helpers import get_specification_hash
+
+
+# Number of duplicates in a row after which a unique stream is considered exhausted
+MAX_CONSECUTIVE_DUPLICATES = 100
 
 
 class ValidityEnum(str, Enum):
@@ -34,7 +57,245 @@ class GeneratedValue:
         return f"(validity: {self.validity}, value: {self.value})"
 
 
+ValueSource = Callable[[int], GeneratedValue | None]
+
+
+class GenerationRequest:
+    def __init__(
+        self,
+        grammar: str,
+        formula: str | None = None,
+        validity: ValidityEnum = ValidityEnum.VALID,
+        amount: int = 1,
+        timeout_seconds: int = 60,
+    ) -> None:
+        self.grammar = grammar
+        self.formula = formula
+        self.validity = validity
+        self.amount = amount
+        self.timeout_seconds = timeout_seconds
+
+
 class InputGenerator:
+    def __init__(
+        self,
+        solver_cache_size: int = 32,
+        workers: int | str = 1,
+        corpus_path: str | None = None,
+        fresh_value_ratio: float = 0.1,
+        budget: GenerationBudget | None = None,
+        solver_parameter_path: str | None = None,
+        grammars: Dict[str, Grammar] | None = None,
+    ) -> None:
+        """Initializes the input generator
+
+        Parameters:
+        solver_cache_size (int): The maximum number of live solvers kept in the cache (default 32)
+        workers (int | str): The number of processes used by generate_inputs_in_parallel, "all" uses all cores (default 1; serial)
+        corpus_path (str | None): Path to a value corpus database that is read before solving (default None; no corpus)
+        fresh_value_ratio (float): Share of values that are solved again although the corpus holds enough, for diversity (default 0.1)
+        budget (GenerationBudget | None): Shared time budget that determines the timeouts of all requests (default None; fixed timeouts)
+        solver_parameter_path (str | None): Path to a JSON file with the tuned solver options per specification, new specifications are tuned on first use (default None; ISLa defaults)
+        grammars (Dict[str, Grammar] | None): Already parsed grammars by their BNF text, e.g. of a compiled specification (default None)
+        """
+        self.__solver_parameter_path = solver_parameter_path
+        self.__solver_cache = SolverCache(
+            solver_cache_size,
+            (
+                SolverTuner(solver_parameter_path)
+                if solver_parameter_path is not None
+                else None
+            ),
+        )
+        self.__grammars: Dict[str, Grammar | None] = {
+            get_specification_hash(text): grammar
+            for text, grammar in (grammars or {}).items()
+        }
+        self.__optimized_grammars: Dict[str, str] = {}
+        self.__grammar_fuzzers: Dict[str, GrammarFuzzer | None] = {}
+        self.__interval_solvers: Dict[str, IntervalSolver | None] = {}
+        self.__calendar_generators: Dict[str, CalendarGenerator | None] = {}
+        self.__boundary_values: Dict[str, List[str]] = {}
+        self.__satisfiability_checker = SatisfiabilityChecker()
+        self.__finite_languages: Dict[str, FiniteLanguage | None] = {}
+        self.__finite_partitions: Dict[str, Tuple[List[str], List[str]] | None] = {}
+        self.__corpus = ValueCorpus(corpus_path) if corpus_path is not None else None
+        self.__fresh_value_ratio = fresh_value_ratio
+        self.__budget = budget
+        self.__workers = (
+            (os.cpu_count() or 1) if workers == "all" else max(1, int(workers))
+        )
+        self.__executor: ProcessPoolExecutor | None = None
+        # Number of values requested from ISLa or a search, the other values come from native generators
+        self.__solver_runs = 0
+
+    @property
+    def solver_cache(self) -> SolverCache:
+        return self.__solver_cache
+
+    @property
+    def solver_runs(self) -> int:
+        return self.__solver_runs
+
+    @property
+    def workers(self) -> int:
+        return self.__workers
+
+    @property
+    def budget(self) -> GenerationBudget | None:
+        return self.__budget
+
+    def get_verdict(
+        self, grammar: str, formula: str | None, validity: ValidityEnum
+    ) -> Satisfiability:
+        """Returns whether the specification has values of a validity, as far as known, see SatisfiabilityChecker"""
+        return self.__satisfiability_checker.get_verdict(
+            self.__get_optimized_grammar(grammar, formula), formula, validity.value
+        )
+
+    def generate_inputs_in_parallel(
+        self, requests: List[GenerationRequest]
+    ) -> List[List[GeneratedValue]]:
+        """Generates values for independent requests concurrently in a process pool.
+
+        Falls back to serial generation if only one worker is configured. A request that does not finish
+        within its timeout for every requested value yields indeterminate values, exactly like a solver timeout
+        on the serial path.
+
+        Parameters:
+        requests (List[GenerationRequest]): The requests to generate values for
+
+        Returns:
+        List[List[GeneratedValue]]: The generated values in the order of the requests
+        """
+        if self.__workers <= 1 or len(requests) <= 1:
+            return [
+                self.generate_inputs(
+                    r.grammar, r.formula, r.validity, r.amount, r.timeout_seconds
+                )
+                for r in requests
+            ]
+
+        stored_values = [
+            self.__get_stored_values(r.grammar, r.formula, r.validity, r.amount)
+            for r in requests
+        ]
+        missing_requests = [
+            GenerationRequest(
+                r.grammar,
+                r.formula,
+                r.validity,
+                r.amount - len(stored),
+                r.timeout_seconds,
+            )
+            for r, stored in zip(requests, stored_values)
+        ]
+        fresh_values = self.__generate_in_process_pool(missing_requests)
+
+        for request, values in zip(missing_requests, fresh_values):
+            self.__store_values(request.grammar, request.formula, values)
+
+        return [
+            stored + fresh for stored, fresh in zip(stored_values, fresh_values)
+        ]
+
+    def __generate_in_process_pool(
+        self, requests: List[GenerationRequest]
+    ) -> List[List[GeneratedValue]]:
+        executor = self.__get_executor()
+        timeouts = [self.__get_timeout(r) for r in requests]
+        results: List[List[GeneratedValue]] = [
+            [GeneratedValue("", ValidityEnum.INDETERMINATE)] * r.amount
+            for r in requests
+        ]
+
+        # Empty requests, unsatisfiable specifications and fields without budget keep indeterminate values
+        futures: Dict[Future, int] = {
+            executor.submit(
+                _generate_in_worker,
+                r.grammar,
+                r.formula,
+                r.validity,
+                r.amount,
+                timeout,
+                self.__solver_parameter_path,
+            ): index
+            for index, (r, timeout) in enumerate(zip(requests, timeouts))
+            if r.amount > 0
+            and timeout > 0
+            and not self.__is_unsatisfiable(r.grammar, r.formula, r.validity)
+        }
+        if len(futures) == 0:
+            return results
+
+        # Every value gets its own solver timeout and the workers take the requests in rounds, so all requests
+        # share one deadline, plus a grace period for the process round trips
+        rounds = math.ceil(len(futures) / self.__workers)
+        task_timeouts = {
+            i: timeouts[i] * max(1, requests[i].amount) for i in futures.values()
+        }
+        deadline = rounds * max(task_timeouts.values()) + 5
+        done, not_done = wait(futures.keys(), timeout=deadline)
+
+        for future in done:
+            request = requests[futures[future]]
+            try:
+                values, seconds, solved, verdicts = future.result()
+                self.__record(request, seconds, values, solved)
+                for validity, verdict in verdicts.items():
+                    if verdict != Satisfiability.UNKNOWN:
+                        self.__record_verdict(
+                            self.__get_optimized_grammar(
+                                request.grammar, request.formula
+                            ),
+                            request.formula,
+                            validity,
+                            verdict,
+                        )
+                self.__update_budget_verdicts(request.grammar, request.formula)
+                results[futures[future]] = values
+            except BrokenProcessPool as e:
+                print(e)
+                self.shutdown()
+            except Exception as e:
+                print(e)
+
+        if len(not_done) > 0:
+            print(f"value generation timed out after {deadline} seconds")
+            for future in not_done:
+                self.__record(
+                    requests[futures[future]], task_timeouts[futures[future]], []
+                )
+
+            # Cancelling does not stop a running worker, so the stragglers are stopped together with the pool
+            self.shutdown(terminate=True)
+
+        return results
+
+    def shutdown(self, terminate: bool = False) -> None:
+        """Stops the worker processes if there are any
+
+        Parameters:
+        terminate (bool): Whether running tasks are aborted instead of finished in the background (default False)
+        """
+        if self.__executor is not None:
+            # The executor has no public way to abort running tasks, so its processes are terminated directly
+            processes = list((self.__executor._processes or {}).values())
+            self.__executor.shutdown(wait=False, cancel_futures=True)
+            self.__executor = None
+            if terminate:
+                for process in processes:
+                    process.terminate()
+
+    def __get_executor(self) -> ProcessPoolExecutor:
+        if self.__executor is None:
+            # Spawn instead of fork, the parent process runs selenium threads that must not be copied
+            self.__executor = ProcessPoolExecutor(
+                max_workers=self.__workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self.__executor
+
     def generate_inputs(
         self,
         grammar: str,
@@ -43,135 +304,671 @@ class InputGenerator:
         amount: int = 1,
         timeout_seconds: int = 60,
     ) -> List[GeneratedValue]:
+        stored_values = self.__get_stored_values(grammar, formula, validity, amount)
+        fresh_values = list(
+            islice(
+                self.__stream_fresh_inputs(grammar, formula, validity, timeout_seconds),
+                max(0, amount - len(stored_values)),
+            )
+        )
+        self.__store_values(grammar, formula, fresh_values)
+
+        return stored_values + fresh_values
+
+    def stream_inputs(
+        self,
+        grammar: str,
+        formula: str | None = None,
+        validity: ValidityEnum = ValidityEnum.VALID,
+        timeout_seconds: int = 60,
+        unique: bool = False,
+    ) -> Iterator[GeneratedValue]:
+        """Lazily generates values for a specification, one per step of the iteration.
+
+        All values of a stream come from the same live solver or fuzzer, so pulling another value costs no setup.
+        Without unique, exhausted solvers are restarted and the stream never ends. With unique, the stream ends
+        once the specification has no new values left. Generated values are added to the corpus.
+
+        Parameters:
+        grammar (str): The grammar in BNF format
+        formula (str | None): The ISLa formula (default None)
+        validity (ValidityEnum): The requested validity (default VALID)
+        timeout_seconds (int): The timeout for every single value (default 60)
+        unique (bool): Whether values the stream produced before are skipped (default False)
+
+        Returns:
+        Iterator[GeneratedValue]: The stream of generated values
+        """
+        seen: Set[str] = set()
+        duplicates = 0
+
+        for value in self.__stream_fresh_inputs(
+            grammar, formula, validity, timeout_seconds, not unique
+        ):
+            if unique and value.validity != ValidityEnum.INDETERMINATE:
+                if value.value in seen:
+                    # Random sources never run dry, so many duplicates in a row mean the language is used up
+                    duplicates += 1
+                    if duplicates >= MAX_CONSECUTIVE_DUPLICATES:
+                        return
+                    continue
+
+                seen.add(value.value)
+                duplicates = 0
+
+            self.__store_values(grammar, formula, [value])
+            yield value
+
+    def __stream_fresh_inputs(
+        self,
+        grammar: str,
+        formula: str | None,
+        validity: ValidityEnum,
+        timeout_seconds: int,
+        restart_on_exhaustion: bool = True,
+    ) -> Iterator[GeneratedValue]:
+        request = GenerationRequest(grammar, formula, validity, 1, timeout_seconds)
+        grammar = self.__get_optimized_grammar(grammar, formula)
         if validity == ValidityEnum.VALID:
-            return self.__generate_valid_inputs(
-                grammar, formula, amount, timeout_seconds
+            next_value = self.__create_valid_value_source(
+                grammar, formula, restart_on_exhaustion
             )
         else:
-            return self.__generate_invalid_inputs(
-                grammar, formula, amount, timeout_seconds
+            next_value = self.__create_invalid_value_source(
+                grammar, formula, restart_on_exhaustion
+            )
+
+        while True:
+            # Known unsatisfiable specifications do not cost any solver time
+            if self.__is_unsatisfiable(request.grammar, formula, validity):
+                if not restart_on_exhaustion:
+                    return
+                yield GeneratedValue("", ValidityEnum.INDETERMINATE)
+                continue
+
+            # With a budget every value gets its own adaptive timeout and its time is booked on the field
+            timeout = self.__get_timeout(request)
+            if timeout <= 0:
+                yield GeneratedValue("", ValidityEnum.INDETERMINATE)
+                continue
+
+            start_time = time.perf_counter()
+            solver_runs = self.__solver_runs
+            value = next_value(timeout)
+            if value is None:
+                return
+
+            self.__record(
+                request,
+                time.perf_counter() - start_time,
+                [value],
+                self.__solver_runs != solver_runs,
             )
+            self.__update_budget_verdicts(request.grammar, formula)
+            yield value
+
+    def __is_unsatisfiable(
+        self, grammar: str, formula: str | None, validity: ValidityEnum
+    ) -> bool:
+        """Checks the verdict of a requested specification, i.e. with the grammar before optimisation"""
+        self.__update_budget_verdicts(grammar, formula)
+        return self.get_verdict(grammar, formula, validity) == Satisfiability.UNSAT
 
-    def __generate_valid_inputs(
+    def __record_verdict(
         self,
         grammar: str,
         formula: str | None,
-        amount: int = 1,
-        timeout_seconds: int = 60,
+        validity: ValidityEnum,
+        verdict: Satisfiability,
+    ) -> None:
+        """Stores a verdict of a value source, i.e. with the optimised grammar the source works on"""
+        self.__satisfiability_checker.record(grammar, formula, validity.value, verdict)
+
+    def __update_budget_verdicts(self, grammar: str, formula: str | None) -> None:
+        """Shows the verdicts of the optimised grammar on the budget fields of the requested grammar"""
+        if self.__budget is None:
+            return
+
+        for validity in [ValidityEnum.VALID, ValidityEnum.INVALID]:
+            self.__budget.set_verdict(
+                self.__budget.get_key(grammar, formula, validity.value),
+                self.get_verdict(grammar, formula, validity).value,
+            )
+
+    def __get_timeout(self, request: GenerationRequest) -> int:
+        if self.__budget is None:
+            return request.timeout_seconds
+
+        key = self.__budget.get_key(
+            request.grammar, request.formula, request.validity.value
+        )
+        return self.__budget.get_timeout(key, request.timeout_seconds)
+
+    def __record(
+        self,
+        request: GenerationRequest,
+        seconds: float,
+        values: List[GeneratedValue],
+        solved: bool = True,
+    ) -> None:
+        if self.__budget is None:
+            return
+
+        key = self.__budget.get_key(
+            request.grammar, request.formula, request.validity.value
+        )
+        timed_out = len(values) == 0 or any(
+            v.validity == ValidityEnum.INDETERMINATE for v in values
+        )
+        self.__budget.record(key, seconds, timed_out, max(1, len(values)), solved)
+
+    def __get_stored_values(
+        self,
+        grammar: str,
+        formula: str | None,
+        validity: ValidityEnum,
+        amount: int,
     ) -> List[GeneratedValue]:
-        values: List[GeneratedValue] = []
-        if amount < 1:
+        if self.__corpus is None or amount < 1:
             return []
 
-        try:
-            solver = ISLaSolver(
+        # Some values are always solved again so that the corpus keeps growing more diverse
+        fresh = sum(random.random() < self.__fresh_value_ratio for _ in range(amount))
+        stored = self.__corpus.sample(grammar, formula, validity.value, amount - fresh)
+        return [GeneratedValue(value, validity) for value in stored]
+
+    def __store_values(
+        self, grammar: str, formula: str | None, values: List[GeneratedValue]
+    ) -> None:
+        if self.__corpus is None:
+            return
+
+        for validity in [ValidityEnum.VALID, ValidityEnum.INVALID]:
+            self.__corpus.add(
                 grammar,
                 formula,
-                timeout_seconds=timeout_seconds,
+                validity.value,
+                [v.value for v in values if v.validity == validity],
+            )
+
+    def __create_valid_value_source(
+        self, grammar: str, formula: str | None, restart_on_exhaustion: bool = True
+    ) -> ValueSource:
+        calendar_generator = self.__get_calendar_generator(grammar, formula)
+        if calendar_generator is not None:
+            return self.__create_calendar_value_source(
+                calendar_generator, ValidityEnum.VALID
+            )
+
+        partition = self.__get_finite_partition(grammar, formula)
+        if partition is not None:
+            return self.__create_finite_value_source(
+                partition[0], ValidityEnum.VALID, restart_on_exhaustion
+            )
+
+        if formula is None:
+            fuzzer = self.__get_grammar_fuzzer(grammar)
+            if fuzzer is not None:
+                return lambda _: GeneratedValue(fuzzer.fuzz(), ValidityEnum.VALID)
+
+        solve = self.__create_solver_source(
+            grammar,
+            formula,
+            restart_on_exhaustion,
+            lambda verdict: self.__record_verdict(
+                grammar, formula, ValidityEnum.VALID, verdict
+            ),
+        )
+        return lambda timeout_seconds: self.__sample_from_interval(
+            grammar, formula, ValidityEnum.VALID
+        ) or solve(timeout_seconds)
+
+    def __get_calendar_generator(
+        self, grammar: str, formula: str | None
+    ) -> CalendarGenerator | None:
+        """Returns the native generator if the specification is a pre-built calendar specification with bounds"""
+        key = get_specification_hash(grammar, formula)
+        if key not in self.__calendar_generators:
+            self.__calendar_generators[key] = CalendarGenerator.from_specification(
+                grammar, formula
+            )
+
+        return self.__calendar_generators[key]
+
+    def __create_calendar_value_source(
+        self, calendar_generator: CalendarGenerator, validity: ValidityEnum
+    ) -> ValueSource:
+        def next_value(_: int) -> GeneratedValue:
+            value = (
+                calendar_generator.sample_valid()
+                if validity == ValidityEnum.VALID
+                else calendar_generator.sample_invalid()
             )
-        except Exception as e:
-            print("Error creating solver:", e)
-            return [GeneratedValue("", ValidityEnum.INDETERMINATE)] * amount
+            if value is None:
+                print("no solution exists for the given specification")
+                return GeneratedValue("", ValidityEnum.INDETERMINATE)
 
-        values = []
-        for _ in range(amount):
+            return GeneratedValue(value, validity)
+
+        return next_value
+
+    def __get_finite_partition(
+        self, grammar: str, formula: str | None
+    ) -> Tuple[List[str], List[str]] | None:
+        """Returns the valid and invalid words of a grammar with a small finite language
+
+        Returns:
+        Tuple[List[str], List[str]] | None: The words or None if the language is infinite, too large or cannot be evaluated
+        """
+        key = get_specification_hash(grammar, formula)
+        if key in self.__finite_partitions:
+            return self.__finite_partitions[key]
+
+        language = self.__get_finite_language(grammar)
+        partition = None
+        if language is not None:
             try:
-                str_value = str(solver.solve())
-                values.append(GeneratedValue(str_value, ValidityEnum.VALID))
-            except TimeoutError as te:
-                print(f"value generation timed out after {te} seconds")
-                values.append(GeneratedValue("", ValidityEnum.INDETERMINATE))
+                partition = language.split(self.__get_formula_evaluator(grammar, formula))
             except Exception as e:
-                print(e)
-                values.append(GeneratedValue("", ValidityEnum.INDETERMINATE))
+                print("Error evaluating formula:", e)
+
+        self.__finite_partitions[key] = partition
+        if partition is not None and formula is not None:
+            for validity, words in zip(
+                [ValidityEnum.VALID, ValidityEnum.INVALID], partition
+            ):
+                self.__record_verdict(
+                    grammar,
+                    formula,
+                    validity,
+                    Satisfiability.SAT if len(words) > 0 else Satisfiability.UNSAT,
+                )
+
+        return partition
+
+    def __get_finite_language(self, grammar: str) -> FiniteLanguage | None:
+        key = get_specification_hash(grammar)
+        if key not in self.__finite_languages:
+            fuzzer = self.__get_grammar_fuzzer(grammar)
+            self.__finite_languages[key] = (
+                FiniteLanguage.from_fuzzer(fuzzer) if fuzzer is not None else None
+            )
 
-        return values
+        return self.__finite_languages[key]
 
-    def __generate_invalid_inputs(
+    def __get_formula_evaluator(
+        self, grammar: str, formula: str | None
+    ) -> Callable[[str], bool]:
+        if formula is None:
+            return lambda _: True
+
+        if formula not in self.__interval_solvers:
+            self.__interval_solvers[formula] = IntervalSolver.from_formula(formula)
+        interval_solver = self.__interval_solvers[formula]
+        if interval_solver is not None:
+            return interval_solver.contains
+
+        solver = self.__solver_cache.get_solver(grammar, formula)
+        return lambda word: bool(solver.check(word))
+
+    def __create_finite_value_source(
+        self, words: List[str], validity: ValidityEnum, restart_on_exhaustion: bool
+    ) -> ValueSource:
+        if not restart_on_exhaustion:
+            # Each word once, in random order
+            remaining = random.sample(words, len(words))
+            return lambda _: (
+                GeneratedValue(remaining.pop(), validity)
+                if len(remaining) > 0
+                else None
+            )
+
+        def next_value(_: int) -> GeneratedValue:
+            if len(words) == 0:
+                print("no solution exists for the given specification")
+                return GeneratedValue("", ValidityEnum.INDETERMINATE)
+
+            return GeneratedValue(random.choice(words), validity)
+
+        return next_value
+
+    def __sample_from_interval(
+        self, grammar: str, formula: str | None, validity: ValidityEnum
+    ) -> GeneratedValue | None:
+        """Samples a value without ISLa if the formula only bounds the integer value or the length of the input
+
+        Returns:
+        GeneratedValue | None: The value or None if the formula has to be left to ISLa
+        """
+        if formula is None:
+            return None
+
+        if formula not in self.__interval_solvers:
+            self.__interval_solvers[formula] = IntervalSolver.from_formula(formula)
+        interval_solver = self.__interval_solvers[formula]
+        if interval_solver is None:
+            return None
+
+        fuzzer = self.__get_grammar_fuzzer(grammar)
+        if fuzzer is None:
+            return None
+
+        value = (
+            interval_solver.sample_valid(fuzzer)
+            if validity == ValidityEnum.VALID
+            else interval_solver.sample_invalid(fuzzer)
+        )
+        return GeneratedValue(value, validity) if value is not None else None
+
+    def __get_grammar_fuzzer(self, grammar: str) -> GrammarFuzzer | None:
+        """Returns the fuzzer for a grammar or None if the grammar has to be left to ISLa"""
+        key = get_specification_hash(grammar)
+        if key not in self.__grammar_fuzzers:
+            structured_grammar = self.__get_grammar(grammar)
+            try:
+                self.__grammar_fuzzers[key] = GrammarFuzzer(
+                    structured_grammar if structured_grammar is not None else grammar
+                )
+            except Exception as e:
+                print("Error creating grammar fuzzer:", e)
+                self.__grammar_fuzzers[key] = None
+
+        return self.__grammar_fuzzers[key]
+
+    def __create_solver_source(
         self,
         grammar: str,
         formula: str | None,
-        amount: int = 1,
-        timeout_seconds: int = 60,
-    ) -> List[GeneratedValue]:
-        if formula is not None:
-            negated_formula = f"not ({formula})"
-            values = self.__generate_valid_inputs(
-                grammar, negated_formula, amount, timeout_seconds
-            )
-
-            # Return the values but change the validity enum to invalid if it was valid before and keep as indeterminate otherwise
-            return list(
-                map(
-                    lambda v: GeneratedValue(
-                        v.value,
-                        (
-                            ValidityEnum.INVALID
-                            if v.validity == ValidityEnum.VALID
-                            else ValidityEnum.INDETERMINATE
-                        ),
-                    ),
-                    values,
-                )
+        restart_on_exhaustion: bool = True,
+        record_verdict: Callable[[Satisfiability], None] | None = None,
+    ) -> ValueSource:
+        """Returns a source of values that keeps using one live solver of the cache.
+
+        The source returns None once the solver has no further solutions, unless it is restarted on exhaustion.
+        Whether the formula has solutions at all is passed to record_verdict as soon as it is known.
+        """
+        solver: ISLaSolver | None = None
+
+        def next_value(timeout_seconds: int) -> GeneratedValue | None:
+            nonlocal solver
+            self.__solver_runs += 1
+
+            for _ in range(2):
+                if solver is None:
+                    try:
+                        solver = self.__solver_cache.get_solver(
+                            grammar, formula, timeout_seconds
+                        )
+                    except Exception as e:
+                        print("Error creating solver:", e)
+                        return GeneratedValue("", ValidityEnum.INDETERMINATE)
+                else:
+                    SolverCache.reset_timeout(solver, timeout_seconds)
+
+                try:
+                    str_value = str(solver.solve())
+                    if record_verdict is not None:
+                        record_verdict(Satisfiability.SAT)
+                    return GeneratedValue(str_value, ValidityEnum.VALID)
+                except StopIteration:
+                    # The solver ran out of solutions, so we start over with a fresh one
+                    self.__solver_cache.invalidate(grammar, formula)
+                    solver = None
+                    if not restart_on_exhaustion:
+                        return None
+                except TimeoutError as te:
+                    print(f"value generation timed out after {te} seconds")
+                    return GeneratedValue("", ValidityEnum.INDETERMINATE)
+                except Exception as e:
+                    print(e)
+                    self.__solver_cache.invalidate(grammar, formula)
+                    solver = None
+                    return GeneratedValue("", ValidityEnum.INDETERMINATE)
+
+            # Even a fresh solver did not find a single solution
+            print("no solution exists for the given specification")
+            if record_verdict is not None:
+                record_verdict(Satisfiability.UNSAT)
+            return GeneratedValue("", ValidityEnum.INDETERMINATE)
+
+        return next_value
+
+    def __create_invalid_value_source(
+        self, grammar: str, formula: str | None, restart_on_exhaustion: bool = True
+    ) -> ValueSource:
+        if formula is None:
+            return self.__create_invalid_value_source_for_non_existent_formula(
+                grammar
+            )
+
+        calendar_generator = self.__get_calendar_generator(grammar, formula)
+        if calendar_generator is not None:
+            return self.__create_calendar_value_source(
+                calendar_generator, ValidityEnum.INVALID
             )
 
-        return self.__generate_invalid_values_for_non_existent_formula(
-            grammar, amount, timeout_seconds
+        # Within a finite language the invalid values are known exactly, no negated formula has to be solved
+        partition = self.__get_finite_partition(grammar, formula)
+        if partition is not None:
+            return self.__create_finite_value_source(
+                partition[1], ValidityEnum.INVALID, restart_on_exhaustion
+            )
+
+        negated_formula = f"not ({formula})"
+        solve = self.__create_solver_source(
+            grammar,
+            negated_formula,
+            restart_on_exhaustion,
+            lambda verdict: self.__record_verdict(
+                grammar, formula, ValidityEnum.INVALID, verdict
+            ),
         )
 
-    def __generate_invalid_values_for_non_existent_formula(
-        self, grammar: str, amount: int = 1, timeout_seconds: int = 60
-    ) -> List[GeneratedValue]:
-        values: List[GeneratedValue] = []
+        def next_value(timeout_seconds: int) -> GeneratedValue | None:
+            boundary_value = self.__next_boundary_value(grammar, formula)
+            if boundary_value is not None:
+                return boundary_value
+
+            interval_value = self.__sample_from_interval(
+                grammar, formula, ValidityEnum.INVALID
+            )
+            if interval_value is not None:
+                return interval_value
+
+            value = solve(timeout_seconds)
+            if value is None:
+                return None
+
+            # Change the validity enum to invalid if it was valid before and keep as indeterminate otherwise
+            return GeneratedValue(
+                value.value,
+                (
+                    ValidityEnum.INVALID
+                    if value.validity == ValidityEnum.VALID
+                    else ValidityEnum.INDETERMINATE
+                ),
+            )
+
+        return next_value
+
+    def __next_boundary_value(
+        self, grammar: str, formula: str
+    ) -> GeneratedValue | None:
+        """Returns the next invalid value at the bounds of the formula that was not handed out yet
+
+        Returns:
+        GeneratedValue | None: The value or None once all boundary values were used
+        """
+        key = get_specification_hash(grammar, formula)
+        if key not in self.__boundary_values:
+            boundary_value_generator = BoundaryValueGenerator.from_formula(formula)
+            fuzzer = self.__get_grammar_fuzzer(grammar)
+            self.__boundary_values[key] = (
+                boundary_value_generator.get_invalid_values(fuzzer)
+                if boundary_value_generator is not None and fuzzer is not None
+                else []
+            )
+
+        values = self.__boundary_values[key]
+        if len(values) == 0:
+            return None
+
+        return GeneratedValue(values.pop(0), ValidityEnum.INVALID)
+
+    def __create_invalid_value_source_for_non_existent_formula(
+        self, grammar: str
+    ) -> ValueSource:
         grammar_terminals = self.__get_terminal_characters_from_grammar(grammar)
+        fuzzer = self.__get_grammar_fuzzer(grammar)
+        constructor = (
+            InvalidValueConstructor(fuzzer, grammar_terminals)
+            if fuzzer is not None
+            else None
+        )
+
+        def next_value(timeout_seconds: int) -> GeneratedValue:
+            # Constructed values are invalid for sure, searching is only needed if the grammar rules out every construction
+            constructed_value = (
+                constructor.construct() if constructor is not None else None
+            )
+            if constructed_value is not None:
+                return GeneratedValue(constructed_value, ValidityEnum.INVALID)
 
-        for _ in range(amount):
             try:
-                invalid_value = self.__look_for_value_not_in_grammar(
-                    grammar, grammar_terminals, timeout_seconds
+                return self.__look_for_value_not_in_grammar(
+                    grammar, grammar_terminals, fuzzer, timeout_seconds
                 )
-                values.append(invalid_value)
             except TimeoutError as te:
                 print(f"value generation timed out after {te} seconds")
-                values.append(GeneratedValue("", ValidityEnum.INDETERMINATE))
             except Exception as e:
                 print(e)
-                values.append(GeneratedValue("", ValidityEnum.INDETERMINATE))
 
-        return values
+            return GeneratedValue("", ValidityEnum.INDETERMINATE)
+
+        return next_value
 
     def __look_for_value_not_in_grammar(
-        self, grammar: str, grammar_terminals: Set[str], timeout_seconds: int = 60
-    ) -> None:
+        self,
+        grammar: str,
+        grammar_terminals: Set[str],
+        fuzzer: GrammarFuzzer | None = None,
+        timeout_seconds: int = 60,
+    ) -> GeneratedValue:
+        self.__solver_runs += 1
         start_time = int(time.time())
-        last_value = None
+        structural_mutator = StructuralMutator(fuzzer, grammar_terminals)
+        batch_mutator = BatchValueMutator(grammar_terminals)
+        solver: ISLaSolver | None = None
 
-        while int(time.time()) - start_time < timeout_seconds:
-            solver = ISLaSolver(
-                grammar,
-                timeout_seconds=timeout_seconds,
+        def in_grammar(value: str) -> bool:
+            # A batch holds many mutants, so the timeout is checked for every single one
+            if int(time.time()) - start_time >= timeout_seconds:
+                raise TimeoutError(timeout_seconds)
+
+            # The fuzzer caches membership per value, so mutants that were checked before cost nothing
+            return (
+                fuzzer.contains(value)
+                if fuzzer is not None
+                else bool(solver.check(value))
             )
 
-            str_value = str(solver.solve())
-            mutator = ValueMutator(str_value, grammar_terminals)
-            last_value = mutator.mutate(last_value)
+        while int(time.time()) - start_time < timeout_seconds:
+            if fuzzer is not None:
+                str_value = fuzzer.fuzz()
+                tree = fuzzer.parse(str_value)
+            else:
+                solver = self.__solver_cache.get_solver(grammar, None, timeout_seconds)
+
+                try:
+                    solution = solver.solve()
+                except StopIteration:
+                    self.__solver_cache.invalidate(grammar, None)
+                    continue
+                str_value = str(solution)
+                tree = solution.to_parse_tree()
 
-            if not solver.check(last_value):
-                value = GeneratedValue(last_value, ValidityEnum.INVALID)
-                return value
+            # Mutating the derivation tree breaks grammar rules on purpose, characters are only mutated blindly
+            # if none of the structural mutants left the grammar
+            value = (
+                structural_mutator.find_invalid(tree, in_grammar)
+                if tree is not None
+                else None
+            ) or batch_mutator.find_invalid(str_value, in_grammar)
+            if value is not None:
+                return GeneratedValue(value, ValidityEnum.INVALID)
 
         print(f"value generation timed out after {timeout_seconds} seconds")
         return GeneratedValue("", ValidityEnum.INDETERMINATE)
 
+    def __get_optimized_grammar(self, grammar: str, formula: str | None) -> str:
+        """Returns the grammar after optimize_specification, the one all value sources of the specification use"""
+        key = get_specification_hash(grammar, formula)
+        if key not in self.__optimized_grammars:
+            self.__optimized_grammars[key] = optimize_specification(grammar, formula)[0]
+
+        return self.__optimized_grammars[key]
+
+    def __get_grammar(self, grammar: str) -> Grammar | None:
+        """Returns the parsed grammar, shared by all value sources of the specification"""
+        key = get_specification_hash(grammar)
+        if key not in self.__grammars:
+            try:
+                self.__grammars[key] = Grammar.from_bnf(grammar)
+            except ValueError as e:
+                print("Error parsing grammar:", e)
+                self.__grammars[key] = None
+
+        return self.__grammars[key]
+
     def __get_terminal_characters_from_grammar(self, grammar: str) -> Set[str]:
-        result = []
-        quoted_terminals = re.findall(r'("[^"]*")', grammar)
-        terminals = list(map(lambda t: t[1:-1], quoted_terminals))
-        seperated_terminals = list(map(lambda t: [c for c in t], terminals))
-        for terminal in seperated_terminals:
+        structured_grammar = self.__get_grammar(grammar)
+        if structured_grammar is None:
+            return set()
+
+        result: Set[str] = set()
+        for terminal in structured_grammar.terminals:
             if len(terminal) > 0:
-                result.extend(terminal)
+                result.update(terminal)
             else:
-                result.append("")
+                result.add("")
+
+        return result
+
+
+__worker_generator: InputGenerator | None = None
+
+
+def _generate_in_worker(
+    grammar: str,
+    formula: str | None,
+    validity: ValidityEnum,
+    amount: int,
+    timeout_seconds: int,
+    solver_parameter_path: str | None = None,
+) -> Tuple[List[GeneratedValue], float, bool, Dict[ValidityEnum, Satisfiability]]:
+    """Entry point for the worker processes of InputGenerator.generate_inputs_in_parallel
+
+    Every worker keeps its own serial generator, so solvers stay cached across tasks.
+    The time spent generating and whether a solver ran are returned as well, so the parent process can book it on
+    its budget, and so are the verdicts the worker learned about the specification.
+    """
+    global __worker_generator
+    if __worker_generator is None:
+        __worker_generator = InputGenerator(
+            solver_parameter_path=solver_parameter_path
+        )
 
-        return set(result)
+    start_time = time.perf_counter()
+    solver_runs = __worker_generator.solver_runs
+    values = __worker_generator.generate_inputs(
+        grammar, formula, validity, amount, timeout_seconds
+    )
+    return (
+        values,
+        time.perf_counter() - start_time,
+        __worker_generator.solver_runs != solver_runs,
+        {
+            v: __worker_generator.get_verdict(grammar, formula, v)
+            for v in [ValidityEnum.VALID, ValidityEnum.INVALID]
+        },
+    )
@@ -0,0 +1,339 @@
+import math
+import random
+import re
+
+from typing import Dict, List, Tuple
+
+from src.generation.grammar_fuzzer import GrammarFuzzer
+
+"""
+Interval Solver module
+
+Solves formulas that only bound the integer value or the length of the whole input.
+These are the formulas built for number and text inputs from their HTML constraints, and sending them
+through ISLa to Z3 is unnecessarily expensive for what is plain interval arithmetic.
+"""
+
+ATOM_PATTERN = re.compile(
+    r"^str\.(?P<function>to\.int|len)\(<start>\)\s*(?:mod\s+(?P<step>\d+)\s*=\s*0|(?P<operator><=|>=|<|>|=)\s*(?P<bound>-?\d+))$"
+)
+
+# Unbounded sides of an interval are closed at this distance from the other bound
+DEFAULT_SPAN = 1000
+DEFAULT_LENGTH_SPAN = 32
+# Number of sampled candidates that are checked against the grammar before giving up
+MAX_ATTEMPTS = 20
+
+
+class IntervalSolver:
+    """IntervalSolver class
+
+    Feasible set of a conjunction of bounds on str.to.int(<start>) or str.len(<start>) and steps of the form
+    str.to.int(<start>) mod n = 0. Integer values follow the HTML semantics of the bounds, i.e. "-5" is -5.
+    """
+
+    def __init__(
+        self,
+        function: str,
+        lower: int | None,
+        upper: int | None,
+        step: int = 1,
+    ) -> None:
+        """Initializes the solver for a feasible set
+
+        Parameters:
+        function (str): The bounded function, either "to.int" or "len"
+        lower (int | None): The inclusive lower bound (None if unbounded)
+        upper (int | None): The inclusive upper bound (None if unbounded)
+        step (int): The values have to be multiples of step (default 1)
+        """
+        self.__function = function
+        self.__lower = lower
+        self.__upper = upper
+        self.__step = step
+        self.__span = DEFAULT_LENGTH_SPAN if function == "len" else DEFAULT_SPAN
+
+    @classmethod
+    def from_formula(cls, formula: str | None):
+        """Creates a solver for the formula
+
+        Parameters:
+        formula (str | None): The ISLa formula
+
+        Returns:
+        IntervalSolver | None: The solver or None if the formula is not part of the supported fragment
+        """
+        if formula is None:
+            return None
+
+        atoms = split_conjunction(formula)
+        if atoms is None:
+            return None
+
+        function = None
+        lower = None
+        upper = None
+        step = 1
+        for atom in atoms:
+            match = ATOM_PATTERN.match(atom)
+            if match is None:
+                return None
+            if function is not None and match.group("function") != function:
+                return None
+            function = match.group("function")
+
+            if match.group("step") is not None:
+                if function != "to.int" or int(match.group("step")) == 0:
+                    return None
+                step = math.lcm(step, int(match.group("step")))
+                continue
+
+            operator = match.group("operator")
+            bound = int(match.group("bound"))
+            if operator in [">", ">=", "="]:
+                bound_lower = bound + 1 if operator == ">" else bound
+                lower = bound_lower if lower is None else max(lower, bound_lower)
+            if operator in ["<", "<=", "="]:
+                bound_upper = bound - 1 if operator == "<" else bound
+                upper = bound_upper if upper is None else min(upper, bound_upper)
+
+        if function == "len":
+            lower = max(0, lower or 0)
+
+        return cls(function, lower, upper, step)
+
+    @property
+    def function(self) -> str:
+        return self.__function
+
+    @property
+    def bounds(self) -> Tuple[int | None, int | None]:
+        return self.__lower, self.__upper
+
+    @property
+    def step(self) -> int:
+        return self.__step
+
+    def is_satisfiable(self) -> bool:
+        lower, upper = self.__get_closed_bounds()
+        return self.__first_multiple(lower, upper) is not None
+
+    def contains(self, value: str) -> bool:
+        """Checks whether a value satisfies the formula the solver was created from"""
+        if self.__function == "len":
+            number = len(value)
+        else:
+            try:
+                number = int(value)
+            except ValueError:
+                return False
+
+        return (
+            (self.__lower is None or number >= self.__lower)
+            and (self.__upper is None or number <= self.__upper)
+            and number % self.__step == 0
+        )
+
+    def sample_valid(self, fuzzer: GrammarFuzzer) -> str | None:
+        """Samples a value of the grammar that satisfies the formula
+
+        Parameters:
+        fuzzer (GrammarFuzzer): The fuzzer of the grammar, used for words of a given length and membership checks
+
+        Returns:
+        str | None: The value or None if none was found
+        """
+        lower, upper = self.__get_closed_bounds()
+        first = self.__first_multiple(lower, upper)
+        if first is None:
+            return None
+
+        count = (upper - first) // self.__step + 1
+        for _ in range(MAX_ATTEMPTS):
+            number = first + random.randrange(count) * self.__step
+            value = self.__to_value(number, fuzzer)
+            if value is not None and self.contains(value):
+                return value
+
+        return None
+
+    def get_boundary_values(self, fuzzer: GrammarFuzzer) -> List[str]:
+        """Returns the values of the grammar right next to the bounds and steps that violate the formula
+
+        Parameters:
+        fuzzer (GrammarFuzzer): The fuzzer of the grammar, used for words of a given length and membership checks
+
+        Returns:
+        List[str]: The values below the lower bound, above the upper bound and off step, in this order
+        """
+        numbers: List[int] = []
+        if self.__lower is not None:
+            numbers.append(self.__lower - 1)
+        if self.__upper is not None:
+            numbers.append(self.__upper + 1)
+        if self.__step > 1:
+            lower, upper = self.__get_closed_bounds()
+            first = self.__first_multiple(lower, upper)
+            if first is not None:
+                numbers.append(first + 1)
+
+        values: List[str] = []
+        for number in numbers:
+            if self.__function == "len" and number < 0:
+                continue
+            value = self.__to_value(number, fuzzer)
+            if value is not None and not self.contains(value) and value not in values:
+                values.append(value)
+
+        return values
+
+    def sample_invalid(self, fuzzer: GrammarFuzzer) -> str | None:
+        """Samples a value of the grammar that violates the formula, i.e. lies outside the bounds or off step
+
+        Parameters:
+        fuzzer (GrammarFuzzer): The fuzzer of the grammar, used for words of a given length and membership checks
+
+        Returns:
+        str | None: The value or None if none was found
+        """
+        candidates = self.__get_invalid_numbers()
+        for _ in range(MAX_ATTEMPTS):
+            if len(candidates) == 0:
+                return None
+
+            number = random.choice(candidates)
+            value = self.__to_value(number, fuzzer)
+            if value is not None and not self.contains(value):
+                return value
+            candidates.remove(number)
+
+        return None
+
+    def __get_invalid_numbers(self) -> List[int]:
+        lower, upper = self.__get_closed_bounds()
+        candidates = set()
+
+        if self.__lower is not None:
+            candidates.update(
+                [self.__lower - 1, self.__lower - random.randint(2, self.__span)]
+            )
+        if self.__upper is not None:
+            candidates.update(
+                [self.__upper + 1, self.__upper + random.randint(2, self.__span)]
+            )
+        if self.__step > 1:
+            first = self.__first_multiple(lower, upper)
+            if first is not None:
+                candidates.add(first + random.randint(1, self.__step - 1))
+
+        if self.__function == "len":
+            candidates = {c for c in candidates if c >= 0}
+
+        return list(candidates)
+
+    def __to_value(self, number: int, fuzzer: GrammarFuzzer) -> str | None:
+        if self.__function == "len":
+            # The fuzzer only misses the length if the grammar has no word of that length
+            return fuzzer.fuzz(number, number)
+
+        value = str(number)
+        return value if fuzzer.contains(value) else None
+
+    def __get_closed_bounds(self) -> Tuple[int, int]:
+        lower, upper = self.__lower, self.__upper
+        if lower is None and upper is None:
+            lower = 0 if self.__function == "len" else -self.__span
+        if lower is None:
+            lower = upper - self.__span
+        if upper is None:
+            upper = lower + self.__span
+
+        return lower, upper
+
+    def __first_multiple(self, lower: int, upper: int) -> int | None:
+        first = -(-lower // self.__step) * self.__step
+        return first if first <= upper else None
+
+
+def get_interval_solvers(formula: str) -> List[IntervalSolver]:
+    """Returns one solver per bounded function for the bounds among the top level conjuncts of a formula
+
+    Parameters:
+    formula (str): The ISLa formula, conjuncts that are not bounds are ignored
+
+    Returns:
+    List[IntervalSolver]: The solvers, each of them is implied by the formula
+    """
+    atoms: Dict[str, List[str]] = {}
+    for conjunct in split_conjunction(formula, strict=False):
+        match = ATOM_PATTERN.match(conjunct)
+        if match is not None:
+            atoms.setdefault(match.group("function"), []).append(conjunct)
+
+    return [
+        IntervalSolver.from_formula(" and ".join(function_atoms))
+        for function_atoms in atoms.values()
+    ]
+
+
+def split_conjunction(formula: str, strict: bool = True) -> List[str] | None:
+    """Splits a formula at its top level conjunctions and strips the parentheses around the parts
+
+    Parameters:
+    formula (str): The ISLa formula
+    strict (bool): Whether any other connective or quantifier fails the split, otherwise parts with them are kept whole (default True)
+
+    Returns:
+    List[str] | None: The conjuncts or None if the formula contains anything but conjunctions in strict mode
+    """
+    formula = formula.strip()
+    while is_wrapped_in_parentheses(formula):
+        formula = formula[1:-1].strip()
+
+    parts: List[str] = []
+    depth = 0
+    start = 0
+    for match in re.finditer(
+        r"[()]|\band\b|\bor\b|\bnot\b|\bxor\b|\bimplies\b|\bforall\b|\bexists\b",
+        formula,
+    ):
+        token = match.group()
+        if token == "(":
+            depth += 1
+        elif token == ")":
+            depth -= 1
+        elif token == "and" and depth == 0:
+            parts.append(formula[start : match.start()])
+            start = match.end()
+        elif token != "and" and (strict or depth == 0):
+            return None if strict else [formula]
+
+    parts.append(formula[start:])
+
+    if len(parts) == 1:
+        return [formula]
+
+    result: List[str] = []
+    for part in parts:
+        conjuncts = split_conjunction(part, strict)
+        if conjuncts is None:
+            return None
+        result.extend(conjuncts)
+
+    return result
+
+
+def is_wrapped_in_parentheses(formula: str) -> bool:
+    if not (formula.startswith("(") and formula.endswith(")")):
+        return False
+
+    depth = 0
+    for index, character in enumerate(formula):
+        if character == "(":
+            depth += 1
+        elif character == ")":
+            depth -= 1
+            if depth == 0 and index < len(formula) - 1:
+                return False
+
+    return True
@@ -0,0 +1,83 @@
+import math
+import random
+import string
+
+from typing import Callable, List, Set
+
+from src.generation.grammar_fuzzer import GrammarFuzzer
+
+"""
+Invalid Construction module
+
+Builds values that are not part of a grammar by construction instead of searching for them.
+"""
+
+
+class InvalidValueConstructor:
+    """InvalidValueConstructor class
+
+    Constructs words outside the language of a grammar from its terminal alphabet and word length bounds:
+    a word containing a character the grammar never produces, a word longer than the longest word or
+    a word shorter than the shortest word are invalid without any further check.
+    """
+
+    def __init__(self, fuzzer: GrammarFuzzer, grammar_terminals: Set[str]) -> None:
+        """Initializes the constructor
+
+        Parameters:
+        fuzzer (GrammarFuzzer): The fuzzer of the grammar
+        grammar_terminals (Set[str]): The terminal characters found in the grammar
+        """
+        self.__fuzzer = fuzzer
+        self.__alphabet = sorted(
+            (grammar_terminals | fuzzer.terminal_characters) - {""}
+        )
+        self.__forbidden_characters = sorted(
+            set(string.printable) - set(self.__alphabet)
+        )
+
+        self.__constructions: List[Callable[[], str]] = []
+        if len(self.__forbidden_characters) > 0:
+            self.__constructions.append(self.__insert_forbidden_character)
+        if not math.isinf(fuzzer.max_word_length) and len(self.__alphabet) > 0:
+            self.__constructions.append(self.__exceed_max_length)
+        if fuzzer.min_word_length > 0:
+            self.__constructions.append(self.__fall_below_min_length)
+
+    @property
+    def can_guarantee_invalidity(self) -> bool:
+        return len(self.__constructions) > 0
+
+    def construct(self) -> str | None:
+        """Constructs a word that is guaranteed not to be part of the grammar
+
+        Returns:
+        str | None: The word or None if the grammar leaves no construction that is invalid for sure
+        """
+        if not self.can_guarantee_invalidity:
+            return None
+
+        return random.choice(self.__constructions)()
+
+    def __insert_forbidden_character(self) -> str:
+        # A short word makes sure a rejection of the value can only be caused by the foreign character
+        word = self.__fuzzer.fuzz(0, self.__fuzzer.min_word_length + 2)
+        position = random.randint(0, len(word))
+        return (
+            word[:position]
+            + random.choice(self.__forbidden_characters)
+            + word[position:]
+        )
+
+    def __exceed_max_length(self) -> str:
+        max_length = int(self.__fuzzer.max_word_length)
+        word = self.__fuzzer.fuzz(max_length, max_length)
+        padding = max_length - len(word) + random.randint(1, 3)
+        return word + "".join(random.choices(self.__alphabet, k=padding))
+
+    def __fall_below_min_length(self) -> str:
+        length = random.randint(0, self.__fuzzer.min_word_length - 1)
+        if len(self.__alphabet) == 0:
+            return ""
+
+        return "".join(random.choices(self.__alphabet, k=length))
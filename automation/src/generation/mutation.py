@@ -1,14 +1,22 @@
+import math
+import numpy as np
 import random
 import string
 
-from typing import Set
+from isla.helpers import is_nonterminal
+from typing import Callable, List, Set, Tuple
+
+from src.generation.grammar_fuzzer import GrammarFuzzer, ParseTree
+
+# Operators of the batch mutator, each changes one character position of a mutant
+MUTATION_OPERATORS = ["delete", "insert", "flip"]
 
 
 class ValueMutator:
     def __init__(
         self, input: str, grammar_terminals: Set[str], mutations: int = 2
     ) -> None:
-        self.__forbidden_character_set = set(string.printable) - grammar_terminals
+        self.__forbidden_characters = list(set(string.printable) - grammar_terminals)
         self.__input = input
         self.__mutations = mutations
         self.__mutators = [
@@ -38,8 +46,8 @@ class ValueMutator:
         pos = random.randint(0, len(self.__input))
 
         random_character = ""
-        if len(self.__forbidden_character_set) > 0:
-            random_character = random.choice(list(self.__forbidden_character_set))
+        if len(self.__forbidden_characters) > 0:
+            random_character = random.choice(self.__forbidden_characters)
         else:
             random_character = random.choice(string.printable)
         self.__input = self.__input[:pos] + random_character + self.__input[pos:]
@@ -53,3 +61,310 @@ class ValueMutator:
         bit = 1 << random.randint(0, 6)
         new_char = chr(ord(char) ^ bit)
         self.__input = self.__input[:pos] + new_char + self.__input[pos + 1 :]
+
+
+class BatchValueMutator:
+    """BatchValueMutator class
+
+    Mutates a seed into many mutants at once on a NumPy array of code points, one row per mutant.
+    The seed characters sit between empty gaps, so insertions fill a gap and deletions empty a character,
+    and no row ever has to be shifted. Empty cells are dropped when the rows are turned back into strings.
+    """
+
+    def __init__(
+        self,
+        grammar_terminals: Set[str],
+        mutations: int = 2,
+        batch_size: int = 1024,
+        operators: List[str] | None = None,
+    ) -> None:
+        """Initializes the mutator
+
+        Parameters:
+        grammar_terminals (Set[str]): The characters that occur in the terminals of the grammar
+        mutations (int): The number of mutations applied to every mutant (default 2)
+        batch_size (int): The number of mutants per batch (default 1024)
+        operators (List[str] | None): The operators to choose from, see MUTATION_OPERATORS (default None; all)
+        """
+        self.__alphabet = np.array(
+            sorted(ord(c) for c in grammar_terminals if len(c) == 1), dtype=np.uint32
+        )
+        forbidden_characters = set(string.printable) - grammar_terminals
+        self.__insertable = np.array(
+            sorted(ord(c) for c in (forbidden_characters or set(string.printable))),
+            dtype=np.uint32,
+        )
+        self.__mutations = mutations
+        self.__batch_size = batch_size
+        self.__operators = MUTATION_OPERATORS if operators is None else operators
+        self.__random = np.random.default_rng()
+
+    def mutate_batch(self, seed: str) -> List[str]:
+        """Returns the distinct mutants of one batch
+
+        Parameters:
+        seed (str): The value that is mutated
+
+        Returns:
+        List[str]: The mutants, those with characters outside of the grammar terminals first
+        """
+        outside_alphabet, inside_alphabet = self.__split_batch(seed)
+        return outside_alphabet + inside_alphabet
+
+    def find_invalid(self, seed: str, contains: Callable[[str], bool]) -> str | None:
+        """Searches a batch of mutants for one that is not part of the grammar
+
+        Parameters:
+        seed (str): The value that is mutated
+        contains (Callable[[str], bool]): The membership test of the grammar
+
+        Returns:
+        str | None: The first mutant outside of the grammar or None if the batch has none
+        """
+        outside_alphabet, inside_alphabet = self.__split_batch(seed)
+        # Mutants with foreign characters are invalid for sure and need no membership check
+        if len(outside_alphabet) > 0:
+            return outside_alphabet[0]
+
+        for mutant in inside_alphabet:
+            if not contains(mutant):
+                return mutant
+
+        return None
+
+    def __split_batch(self, seed: str) -> Tuple[List[str], List[str]]:
+        """Returns the distinct mutants of one batch with and without characters outside of the grammar terminals"""
+        rows = self.__mutate_rows(seed)
+        outside_alphabet = np.any((rows != 0) & ~np.isin(rows, self.__alphabet), axis=1)
+        return (
+            list(dict.fromkeys(self.__to_strings(rows[outside_alphabet]))),
+            list(dict.fromkeys(self.__to_strings(rows[~outside_alphabet]))),
+        )
+
+    def __mutate_rows(self, seed: str) -> np.ndarray:
+        width = 2 * len(seed) + 1
+        rows = np.zeros((self.__batch_size, width), dtype=np.uint32)
+        rows[:, 1::2] = np.frombuffer(seed.encode("utf-32-le"), dtype=np.uint32)
+        indices = np.arange(self.__batch_size)
+
+        for _ in range(self.__mutations):
+            operators = self.__random.integers(
+                len(self.__operators), size=self.__batch_size
+            )
+            for index, operator in enumerate(self.__operators):
+                selected = indices[operators == index]
+                if len(selected) == 0:
+                    continue
+
+                if operator == "insert":
+                    gaps = 2 * self.__random.integers(len(seed) + 1, size=len(selected))
+                    rows[selected, gaps] = self.__random.choice(
+                        self.__insertable, size=len(selected)
+                    )
+                elif len(seed) > 0:
+                    positions = (
+                        2 * self.__random.integers(len(seed), size=len(selected)) + 1
+                    )
+                    if operator == "delete":
+                        rows[selected, positions] = 0
+                    elif operator == "flip":
+                        bits = np.left_shift(
+                            1, self.__random.integers(7, size=len(selected))
+                        ).astype(np.uint32)
+                        characters = rows[selected, positions]
+                        # Deleted characters stay deleted
+                        rows[selected, positions] = np.where(
+                            characters != 0, characters ^ bits, 0
+                        )
+
+        return rows
+
+    def __to_strings(self, rows: np.ndarray) -> List[str]:
+        # Moving the empty cells to the end of each row lets NumPy strip them while reading the rows as strings
+        order = np.argsort(rows == 0, axis=1, kind="stable")
+        compacted = np.ascontiguousarray(np.take_along_axis(rows, order, axis=1))
+        return compacted.view(np.dtype(("U", rows.shape[1]))).ravel().tolist()
+
+
+class StructuralMutator:
+    """StructuralMutator class
+
+    Mutates the derivation tree of a value instead of its characters, so every mutant breaks a particular rule
+    of the grammar: a subtree is replaced by a word of another nonterminal, a repetition is duplicated or dropped,
+    or a terminal outside of the grammar is spliced in.
+    """
+
+    def __init__(
+        self,
+        fuzzer: GrammarFuzzer | None,
+        grammar_terminals: Set[str],
+        mutations: int = 1,
+    ) -> None:
+        """Initializes the mutator
+
+        Parameters:
+        fuzzer (GrammarFuzzer | None): The fuzzer of the grammar, used for words of other nonterminals
+        grammar_terminals (Set[str]): The characters that occur in the terminals of the grammar
+        mutations (int): The number of mutations applied to every mutant (default 1)
+        """
+        self.__fuzzer = fuzzer
+        self.__forbidden_characters = sorted(set(string.printable) - grammar_terminals)
+        self.__mutations = mutations
+        self.__mutators = [
+            self.__replace_subtree,
+            self.__duplicate_repetition,
+            self.__drop_repetition,
+            self.__splice_forbidden_terminal,
+        ]
+
+    def mutate(self, tree: ParseTree) -> str:
+        """Returns a mutant of the value the tree derives
+
+        Parameters:
+        tree (ParseTree): The derivation tree in the (symbol, children) format of ISLa parse trees
+
+        Returns:
+        str: The mutant
+        """
+        for _ in range(self.__mutations):
+            tree = random.choice(self.__mutators)(tree)
+
+        return _to_string(tree)
+
+    def find_invalid(
+        self,
+        tree: ParseTree,
+        contains: Callable[[str], bool],
+        attempts: int = 32,
+    ) -> str | None:
+        """Searches mutants of the tree for one that is not part of the grammar
+
+        Parameters:
+        tree (ParseTree): The derivation tree of the seed
+        contains (Callable[[str], bool]): The membership test of the grammar
+        attempts (int): The number of mutants that are tried (default 32)
+
+        Returns:
+        str | None: The first mutant outside of the grammar or None if no attempt left the grammar
+        """
+        for _ in range(attempts):
+            mutant = self.mutate(tree)
+            if not contains(mutant):
+                return mutant
+
+        return None
+
+    def __replace_subtree(self, tree: ParseTree) -> ParseTree:
+        paths = _get_paths(tree, lambda node, _: is_nonterminal(node[0]))
+        path = random.choice(paths[1:] or paths)
+        symbol = _get_node(tree, path)[0]
+
+        if self.__fuzzer is not None:
+            replacements = [
+                nonterminal
+                for nonterminal in self.__fuzzer.grammar
+                if nonterminal != symbol
+                and not math.isinf(self.__fuzzer.get_min_length(nonterminal))
+            ]
+            if len(replacements) > 0:
+                replacement = random.choice(replacements)
+                word = self.__fuzzer.fuzz(symbol=replacement)
+                return _replace_node(tree, path, [(replacement, [(word, [])])])
+
+        # Without a fuzzer, subtrees of other nonterminals in the same tree serve as replacements
+        others = [
+            _get_node(tree, other)
+            for other in paths
+            if _get_node(tree, other)[0] != symbol
+        ]
+        if len(others) == 0:
+            return self.__splice_forbidden_terminal(tree)
+
+        return _replace_node(tree, path, [random.choice(others)])
+
+    def __duplicate_repetition(self, tree: ParseTree) -> ParseTree:
+        path = self.__choose_repetition(tree)
+        if path is None:
+            return tree
+
+        node = _get_node(tree, path)
+        return _replace_node(tree, path, [node, node])
+
+    def __drop_repetition(self, tree: ParseTree) -> ParseTree:
+        path = self.__choose_repetition(tree)
+        if path is None:
+            return tree
+
+        return _replace_node(tree, path, [])
+
+    def __splice_forbidden_terminal(self, tree: ParseTree) -> ParseTree:
+        character = random.choice(self.__forbidden_characters or string.printable)
+        paths = _get_paths(tree, lambda node, _: not is_nonterminal(node[0]))
+        if len(paths) == 0:
+            return (tree[0], tree[1] + [(character, [])])
+
+        path = random.choice(paths)
+        node = _get_node(tree, path)
+        spliced = (
+            [(character, []), node] if random.random() < 0.5 else [(character, [])]
+        )
+        return _replace_node(tree, path, spliced)
+
+    def __choose_repetition(self, tree: ParseTree) -> Tuple[int, ...] | None:
+        """Chooses one unit of a recursive rule like <string> ::= <letter><string>, or any subtree if there is none"""
+        repetitions = _get_paths(
+            tree,
+            lambda node, parent: parent is not None
+            and node[0] != parent[0]
+            and any(child[0] == parent[0] for child in parent[1]),
+        )
+        paths = repetitions or _get_paths(tree, lambda _, parent: parent is not None)
+        return random.choice(paths) if len(paths) > 0 else None
+
+
+def _get_paths(
+    tree: ParseTree,
+    predicate: Callable[[ParseTree, ParseTree | None], bool],
+) -> List[Tuple[int, ...]]:
+    """Returns the paths of all nodes that satisfy the predicate, given the node and its parent"""
+    paths: List[Tuple[int, ...]] = []
+    stack: List[Tuple[ParseTree, ParseTree | None, Tuple[int, ...]]] = [
+        (tree, None, ())
+    ]
+    while len(stack) > 0:
+        node, parent, path = stack.pop()
+        if predicate(node, parent):
+            paths.append(path)
+        for index, child in enumerate(node[1]):
+            stack.append((child, node, path + (index,)))
+
+    return paths
+
+
+def _get_node(tree: ParseTree, path: Tuple[int, ...]) -> ParseTree:
+    for index in path:
+        tree = tree[1][index]
+    return tree
+
+
+def _replace_node(
+    tree: ParseTree, path: Tuple[int, ...], replacement: List[ParseTree]
+) -> ParseTree:
+    """Returns a copy of the tree in which the node at the path is replaced by any number of nodes"""
+    if len(path) == 0:
+        return replacement[0] if len(replacement) > 0 else (tree[0], [])
+
+    index = path[0]
+    children = tree[1]
+    if len(path) == 1:
+        return (tree[0], children[:index] + replacement + children[index + 1 :])
+
+    child = _replace_node(children[index], path[1:], replacement)
+    return (tree[0], children[:index] + [child] + children[index + 1 :])
+
+
+def _to_string(tree: ParseTree) -> str:
+    symbol, children = tree
+    if len(children) == 0:
+        return "" if is_nonterminal(symbol) else symbol
+    return "".join(_to_string(child) for child in children)
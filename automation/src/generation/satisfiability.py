@@ -0,0 +1,109 @@
+from enum import Enum
+from typing import Dict
+
+from src.generation.calendar_generation import CalendarGenerator
+from src.generation.interval_solver import IntervalSolver, get_interval_solvers
+from src.utility.helpers import get_specification_hash
+
+"""
+Satisfiability module
+
+Keeps track of specifications that have no values of a validity at all, so no solver time is spent on them.
+Formulas built up from constraint candidates can end up contradictory, and the solver only gives up on them
+after the full timeout.
+"""
+
+
+class Satisfiability(str, Enum):
+    SAT = "SAT"
+    UNSAT = "UNSAT"
+    UNKNOWN = "UNKNOWN"
+
+
+class SatisfiabilityChecker:
+    """SatisfiabilityChecker class
+
+    Verdicts per specification and validity, i.e. for a formula and for its negation.
+    A verdict is first derived from the bounds in the formula and later replaced by what value generation learns,
+    e.g. a fresh solver that runs out of solutions before producing any.
+    """
+
+    def __init__(self) -> None:
+        self.__verdicts: Dict[str, Satisfiability] = {}
+
+    def get_key(self, grammar: str, formula: str | None, validity: str) -> str:
+        return f"{get_specification_hash(grammar, formula)}:{validity}"
+
+    def get_verdict(
+        self, grammar: str, formula: str | None, validity: str
+    ) -> Satisfiability:
+        """Returns whether the specification has values of a validity
+
+        Parameters:
+        grammar (str): The grammar of the specification
+        formula (str | None): The formula of the specification
+        validity (str): VALID for values that satisfy the formula, INVALID for values that violate it
+
+        Returns:
+        Satisfiability: The verdict, UNKNOWN if nothing is known yet
+        """
+        key = self.get_key(grammar, formula, validity)
+        if key not in self.__verdicts:
+            self.__verdicts[key] = (
+                self.__check_formula(grammar, formula)
+                if validity == "VALID"
+                else self.__check_negation(formula)
+            )
+
+        return self.__verdicts[key]
+
+    def record(
+        self,
+        grammar: str,
+        formula: str | None,
+        validity: str,
+        verdict: Satisfiability,
+    ) -> None:
+        """Stores a verdict learned during value generation
+
+        Parameters:
+        grammar (str): The grammar of the specification
+        formula (str | None): The formula of the specification
+        validity (str): VALID for values that satisfy the formula, INVALID for values that violate it
+        verdict (Satisfiability): The verdict
+        """
+        self.__verdicts[self.get_key(grammar, formula, validity)] = verdict
+
+    def __check_formula(self, grammar: str, formula: str | None) -> Satisfiability:
+        if formula is None:
+            return Satisfiability.SAT
+
+        calendar_generator = CalendarGenerator.from_specification(grammar, formula)
+        if calendar_generator is not None:
+            return (
+                Satisfiability.SAT
+                if calendar_generator.is_satisfiable()
+                else Satisfiability.UNSAT
+            )
+
+        # Contradicting bounds in any conjunct make the whole conjunction unsatisfiable
+        for solver in get_interval_solvers(formula):
+            if not solver.is_satisfiable():
+                return Satisfiability.UNSAT
+
+        return Satisfiability.UNKNOWN
+
+    def __check_negation(self, formula: str | None) -> Satisfiability:
+        if formula is None:
+            return Satisfiability.UNKNOWN
+
+        # Every value has a length of at least 0, so a formula that only demands that holds for all values
+        solver = IntervalSolver.from_formula(formula)
+        if (
+            solver is not None
+            and solver.function == "len"
+            and solver.bounds == (0, None)
+        ):
+            return Satisfiability.UNSAT
+
+        return Satisfiability.UNKNOWN
@@ -0,0 +1,116 @@
+from collections import OrderedDict
+from isla.solver import ISLaSolver
+from typing import Dict
+
+from src.generation.solver_tuning import SolverTuner
+from src.utility.helpers import get_specification_hash
+
+"""
+Solver Cache module
+
+Keeps live ISLa solvers around so that repeated value generation for the same
+grammar and formula does not pay for grammar parsing and solver setup again.
+"""
+
+
+class SolverCache:
+    """SolverCache class
+
+    Bounded least-recently-used cache of ISLa solvers keyed by a canonical hash of grammar and formula.
+    Negated formulas are passed in as their own formula and therefore get their own entries.
+    """
+
+    def __init__(self, max_size: int = 32, tuner: SolverTuner | None = None) -> None:
+        """Initializes the solver cache
+
+        Parameters:
+        max_size (int): The maximum number of live solvers kept before the least recently used one is evicted (default 32)
+        tuner (SolverTuner | None): Picks the solver options per specification (default None; ISLa defaults)
+        """
+        self.__max_size = max(1, max_size)
+        self.__tuner = tuner
+        self.__solvers: OrderedDict[str, ISLaSolver] = OrderedDict()
+        self.__hits = 0
+        self.__misses = 0
+        self.__evictions = 0
+
+    def get_solver(
+        self, grammar: str, formula: str | None = None, timeout_seconds: int = 60
+    ) -> ISLaSolver:
+        """Returns a live solver for the grammar and formula, creating one if none is cached.
+
+        The timeout of the returned solver is reset so that the next call to solve gets the full time span.
+
+        Parameters:
+        grammar (str): The grammar in BNF format
+        formula (str | None): The ISLa formula (default None)
+        timeout_seconds (int): The timeout for the next call to solve, also bounds the tuning of a new solver (default 60)
+
+        Returns:
+        ISLaSolver: A solver for the given specification
+        """
+        key = get_specification_hash(grammar, formula)
+        solver = self.__solvers.get(key)
+
+        if solver is not None:
+            self.__hits += 1
+            self.__solvers.move_to_end(key)
+        else:
+            self.__misses += 1
+            parameters = (
+                self.__tuner.get_parameters(grammar, formula, timeout_seconds)
+                if self.__tuner is not None
+                else {}
+            )
+            solver = ISLaSolver(
+                grammar, formula, timeout_seconds=timeout_seconds, **parameters
+            )
+            self.__solvers[key] = solver
+            if len(self.__solvers) > self.__max_size:
+                self.__solvers.popitem(last=False)
+                self.__evictions += 1
+
+        SolverCache.reset_timeout(solver, timeout_seconds)
+        return solver
+
+    @staticmethod
+    def reset_timeout(solver: ISLaSolver, timeout_seconds: int) -> None:
+        """Gives the next call to solve the full timeout again"""
+        # ISLa measures the timeout from the first call to solve, so it has to be reset for every new request
+        solver.timeout_seconds = timeout_seconds
+        solver.start_time = None
+
+    def invalidate(self, grammar: str, formula: str | None = None) -> None:
+        """Removes the solver for the grammar and formula, e.g. after it ran out of solutions."""
+        self.__solvers.pop(get_specification_hash(grammar, formula), None)
+
+    def clear(self) -> None:
+        self.__solvers.clear()
+
+    @property
+    def hits(self) -> int:
+        return self.__hits
+
+    @property
+    def misses(self) -> int:
+        return self.__misses
+
+    @property
+    def evictions(self) -> int:
+        return self.__evictions
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            "size": len(self.__solvers),
+            "max_size": self.__max_size,
+            "hits": self.__hits,
+            "misses": self.__misses,
+            "evictions": self.__evictions,
+        }
+
+    def __len__(self) -> int:
+        return len(self.__solvers)
+
+    def __str__(self) -> str:
+        stats = self.get_stats()
+        return f"(solvers: {stats['size']}/{stats['max_size']}, hits: {stats['hits']}, misses: {stats['misses']}, evictions: {stats['evictions']})"
@@ -0,0 +1,164 @@
+import json
+import math
+import os
+import threading
+import time
+
+from isla.solver import DIRECT_EMBEDDING, SELF_EMBEDDING, ISLaSolver
+from typing import Any, Dict, List, Tuple
+
+from src.utility.helpers import get_specification_hash
+
+"""
+Solver Tuning module
+
+Picks the ISLa solver options that solve a specification fastest and remembers them across runs.
+"""
+
+# Small grid of solver options around the defaults, the empty configuration are the ISLa defaults
+PARAMETER_GRID: List[Dict[str, Any]] = [
+    {},
+    {"max_number_free_instantiations": 1, "max_number_smt_instantiations": 1},
+    {"max_number_free_instantiations": 20, "max_number_smt_instantiations": 20},
+    {"tree_insertion_methods": DIRECT_EMBEDDING + SELF_EMBEDDING},
+    {"tree_insertion_methods": DIRECT_EMBEDDING},
+    {"enable_optimized_z3_queries": False},
+    {"enforce_unique_trees_in_queue": True},
+]
+
+
+class SolverTuner:
+    """SolverTuner class
+
+    Benchmarks a grid of solver options the first time a specification is solved and stores the fastest
+    configuration in a JSON file, keyed by a content hash of grammar and formula.
+    Every configuration has to solve a few values in a row, and later configurations only get as much time as
+    the fastest one so far needed, so a benchmark costs little more than the slowest useful configuration.
+    A benchmark never takes longer than the timeout of the request that triggered it. Configurations that did not
+    fit into that time are left out, and such an incomplete result is only kept for the current run.
+    """
+
+    def __init__(
+        self,
+        store_path: str = "corpus/solver_parameters.json",
+        samples: int = 3,
+        timeout_seconds: int = 10,
+        parameter_grid: List[Dict[str, Any]] | None = None,
+    ) -> None:
+        """Initializes the tuner and loads the stored configurations
+
+        Parameters:
+        store_path (str): Path to the JSON file with the fastest configuration per specification (default "corpus/solver_parameters.json")
+        samples (int): The number of values every configuration has to solve (default 3)
+        timeout_seconds (int): The time one configuration may take at most (default 10)
+        parameter_grid (List[Dict[str, Any]] | None): The configurations to compare (default None; PARAMETER_GRID)
+        """
+        self.__store_path = store_path
+        self.__samples = samples
+        self.__timeout_seconds = timeout_seconds
+        self.__parameter_grid = (
+            PARAMETER_GRID if parameter_grid is None else parameter_grid
+        )
+        self.__lock = threading.Lock()
+        self.__parameters = self.__load()
+
+    def get_parameters(
+        self, grammar: str, formula: str | None, timeout_seconds: int | None = None
+    ) -> Dict[str, Any]:
+        """Returns the solver options for a specification, benchmarking them on first use
+
+        Parameters:
+        grammar (str): The grammar in BNF format
+        formula (str | None): The ISLa formula
+        timeout_seconds (int | None): The time the whole benchmark may take, e.g. the timeout of the request (default None; unbounded)
+
+        Returns:
+        Dict[str, Any]: Keyword arguments for ISLaSolver
+        """
+        key = get_specification_hash(grammar, formula)
+        with self.__lock:
+            if key not in self.__parameters:
+                self.__parameters[key], complete = self.__benchmark(
+                    grammar, formula, timeout_seconds
+                )
+                if complete:
+                    self.__save(key)
+
+            return self.__parameters[key]
+
+    def __benchmark(
+        self, grammar: str, formula: str | None, timeout_seconds: int | None
+    ) -> Tuple[Dict[str, Any], bool]:
+        """Returns the fastest configuration and whether all configurations were measured"""
+        best_parameters: Dict[str, Any] = {}
+        best_seconds = math.inf
+        deadline = (
+            time.perf_counter() + timeout_seconds
+            if timeout_seconds is not None
+            else math.inf
+        )
+
+        for parameters in self.__parameter_grid:
+            # A configuration that cannot beat the best one so far is not worth waiting for
+            timeout = (
+                self.__timeout_seconds
+                if math.isinf(best_seconds)
+                else min(self.__timeout_seconds, math.ceil(best_seconds))
+            )
+            remaining_seconds = deadline - time.perf_counter()
+            if remaining_seconds < 1:
+                return best_parameters, False
+
+            if not math.isinf(remaining_seconds):
+                timeout = min(timeout, math.floor(remaining_seconds))
+            seconds = self.__measure(grammar, formula, parameters, timeout)
+            if seconds < best_seconds:
+                best_parameters, best_seconds = parameters, seconds
+
+        return best_parameters, True
+
+    def __measure(
+        self,
+        grammar: str,
+        formula: str | None,
+        parameters: Dict[str, Any],
+        timeout_seconds: int,
+    ) -> float:
+        """Returns the time the configuration needs for all samples, infinite if it fails or times out"""
+        start_time = time.perf_counter()
+        try:
+            solver = ISLaSolver(
+                grammar, formula, timeout_seconds=timeout_seconds, **parameters
+            )
+            for _ in range(self.__samples):
+                solver.solve()
+        except (StopIteration, TimeoutError):
+            return math.inf
+        except Exception as e:
+            print("Error benchmarking solver parameters:", e)
+            return math.inf
+
+        return time.perf_counter() - start_time
+
+    def __load(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self.__store_path) as file:
+                return json.load(file)
+        except FileNotFoundError:
+            return {}
+        except json.JSONDecodeError as e:
+            print("Error reading solver parameters:", e)
+            return {}
+
+    def __save(self, key: str) -> None:
+        directory = os.path.dirname(self.__store_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        # Other processes may have tuned further specifications in the meantime, their results are kept
+        stored = self.__load()
+        stored[key] = self.__parameters[key]
+        temporary_path = f"{self.__store_path}.{os.getpid()}.tmp"
+        with open(temporary_path, "w") as file:
+            json.dump(stored, file, indent=4)
+        os.replace(temporary_path, self.__store_path)
@@ -5,17 +5,26 @@ import time
 from copy import deepcopy
 from selenium.webdriver.chrome.service import Service
 from seleniumwire import webdriver
-from typing import List, Tuple
+from typing import Dict, List, Set, Tuple
 
 from src.analysis.constraint_extraction import (
     ConstraintCandidateFinder,
     SpecificationBuilder,
 )
+from src.analysis.fingerprinting import (
+    FINGERPRINT_FILE,
+    PreviousExtraction,
+    create_fingerprint_file,
+    get_field_fingerprint,
+    get_reference_key,
+)
 from src.analysis.html_analysis import (
     HTMLAnalyser,
+    HTMLElementReference,
     HTMLInputSpecification,
     HTMLRadioGroupSpecification,
 )
+from src.analysis.specification_model import FormSpecification
 from src.interaction.form_testing import FormTester, SpecificationParser
 from src.proxy.interception import NetworkInterceptor
 from src.utility.helpers import (
@@ -25,9 +34,9 @@ from src.utility.helpers import (
     free_service_resources,
     load_page,
     sub_to_service_messages,
-    write_to_file,
     get_chromedriver_for_platform,
 )
+from src.utility.specification_registry import load_specification_registry
 
 
 """
@@ -61,7 +70,13 @@ class TestAutomationDriver:
         self.__setup_function = setup_function
         self.__url = url
         self.__html_only = True
+        self.__form_specification: FormSpecification | None = None
         self.__evaluation = evaluation
+        self.__incremental = True
+        self.__previous_extraction: PreviousExtraction | None = None
+        self.__fingerprints: Dict[str, str] = {}
+        self.__script_hashes: Dict[str, str] = {}
+        self.__reused_references: Set[HTMLElementReference] = set()
 
         # Options for the chrome webdriver
         chrome_options = webdriver.ChromeOptions()
@@ -98,6 +113,23 @@ class TestAutomationDriver:
                 ConfigKey.HTML_ONLY.value
             ]
 
+        if ConfigKey.ANALYSIS.value in self.__config:
+            self.__incremental = self.__config[ConfigKey.ANALYSIS.value].get(
+                ConfigKey.INCREMENTAL.value, True
+            )
+
+        # Load all pre-built specifications once, custom specifications replace the pre-built ones of the same name
+        override_directory = None
+        if (
+            ConfigKey.ANALYSIS.value in self.__config
+            and ConfigKey.SPECIFICATION_OVERRIDES.value
+            in self.__config[ConfigKey.ANALYSIS.value]
+        ):
+            override_directory = self.__config[ConfigKey.ANALYSIS.value][
+                ConfigKey.SPECIFICATION_OVERRIDES.value
+            ]
+        load_specification_registry(override_directory)
+
     def run_analysis(self) -> None:
         """Run the code analysis
 
@@ -109,25 +141,36 @@ class TestAutomationDriver:
         # message_thread = threading.Thread(target=sub_to_service_messages, daemon=True)
         # message_thread.start()
 
+        # fields whose fingerprint did not change since the last extraction keep their specification
+        if self.__incremental:
+            self.__previous_extraction = PreviousExtraction.from_directory()
+
+        # a form without any changes is not instrumented and analysed again
+        if self.__previous_extraction is not None and not self.__html_only:
+            self.__interceptor.record_scripts()
+            html_input_specifications = self.__load_form()
+            if self.__previous_extraction.is_unchanged(self.__fingerprints):
+                print("The form did not change since the last extraction")
+                self.__build_specification(html_input_specifications)
+                self.__complete_extraction()
+
+            del self.__driver.requests
+            self.__interceptor.script_hashes = {}
+
         # start network interception for instrumentation if the analysis is not HTML only
         if not self.__html_only:
             self.__interceptor.instrument_files()
 
-        # load the page and optionally execute setup function to get to the actual web form
-        load_page(self.__driver, self.__url)
-        if self.__setup_function is not None:
-            self.__setup_function(self)
-
         # build specification from HTML validation
-        html_input_specifications = self.__analyse_html(self.__driver.page_source)
+        html_input_specifications = self.__load_form()
         if self.__html_only:
             self.__build_specification(html_input_specifications)
-            self.__exit()
+            self.__complete_extraction()
 
         # extract additional JavaScript constrants
         self.__start_constraint_extraction(html_input_specifications)
 
-        self.__exit()
+        self.__complete_extraction()
 
     def run_test(
         self, specification_file: str | None = None, report_path: str | None = None
@@ -150,12 +193,53 @@ class TestAutomationDriver:
         # start value generation and form testing
         url = spec["url"]
         form_tester = FormTester(
-            self.__driver, url, spec, specification_dir, self.__config, report_path
+            self.__driver,
+            url,
+            spec,
+            specification_dir,
+            self.__config,
+            report_path,
+            specification_parser.bundle,
         )
         form_tester.start_generation(self.__setup_function, self)
 
         self.__exit()
 
+    def __load_form(
+        self,
+    ) -> List[HTMLInputSpecification | HTMLRadioGroupSpecification]:
+        """Load the page and analyse the HTML of the form.
+
+        Executes the setup function to get to the actual web form and computes the fingerprints of all form fields.
+
+        Returns:
+        List[HTMLInputSpecification | HTMLRadioGroupSpecification]: The specification for all form fields including the built-in HTML constraints
+        """
+
+        # load the page and optionally execute setup function to get to the actual web form
+        load_page(self.__driver, self.__url)
+        if self.__setup_function is not None:
+            self.__setup_function(self)
+
+        html_input_specifications = self.__analyse_html(self.__driver.page_source)
+
+        # Responses after the initial page load, e.g. of submissions, do not belong to the form
+        self.__script_hashes = dict(self.__interceptor.script_hashes)
+        settings = {
+            "analysis": self.__config.get(ConfigKey.ANALYSIS.value),
+            "use-datalist-options": self.__config.get(
+                ConfigKey.GENERATION.value, {}
+            ).get(ConfigKey.USE_DATALIST_OPTIONS.value),
+        }
+        self.__fingerprints = {
+            get_reference_key(specification.reference): get_field_fingerprint(
+                specification, self.__script_hashes, settings
+            )
+            for specification in html_input_specifications
+        }
+
+        return html_input_specifications
+
     def __analyse_html(
         self, html_string: str
     ) -> List[HTMLInputSpecification | HTMLRadioGroupSpecification]:
@@ -202,6 +286,7 @@ class TestAutomationDriver:
         ]
         analysis_rounds = clamp_to_range(analysis_rounds, 1)
 
+        generation_config = self.__config.get(ConfigKey.GENERATION.value, {})
         self.__constraint_candidate_finder = ConstraintCandidateFinder(
             self.__driver,
             self.__html_analyser.submit_element,
@@ -209,6 +294,12 @@ class TestAutomationDriver:
             False,
             self.__exit,
             self.__evaluation,
+            generation_config.get(ConfigKey.WORKERS.value, 1),
+            generation_config.get(ConfigKey.VALUE_CORPUS.value),
+            self.__config[ConfigKey.ANALYSIS.value].get(
+                ConfigKey.CANDIDATE_CACHE.value
+            ),
+            self.__script_hashes,
         )
 
         next_specifications: (
@@ -228,14 +319,16 @@ class TestAutomationDriver:
             )
             next_specifications = []
 
-            for elem in specifications:
-                spec, grammar, formula = elem
-                self.__constraint_candidate_finder.set_valid_value_sequence(
-                    spec, grammar, formula, self.__magic_value_amount
-                )
+            self.__constraint_candidate_finder.set_valid_value_sequences(
+                specifications, self.__magic_value_amount
+            )
 
             for elem in specifications:
                 spec, grammar, formula = elem
+                if spec.reference in self.__reused_references:
+                    next_specifications.append(elem)
+                    continue
+
                 constraint_candidates = self.__constraint_candidate_finder.get_constraint_candidates_for_value_sequence(
                     spec
                 )
@@ -249,6 +342,9 @@ class TestAutomationDriver:
 
                 next_specifications.append((spec, grammar, formula))
 
+            # Checkpoint after every round, so an interrupted extraction keeps the completed rounds
+            self.__form_specification.flush()
+
     def __build_specification(
         self,
         html_specifications: List[HTMLInputSpecification | HTMLRadioGroupSpecification],
@@ -267,7 +363,12 @@ class TestAutomationDriver:
         """
         result = []
 
-        self.__specification_builder = SpecificationBuilder()
+        self.__form_specification = FormSpecification(
+            self.__url, self.__html_analyser.submit_element.get_as_dict()
+        )
+        self.__specification_builder = SpecificationBuilder(
+            specification=self.__form_specification
+        )
         use_datalist_options = self.__config[ConfigKey.GENERATION.value][
             ConfigKey.USE_DATALIST_OPTIONS.value
         ]
@@ -277,13 +378,49 @@ class TestAutomationDriver:
         self.__magic_value_amount = clamp_to_range(magic_value_amount, 1)
 
         next_file_index = 1
-        form_specification = {
-            "url": self.__url,
-            "controls": [],
-            "submit": self.__html_analyser.submit_element.get_as_dict(),
-        }
+        reused_file_indices: Dict[int, int] = {}
 
         for specification in html_specifications:
+            reused_control = (
+                self.__previous_extraction.get_control(
+                    specification.reference, self.__fingerprints
+                )
+                if self.__previous_extraction is not None
+                else None
+            )
+            if reused_control is not None:
+                grammar = reused_control["grammar"]
+                formula = reused_control["formula"] or None
+                self.__reused_references.add(specification.reference)
+                result.append((specification, grammar, formula))
+
+                # The fields of a combined control share its files
+                if id(reused_control) in reused_file_indices:
+                    self.__specification_builder.reuse_specification(
+                        specification.reference,
+                        grammar,
+                        formula,
+                        reused_file_indices[id(reused_control)],
+                    )
+                    continue
+
+                self.__specification_builder.reuse_specification(
+                    specification.reference, grammar, formula, next_file_index
+                )
+                (
+                    grammar_file,
+                    formula_file,
+                ) = self.__specification_builder.write_specification_to_file(
+                    str(next_file_index), grammar, formula
+                )
+                self.__form_specification.add_control(
+                    reused_control["control"]
+                    | {"grammar": grammar_file, "formula": formula_file}
+                )
+                reused_file_indices[id(reused_control)] = next_file_index
+                next_file_index += 1
+                continue
+
             grammar_with_required = None
             formula_with_required = None
 
@@ -322,7 +459,7 @@ class TestAutomationDriver:
                 str(next_file_index), grammar, formula
             )
 
-            form_specification["controls"].append(
+            self.__form_specification.add_control(
                 specification.get_representation(grammar_file, formula_file)
             )
             next_file_index += 1
@@ -334,9 +471,18 @@ class TestAutomationDriver:
                 )
             )
 
-        write_to_file("specification/specification.json", form_specification)
+        self.__form_specification.flush()
         return result
 
+    def __complete_extraction(self) -> None:
+        """Store the fingerprints of all form fields with the completed specification and exit"""
+
+        self.__form_specification.set_file(
+            FINGERPRINT_FILE,
+            create_fingerprint_file(self.__form_specification, self.__fingerprints),
+        )
+        self.__exit()
+
     def __exit(self, exit_code: int | None = None) -> None:
         """Free all resources and exit
 
@@ -344,6 +490,10 @@ class TestAutomationDriver:
         exit_code (int | None): The code with which to exit the execution
         """
 
+        # Write whatever the extraction found so far
+        if self.__form_specification is not None:
+            self.__form_specification.flush()
+
         free_service_resources()
         self.__driver.quit()
 
@@ -1,10 +1,11 @@
-import json
+import asyncio
 import os
 import random
 import re
+import threading
 
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from pathlib import Path
 from selenium.common.exceptions import TimeoutException
 from selenium.webdriver import Chrome
 from seleniumwire.request import Request, Response
@@ -16,7 +17,17 @@ from src.analysis.html_analysis import (
     HTMLRadioGroupSpecification,
     HTMLElementReference,
 )
-from src.generation.input_generation import InputGenerator, GeneratedValue, ValidityEnum
+from src.generation.budget import GenerationBudget
+from src.generation.input_generation import (
+    InputGenerator,
+    GeneratedValue,
+    GenerationRequest,
+    ValidityEnum,
+)
+from src.interaction.specification_bundle import (
+    SpecificationBundle,
+    load_specification_bundle,
+)
 from src.proxy.interception import (
     NetworkInterceptor,
     RequestScanner,
@@ -52,13 +63,21 @@ class SpecificationParser:
         """Initializes the specification parser
 
         Parameters:
-        specification_file_path (str): Path to a specification file
+        specification_file_path (str): Path to a specification file or to its compiled bundle
         """
         self.__specification_file_path = specification_file_path
+        self.__bundle: SpecificationBundle | None = None
+
+    @property
+    def bundle(self) -> SpecificationBundle | None:
+        return self.__bundle
 
     def parse(self) -> Tuple[Dict | None, str]:
         """Parses a specification and handles errors that might occur
 
+        The specification is loaded from its compiled bundle, which is compiled again if it is missing or a file
+        of the specification changed since.
+
         Returns:
         Tuple[Dict | None, str]: A python dict with all parts of the specification and the name of the containing directory
         """
@@ -68,21 +87,18 @@ class SpecificationParser:
             if self.__specification_file_path is None
             else self.__specification_file_path
         )
-        parent_dir = str(Path(file_name).parent.absolute())
-        specification_str = load_file_content(file_name)
-        if specification_str == "":
+        if not os.path.isfile(file_name):
             print(
                 "No existing specification file found. Either pass a path to a valid specification file via the -s flag or run the extract_specificaation.py script to extract a specification automatically.\nRun test.py -h for help."
             )
             return None, ""
 
-        try:
-            specification = json.loads(specification_str)
-        except json.JSONDecodeError as e:
+        self.__bundle = load_specification_bundle(file_name)
+        if self.__bundle is None:
             print("Error parsing specification file")
-            print(e)
             return None, ""
 
+        specification = self.__bundle.specification
         if (
             self.__specification_file_path is not None
             and not self.__check_specification_format(specification)
@@ -90,7 +106,7 @@ class SpecificationParser:
             print("The given specification file does not have the correct format")
             return None, ""
 
-        return specification, parent_dir
+        return specification, self.__bundle.directory
 
     def __check_specification_format(self, specification: Dict) -> bool:
         """Validates the format of a specification
@@ -197,6 +213,57 @@ class ValueGenerationSpecification:
         return f"ValueGenenerationSpecification:\nspec: {self.input_spec}\ngrammar: {self.grammar}\nformula: {self.formula}"
 
 
+class ValuePool:
+    """ValuePool class
+
+    Thread-safe store of pre-generated values for a single ValueGenerationSpecification
+    """
+
+    def __init__(self) -> None:
+        self.__values: Dict[ValidityEnum, List[GeneratedValue]] = {
+            ValidityEnum.VALID: [],
+            ValidityEnum.INVALID: [],
+        }
+        self.__condition = threading.Condition()
+        self.__closed = False
+
+    def put(self, validity: ValidityEnum, value: GeneratedValue) -> None:
+        """Adds a generated value to the pool and wakes up a waiting consumer
+
+        Parameters:
+        validity (ValidityEnum): The validity that was requested for the value
+        value (GeneratedValue): The generated value
+        """
+        with self.__condition:
+            self.__values[validity].append(value)
+            self.__condition.notify_all()
+
+    def pop(self, validity: ValidityEnum) -> GeneratedValue | None:
+        """Removes and returns the oldest value with the requested validity
+
+        Blocks until a value is available or the pool is closed.
+
+        Parameters:
+        validity (ValidityEnum): The requested validity
+
+        Returns:
+        GeneratedValue | None: The value or None if the pool was closed before a value could be generated
+        """
+        with self.__condition:
+            self.__condition.wait_for(
+                lambda: len(self.__values[validity]) > 0 or self.__closed
+            )
+            if len(self.__values[validity]) == 0:
+                return None
+            return self.__values[validity].pop(0)
+
+    def close(self) -> None:
+        """Marks the pool as complete so that consumers no longer wait for new values"""
+        with self.__condition:
+            self.__closed = True
+            self.__condition.notify_all()
+
+
 class FormTester:
     """FormTester class
 
@@ -211,6 +278,7 @@ class FormTester:
         specification_directory: str,
         config: Dict,
         report_path: str | None = None,
+        bundle: SpecificationBundle | None = None,
     ) -> None:
         """Initializes the FormTester
 
@@ -221,6 +289,7 @@ class FormTester:
         specification_directory (str):
         config (Dict):
         report_path (str | None): (default None)
+        bundle (SpecificationBundle | None): The compiled specification, whose grammars and formulas are used instead of the files (default None)
         """
 
         self.__block_successful_submissions = config[ConfigKey.TESTING.value][
@@ -242,10 +311,24 @@ class FormTester:
             self.__valid = valid
             self.__invalid = invalid
 
+        self.__pre_generate_values = config[ConfigKey.TESTING.value].get(
+            ConfigKey.PRE_GENERATE_VALUES.value, True
+        )
+        self.__value_pools: Dict[ValueGenerationSpecification, ValuePool] = {}
+        generation_config = config.get(ConfigKey.GENERATION.value, {})
+        self.__workers = generation_config.get(ConfigKey.WORKERS.value, 1)
+        self.__corpus_path = generation_config.get(ConfigKey.VALUE_CORPUS.value)
+        self.__solver_parameter_path = generation_config.get(
+            ConfigKey.SOLVER_PARAMETERS.value
+        )
+        self.__time_budget = generation_config.get(ConfigKey.TIME_BUDGET.value)
+        self.__timeout = generation_config.get(ConfigKey.TIMEOUT.value, 60)
+
         self.__specification = specification
         self.__specification_directory = specification_directory
         self.__url = url
         self.__report_path = report_path
+        self.__bundle = bundle
 
     def start_generation(self, setup_function=None, automation=None) -> None:
         self.__interceptor = NetworkInterceptor(self.__driver)
@@ -263,7 +346,16 @@ class FormTester:
                 + self.__convert_json_to_specification(json_spec)
             )
 
-        generator = InputGenerator()
+        budget = GenerationBudget(self.__time_budget, self.__timeout)
+        generator = InputGenerator(
+            workers=self.__workers,
+            corpus_path=self.__corpus_path,
+            budget=budget,
+            solver_parameter_path=self.__solver_parameter_path,
+            grammars=(
+                self.__bundle.parsed_grammars if self.__bundle is not None else None
+            ),
+        )
         self.__test_monitor = TestMonitor(
             self.__driver,
             self.__submit_element_reference,
@@ -273,17 +365,220 @@ class FormTester:
             self.__report_path,
         )
 
-        for i in range(self.__valid):
-            print(f"Round {i + 1}: Generating a valid instance...")
-            self.__prepare_next_form_filling(setup_function, automation)
-            self.__fill_form_with_values_and_submit(generator)
+        self.__create_value_pools()
+        for unit in self.__generation_units:
+            budget.set_label(
+                unit.grammar, unit.formula, unit.input_spec.name or unit.type
+            )
+
+        rounds = [ValidityEnum.VALID] * self.__valid + [
+            ValidityEnum.INVALID
+        ] * self.__invalid
+        if self.__pre_generate_values:
+            self.__start_value_pre_generation(generator)
+            for i, validity in enumerate(rounds):
+                self.__run_round(
+                    generator, i, validity, None, setup_function, automation
+                )
+        else:
+            asyncio.run(
+                self.__run_rounds_pipelined(
+                    generator, rounds, setup_function, automation
+                )
+            )
+
+        self.__test_monitor.process_saved_submissions(budget.get_report())
+        print("Solver cache:", generator.solver_cache, "\n")
+        generator.shutdown()
+
+    def __create_value_pools(self) -> None:
+        """Creates one value pool per generation unit, i.e. per field or per group of combined fields."""
+        self.__generation_units: List[ValueGenerationSpecification] = []
+        combined_fields = set()
+        for template in self.__generation_templates:
+            if template.combines is None:
+                self.__generation_units.append(template)
+            elif template.input_spec.name not in combined_fields:
+                combined_fields.update(template.combines)
+                self.__generation_units.append(template)
+
+        self.__value_pools = {unit: ValuePool() for unit in self.__generation_units}
+
+    def __start_value_pre_generation(self, generator: InputGenerator) -> None:
+        """Starts generating the values for all test rounds in the background.
 
-        for i in range(self.__invalid):
-            print(f"Round {self.__valid + i + 1}: Generating an invalid instance...")
-            self.__prepare_next_form_filling(setup_function, automation)
-            self.__fill_form_with_values_and_submit(generator, ValidityEnum.INVALID)
+        Values are generated round by round in the order in which the test rounds consume them, so the
+        submission loop only waits if the solver falls behind the browser. The fields of one round are
+        generated in parallel if the generator has more than one worker.
 
-        self.__test_monitor.process_saved_submissions()
+        Parameters:
+        generator (InputGenerator): The generator that is used exclusively by the background thread
+        """
+        units = self.__generation_units
+        rounds: List[List[Tuple[ValueGenerationSpecification, ValidityEnum]]] = []
+        for _ in range(self.__valid):
+            rounds.append([(unit, ValidityEnum.VALID) for unit in units])
+        for _ in range(self.__invalid):
+            # Any field can be chosen to be invalid in an invalid round, so both are needed
+            rounds.append(
+                [(unit, ValidityEnum.VALID) for unit in units]
+                + [(unit, ValidityEnum.INVALID) for unit in units]
+            )
+
+        def pre_generate() -> None:
+            try:
+                for requests in rounds:
+                    self.__generate_into_pools(generator, requests)
+            finally:
+                for pool in self.__value_pools.values():
+                    pool.close()
+
+        print(
+            f"Pre-generating {sum(map(len, rounds))} values for {len(units)} fields in the background..."
+        )
+        threading.Thread(target=pre_generate, daemon=True).start()
+
+    async def __run_rounds_pipelined(
+        self,
+        generator: InputGenerator,
+        rounds: List[ValidityEnum],
+        setup_function=None,
+        automation=None,
+    ) -> None:
+        """Runs the test rounds while the values of the next round are generated.
+
+        The values of round N + 1 are generated in an executor while round N is filled in, submitted and
+        checked by the TestMonitor, so the solver time and the wait for outgoing requests overlap.
+        All browser interaction happens on a single thread.
+
+        Parameters:
+        generator (InputGenerator): The generator that is used exclusively by the generation executor
+        rounds (List[ValidityEnum]): The validity of every test round in order
+        """
+        loop = asyncio.get_running_loop()
+        # The fields that are invalid in a round have to be known before its values are generated
+        plans = [self.__plan_round(validity) for validity in rounds]
+
+        with ThreadPoolExecutor(
+            max_workers=1
+        ) as generation_executor, ThreadPoolExecutor(max_workers=1) as browser_executor:
+            try:
+                next_generation = None
+                if len(plans) > 0:
+                    next_generation = loop.run_in_executor(
+                        generation_executor,
+                        self.__generate_into_pools,
+                        generator,
+                        self.__get_round_requests(plans[0]),
+                    )
+
+                for i, (validity, plan) in enumerate(zip(rounds, plans)):
+                    await next_generation
+                    if i + 1 < len(plans):
+                        next_generation = loop.run_in_executor(
+                            generation_executor,
+                            self.__generate_into_pools,
+                            generator,
+                            self.__get_round_requests(plans[i + 1]),
+                        )
+
+                    await loop.run_in_executor(
+                        browser_executor,
+                        self.__run_round,
+                        generator,
+                        i,
+                        validity,
+                        plan,
+                        setup_function,
+                        automation,
+                    )
+            finally:
+                for pool in self.__value_pools.values():
+                    pool.close()
+
+    def __run_round(
+        self,
+        generator: InputGenerator,
+        round_index: int,
+        validity: ValidityEnum,
+        validities: List[ValidityEnum] | None = None,
+        setup_function=None,
+        automation=None,
+    ) -> None:
+        if validity == ValidityEnum.VALID:
+            print(f"Round {round_index + 1}: Generating a valid instance...")
+        else:
+            print(f"Round {round_index + 1}: Generating an invalid instance...")
+
+        self.__prepare_next_form_filling(setup_function, automation)
+        self.__fill_form_with_values_and_submit(
+            generator, validity, validities or self.__plan_round(validity)
+        )
+
+    def __plan_round(self, validity: ValidityEnum) -> List[ValidityEnum]:
+        """Decides which fields get invalid values in a round
+
+        Parameters:
+        validity (ValidityEnum): The validity of the round
+
+        Returns:
+        List[ValidityEnum]: The requested validity per generation unit
+        """
+        validities = [ValidityEnum.VALID] * len(self.__generation_templates)
+        combined = list(
+            filter(lambda t: t.combines is not None, self.__generation_templates)
+        )
+
+        # If we want to also generate invalid values we choose between 1 and n elements
+        # to be invalid for a for with n input fields
+        if validity == ValidityEnum.INVALID:
+            num_changes = random.randint(1, len(validities) - len(combined))
+            indices_to_change = random.sample(
+                range(len(validities) - len(combined)), num_changes
+            )
+            for idx in indices_to_change:
+                validities[idx] = ValidityEnum.INVALID
+
+        return validities
+
+    def __get_round_requests(
+        self, validities: List[ValidityEnum]
+    ) -> List[Tuple[ValueGenerationSpecification, ValidityEnum]]:
+        # Each generation unit consumes one entry of the validities, see __fill_form_with_values_and_submit
+        return [
+            (unit, validities[index])
+            for index, unit in enumerate(self.__generation_units)
+        ]
+
+    def __generate_into_pools(
+        self,
+        generator: InputGenerator,
+        requests: List[Tuple[ValueGenerationSpecification, ValidityEnum]],
+    ) -> None:
+        results = generator.generate_inputs_in_parallel(
+            [
+                GenerationRequest(unit.grammar, unit.formula, validity)
+                for unit, validity in requests
+            ]
+        )
+        for (unit, validity), values in zip(requests, results):
+            self.__value_pools[unit].put(validity, values[0])
+
+    def __get_value(
+        self,
+        generator: InputGenerator,
+        template: ValueGenerationSpecification,
+        validity: ValidityEnum,
+    ) -> GeneratedValue:
+        pool = self.__value_pools.get(template)
+        if pool is not None:
+            value = pool.pop(validity)
+            if value is not None:
+                return value
+
+        return generator.generate_inputs(template.grammar, template.formula, validity)[
+            0
+        ]
 
     def __prepare_next_form_filling(self, setup_function=None, automation=None) -> None:
         clear_value_mapping()
@@ -301,12 +596,16 @@ class FormTester:
     ) -> List[ValueGenerationSpecification]:
         result = []
 
-        grammar = load_file_content(
-            f'{self.__specification_directory}/{control["grammar"]}'
-        )
-        formula = load_file_content(
-            f'{self.__specification_directory}/{control["formula"]}'
-        )
+        if self.__bundle is not None:
+            grammar = self.__bundle.get_grammar(control["grammar"])
+            formula = self.__bundle.get_formula(control["formula"])
+        else:
+            grammar = load_file_content(
+                f'{self.__specification_directory}/{control["grammar"]}'
+            )
+            formula = load_file_content(
+                f'{self.__specification_directory}/{control["formula"]}'
+            )
 
         fields = [control]
         combines = None
@@ -360,23 +659,15 @@ class FormTester:
         return result
 
     def __fill_form_with_values_and_submit(
-        self, generator: InputGenerator, validity: ValidityEnum = ValidityEnum.VALID
+        self,
+        generator: InputGenerator,
+        validity: ValidityEnum,
+        validities: List[ValidityEnum],
     ) -> None:
         values: List[GeneratedValue] = []
         templates = self.__generation_templates.copy()
-        validities = [ValidityEnum.VALID] * len(templates)
-        combined = list(filter(lambda t: t.combines is not None, templates))
-
-        # If we want to also generate invalid values we choose between 1 and n elements
-        # to be invalid for a for with n input fields
-        if validity == ValidityEnum.INVALID:
-            num_changes = random.randint(1, len(validities) - len(combined))
-            indices_to_change = random.sample(
-                range(len(validities) - len(combined)), num_changes
-            )
-            for idx in indices_to_change:
-                validities[idx] = ValidityEnum.INVALID
 
+        # Each iteration of the loop below handles one generation unit, so validities are indexed by unit
         index = 0
         while len(templates) > 0:
             template = templates[0]
@@ -388,9 +679,9 @@ class FormTester:
                     for index, template in enumerate(templates)
                     if template.input_spec.name in template.combines
                 ]
-                generated_values: str = generator.generate_inputs(
-                    template.grammar, template.formula, validities[index]
-                )[0].value
+                generated_values: str = self.__get_value(
+                    generator, template, validities[index]
+                ).value
 
                 pattern = r"(?:^|###)(.*?)(?=###|$)"
                 matches = re.finditer(pattern, generated_values)
@@ -425,9 +716,9 @@ class FormTester:
 
             else:
                 templates.pop(0)
-                generated_value = generator.generate_inputs(
-                    template.grammar, template.formula, validities[index]
-                )[0]
+                generated_value = self.__get_value(
+                    generator, template, validities[index]
+                )
                 values.append(generated_value)
 
                 write_to_web_element_by_reference_with_clear(
@@ -526,7 +817,7 @@ class TestMonitor:
             else:
                 self.__tp += 1
 
-    def process_saved_submissions(self) -> None:
+    def process_saved_submissions(self, generation_report: Dict | None = None) -> None:
         result = {}
         successful = 0
         failed = 0
@@ -560,15 +851,19 @@ class TestMonitor:
             "tn": self.__tn,
             "fn": self.__fn,
         }
+        if generation_report is not None:
+            result["generation"] = generation_report
 
         if self.__report_path is None:
             os.makedirs("report", exist_ok=True)
             write_to_file("report/results.json", result)
         else:
             write_to_file(self.__report_path, result)
-        self.__print_summary(successful, failed)
+        self.__print_summary(successful, failed, generation_report)
 
-    def __print_summary(self, successful: int, failed: int) -> None:
+    def __print_summary(
+        self, successful: int, failed: int, generation_report: Dict | None = None
+    ) -> None:
         print("\nSummary:")
         print("Total Form Instances generated:", len(self.__saved_submissions))
         print(f"To be valid: {self.__valid}")
@@ -593,6 +888,37 @@ class TestMonitor:
             ),
             "\n",
         )
+        if generation_report is not None:
+            print(
+                tabulate(
+                    [
+                        [
+                            field,
+                            stats["requests"],
+                            stats["timeouts"],
+                            stats["skipped"],
+                            stats["native_values"],
+                            stats["spent_seconds"],
+                            "yes" if stats["deprioritised"] else "no",
+                            stats["satisfiability"] or "UNKNOWN",
+                        ]
+                        for field, stats in generation_report.items()
+                        if field != "total"
+                    ],
+                    headers=[
+                        "Field",
+                        "Requests",
+                        "Timeouts",
+                        "Skipped",
+                        "Native",
+                        "Time (s)",
+                        "Deprioritised",
+                        "Satisfiability",
+                    ],
+                    tablefmt="pretty",
+                ),
+                "\n",
+            )
         print(
             "For a more detailed report refer to 'automation/report/results.json'",
             "\n",
@@ -0,0 +1,313 @@
+import hashlib
+import json
+import os
+
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from src.utility.grammar import Grammar, NONTERMINAL_PATTERN
+
+"""
+Specification Bundle module
+
+Compiles a specification, i.e. a specification.json and the grammar and formula files of its controls, into a
+single bundle file. The bundle holds the parsed grammars, the formulas and the element references, so starting a
+test reads one file instead of parsing every file of the specification again.
+"""
+
+BUNDLE_SUFFIX = ".bundle.json"
+BUNDLE_VERSION = 1
+
+
+class SpecificationBundle:
+    """SpecificationBundle class
+
+    A validated specification together with the fingerprints of the files it was compiled from. A bundle whose
+    source files changed or appeared since it was compiled is out of date and has to be compiled again.
+    """
+
+    def __init__(
+        self,
+        specification_file: str,
+        specification: Dict,
+        grammars: Dict[str, Tuple[str, Grammar]],
+        formulas: Dict[str, str],
+        sources: Dict[str, Dict | None],
+    ) -> None:
+        """Initializes a bundle
+
+        Parameters:
+        specification_file (str): The absolute path of the specification file the bundle was compiled from
+        specification (Dict): The content of the specification file
+        grammars (Dict[str, Tuple[str, Grammar]]): The text and the parsed grammar by the name of their file
+        formulas (Dict[str, str]): The formulas by the name of their file, empty for controls without formula
+        sources (Dict[str, Dict | None]): The size, modification time and content hash of every source file by its
+        name, None for files that were missing
+        """
+        self.__specification_file = specification_file
+        self.__specification = specification
+        self.__grammars = grammars
+        self.__formulas = formulas
+        self.__sources = sources
+
+    @property
+    def specification_file(self) -> str:
+        return self.__specification_file
+
+    @property
+    def directory(self) -> str:
+        return str(Path(self.__specification_file).parent)
+
+    @property
+    def path(self) -> str:
+        return get_bundle_path(self.__specification_file)
+
+    @property
+    def specification(self) -> Dict:
+        return self.__specification
+
+    @property
+    def parsed_grammars(self) -> Dict[str, Grammar]:
+        """The parsed grammars by their BNF text"""
+        return {text: grammar for text, grammar in self.__grammars.values()}
+
+    def get_grammar(self, file_name: str) -> str:
+        return self.__grammars[file_name][0]
+
+    def get_formula(self, file_name: str) -> str:
+        return self.__formulas[file_name]
+
+    def is_up_to_date(self) -> bool:
+        """Checks whether any source file changed since the bundle was compiled
+
+        Files with the size and modification time of compilation are not read again, all others are compared
+        by their content hash.
+
+        Returns:
+        bool: True if all source files are unchanged, False otherwise
+        """
+        for file_name, fingerprint in self.__sources.items():
+            path = os.path.join(self.directory, file_name)
+            if fingerprint is None:
+                # A control was left out because of this file
+                if os.path.isfile(path):
+                    return False
+                continue
+
+            if not os.path.isfile(path):
+                return False
+
+            stat = os.stat(path)
+            if (
+                stat.st_size == fingerprint["size"]
+                and stat.st_mtime_ns == fingerprint["mtime"]
+            ):
+                continue
+
+            if _get_hash(path) != fingerprint["sha256"]:
+                return False
+
+        return True
+
+    def write(self) -> None:
+        """Writes the bundle next to its specification file, replacing an existing bundle atomically"""
+        content = {
+            "version": BUNDLE_VERSION,
+            "specification_file": Path(self.__specification_file).name,
+            "specification": self.__specification,
+            "grammars": {
+                file_name: {"text": text, "table": grammar.to_table()}
+                for file_name, (text, grammar) in self.__grammars.items()
+            },
+            "formulas": self.__formulas,
+            "sources": self.__sources,
+        }
+
+        temporary_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(temporary_path, "w") as file:
+            json.dump(content, file)
+        os.replace(temporary_path, self.path)
+
+    @classmethod
+    def from_file(cls, bundle_path: str):
+        """Reads a bundle with a single read and without parsing its grammars again
+
+        Parameters:
+        bundle_path (str): The path of the bundle file
+
+        Returns:
+        SpecificationBundle | None: The bundle or None if the file is missing or was written by another version
+        """
+        try:
+            with open(bundle_path) as file:
+                content = json.load(file)
+        except (OSError, json.JSONDecodeError):
+            return None
+
+        if content.get("version") != BUNDLE_VERSION:
+            return None
+
+        return cls(
+            str(Path(bundle_path).parent.absolute() / content["specification_file"]),
+            content["specification"],
+            {
+                file_name: (grammar["text"], Grammar.from_table(grammar["table"]))
+                for file_name, grammar in content["grammars"].items()
+            },
+            content["formulas"],
+            content["sources"],
+        )
+
+
+def get_bundle_path(specification_file: str) -> str:
+    """Returns the path of the bundle of a specification file, e.g. specification.bundle.json for specification.json"""
+    path = Path(specification_file)
+    return str(path.with_name(f"{path.stem}{BUNDLE_SUFFIX}"))
+
+
+def compile_specification(specification_file: str) -> SpecificationBundle | None:
+    """Validates a specification and compiles it into a bundle next to the specification file
+
+    Controls without a grammar or formula file or with a grammar that cannot be parsed are left out of the bundle,
+    so the remaining fields can still be tested. Nonterminals that are used but not defined by the grammar of a
+    control are only reported, the value generation of that field fails like without a bundle.
+
+    Parameters:
+    specification_file (str): The path of the specification file
+
+    Returns:
+    SpecificationBundle | None: The bundle or None if the specification file cannot be read
+    """
+    specification_file = str(Path(specification_file).absolute())
+    directory = str(Path(specification_file).parent)
+    sources: Dict[str, Dict | None] = {}
+    try:
+        specification = json.loads(
+            _read_source(directory, Path(specification_file).name, sources)
+        )
+    except (OSError, json.JSONDecodeError) as e:
+        print("Error compiling specification:", e)
+        return None
+
+    grammars: Dict[str, Tuple[str, Grammar]] = {}
+    formulas: Dict[str, str] = {}
+    controls: List[Dict] = []
+    problems: List[str] = []
+    for control in specification.get("controls", []):
+        grammar_file = control.get("grammar")
+        formula_file = control.get("formula")
+        if grammar_file is None or formula_file is None:
+            problems.append("control without grammar or formula file is left out")
+            continue
+
+        missing = [
+            file_name
+            for file_name in [grammar_file, formula_file]
+            if not os.path.isfile(os.path.join(directory, file_name))
+        ]
+        if len(missing) > 0:
+            for file_name in missing:
+                sources[file_name] = None
+                problems.append(f"{file_name} does not exist, its control is left out")
+            continue
+
+        if grammar_file not in grammars:
+            text = _read_source(directory, grammar_file, sources)
+            try:
+                grammars[grammar_file] = (text, Grammar.from_bnf(text))
+            except ValueError as e:
+                problems.append(f"{grammar_file}: {e}, its control is left out")
+                continue
+
+        if formula_file not in formulas:
+            formulas[formula_file] = _read_source(directory, formula_file, sources)
+
+        problems += _check_nonterminals(
+            grammar_file,
+            formula_file,
+            grammars[grammar_file][1],
+            formulas[formula_file],
+        )
+        controls.append(control)
+
+    if len(problems) > 0:
+        print("Problems in the specification:")
+        for problem in problems:
+            print(f"  {problem}")
+
+    specification["controls"] = controls
+
+    bundle = SpecificationBundle(
+        specification_file, specification, grammars, formulas, sources
+    )
+    try:
+        bundle.write()
+    except OSError as e:
+        # The compiled bundle can still be used for this run
+        print("Error writing specification bundle:", e)
+
+    return bundle
+
+
+def load_specification_bundle(specification_file: str) -> SpecificationBundle | None:
+    """Returns the bundle of a specification file, compiling it again if it is missing or out of date
+
+    Parameters:
+    specification_file (str): The path of the specification file or of its bundle
+
+    Returns:
+    SpecificationBundle | None: The bundle or None if the specification is invalid
+    """
+    if specification_file.endswith(BUNDLE_SUFFIX):
+        bundle = SpecificationBundle.from_file(specification_file)
+        if bundle is None:
+            print("Error reading specification bundle", specification_file)
+            return None
+        specification_file = bundle.specification_file
+    else:
+        bundle = SpecificationBundle.from_file(get_bundle_path(specification_file))
+
+    if bundle is not None and bundle.is_up_to_date():
+        return bundle
+
+    return compile_specification(specification_file)
+
+
+def _check_nonterminals(
+    grammar_file: str, formula_file: str, grammar: Grammar, formula: str
+) -> List[str]:
+    problems = []
+    if "<start>" not in grammar:
+        problems.append(f"{grammar_file}: <start> is not defined")
+
+    for nonterminal in grammar.to_table()["nonterminals"]:
+        if nonterminal not in grammar:
+            problems.append(f"{grammar_file}: {nonterminal} is not defined")
+
+    for nonterminal in sorted(set(NONTERMINAL_PATTERN.findall(formula))):
+        if nonterminal not in grammar:
+            problems.append(f"{formula_file}: {nonterminal} is not defined")
+
+    return problems
+
+
+def _read_source(
+    directory: str, file_name: str, sources: Dict[str, Dict | None]
+) -> str:
+    # The fingerprint is taken from the same read as the content, so a concurrent change makes the bundle stale
+    path = os.path.join(directory, file_name)
+    stat = os.stat(path)
+    with open(path, "rb") as file:
+        content = file.read()
+
+    sources[file_name] = {
+        "size": stat.st_size,
+        "mtime": stat.st_mtime_ns,
+        "sha256": hashlib.sha256(content).hexdigest(),
+    }
+    return content.decode()
+
+
+def _get_hash(path: str) -> str:
+    with open(path, "rb") as file:
+        return hashlib.sha256(file.read()).hexdigest()
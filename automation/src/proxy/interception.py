@@ -1,3 +1,4 @@
+import hashlib
 import json
 import requests
 import urllib.parse
@@ -49,6 +50,8 @@ class NetworkInterceptor:
 
         self.html_files_instrumented = 0
         self.js_files_instrumented = 0
+        # Content hashes of the original scripts of the page, for the fingerprints of the form fields
+        self.script_hashes: Dict[str, str] = {}
 
     def delete_request_interceptor(self) -> None:
         del self.__driver.request_interceptor
@@ -64,6 +67,11 @@ class NetworkInterceptor:
         del self.__driver.response_interceptor
         self.__driver.response_interceptor = self.__file_interceptor
 
+    def record_scripts(self) -> None:
+        """Start recording the hashes of all scripts the browser loads without instrumenting them."""
+        del self.__driver.response_interceptor
+        self.__driver.response_interceptor = self.__script_recorder
+
     def scan_for_form_submission(self) -> None:
         self.__request_scanner = RequestScanner()
         del self.__driver.request_interceptor
@@ -82,23 +90,15 @@ class NetworkInterceptor:
         For each HTML file a script tag is added to enable access of common methods for dynamic analysis.
         """
 
-        content_type = response.headers["Content-Type"] or ""
-        name = self.__get_file_name_from_url(request.url)
-        file_type = name.split(".")[-1]
+        self.__script_recorder(request, response)
 
-        if (
-            any(
-                content_type.startswith(mime_type)
-                for mime_type in self.__javascript_mime_types
-            )
-            or file_type == "js"
-        ):
+        if self.__is_javascript_file(request, response):
             new_body = self.__handle_js_file(request, response)
             if new_body:
                 response.body = new_body
                 self.js_files_instrumented += 1
 
-        if content_type.startswith("text/html") or file_type == "html":
+        if self.__is_html_file(request, response):
             new_body = self.__handle_html_file(response)
             if new_body:
                 response.body = new_body
@@ -110,6 +110,41 @@ class NetworkInterceptor:
             del response.headers["content-length"]
             response.headers["content-length"] = str(len(response.body))
 
+    def __script_recorder(self, request: Request, response: Response) -> None:
+        """Record the hash of the original content of JavaScript files and of the inline scripts of HTML files."""
+
+        if service_base_url in request.url:
+            return
+
+        if self.__is_javascript_file(request, response):
+            self.script_hashes[request.url] = hashlib.sha256(response.body).hexdigest()
+        elif self.__is_html_file(request, response):
+            try:
+                html_ast = html.fromstring(decode_bytes(response.body))
+            except Exception:
+                return
+
+            inline_scripts = "\n".join(html_ast.xpath("//script[not(@src)]/text()"))
+            self.script_hashes[request.url] = hashlib.sha256(
+                inline_scripts.encode()
+            ).hexdigest()
+
+    def __is_javascript_file(self, request: Request, response: Response) -> bool:
+        content_type = response.headers["Content-Type"] or ""
+        file_type = self.__get_file_name_from_url(request.url).split(".")[-1]
+        return (
+            any(
+                content_type.startswith(mime_type)
+                for mime_type in self.__javascript_mime_types
+            )
+            or file_type == "js"
+        )
+
+    def __is_html_file(self, request: Request, response: Response) -> bool:
+        content_type = response.headers["Content-Type"] or ""
+        file_type = self.__get_file_name_from_url(request.url).split(".")[-1]
+        return content_type.startswith("text/html") or file_type == "html"
+
     def __handle_js_file(self, request: Request, response: Response) -> bytes:
         """Send JavaScript file to the instrumentation service and return instrumented content."""
 
@@ -0,0 +1,595 @@
+import re
+
+from isla.helpers import instantiate_escaped_symbols
+from typing import Dict, Iterable, List, Set, Tuple
+
+"""
+Grammar module
+
+A structured representation of BNF grammars, so specifications can be renamed, combined and written without
+string replacements over the whole grammar text.
+"""
+
+# Nonterminals are stored as indices into the symbol table, terminals in their quoted BNF form
+Symbol = int | str
+Expansion = List[Symbol]
+
+TOKEN_PATTERN = re.compile(r'"(?:\\.|[^"\\])*"|::=|\||<[^<>\s"|]+>|[^\s"|<]+|<')
+NONTERMINAL_PATTERN = re.compile(r"<[^<>\s\"|]+>")
+
+
+class Grammar:
+    """Grammar class
+
+    Rules of a BNF grammar over a symbol table of nonterminal names.
+    Expansions refer to nonterminals by their index in the table, so renaming a nonterminal only touches the table
+    and merging two grammars only shifts the indices of the second one. Parsing and serialisation are linear in
+    the size of the grammar. Terminals keep their quoted form, which also keeps placeholders of template grammars
+    such as the radio group intact.
+    """
+
+    def __init__(self) -> None:
+        self.__names: List[str] = []
+        self.__ids: Dict[str, int] = {}
+        # Rules in the order of their definition
+        self.__rules: Dict[int, List[Expansion]] = {}
+
+    @classmethod
+    def from_bnf(cls, bnf: str):
+        """Parses a grammar in BNF format
+
+        Parameters:
+        bnf (str): The grammar, one or more rules of the form <nonterminal> ::= expansion | expansion
+
+        Returns:
+        Grammar: The parsed grammar
+        """
+        grammar = cls()
+        tokens = TOKEN_PATTERN.findall(bnf)
+        current: List[Expansion] | None = None
+        index = 0
+        while index < len(tokens):
+            token = tokens[index]
+            if index + 1 < len(tokens) and tokens[index + 1] == "::=":
+                if not NONTERMINAL_PATTERN.fullmatch(token):
+                    raise ValueError(f"{token} is not a nonterminal")
+                current = [[]]
+                grammar.__rules[grammar.__get_id(token)] = current
+                index += 2
+                continue
+
+            if current is None:
+                raise ValueError(f"{token} does not belong to a rule")
+            if token == "|":
+                current.append([])
+            else:
+                current[-1].append(grammar.__to_symbol(token))
+            index += 1
+
+        return grammar
+
+    @property
+    def nonterminals(self) -> List[str]:
+        """The nonterminals with a rule, in the order of their definition"""
+        return [self.__names[symbol] for symbol in self.__rules]
+
+    @property
+    def terminals(self) -> Set[str]:
+        """The unescaped terminals of all expansions"""
+        return {
+            _unquote(symbol)
+            for expansions in self.__rules.values()
+            for expansion in expansions
+            for symbol in expansion
+            if isinstance(symbol, str)
+        }
+
+    def __contains__(self, nonterminal: str) -> bool:
+        return nonterminal in self.__ids and self.__ids[nonterminal] in self.__rules
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, Grammar) and self.to_dict() == other.to_dict()
+
+    def copy(self):
+        grammar = Grammar()
+        grammar.__names = list(self.__names)
+        grammar.__ids = dict(self.__ids)
+        grammar.__rules = {
+            symbol: [list(expansion) for expansion in expansions]
+            for symbol, expansions in self.__rules.items()
+        }
+        return grammar
+
+    def get_expansions(self, nonterminal: str) -> List[str]:
+        """Returns the expansions of a nonterminal in BNF format"""
+        return [
+            self.__expansion_to_string(expansion)
+            for expansion in self.__rules[self.__ids[nonterminal]]
+        ]
+
+    def set_expansions(self, nonterminal: str, expansions: Iterable[str]) -> None:
+        """Replaces the rule of a nonterminal or adds a new rule
+
+        Parameters:
+        nonterminal (str): The nonterminal, e.g. <date>
+        expansions (Iterable[str]): The expansions in BNF format, e.g. '"2024-01-01"' or '<year> "-" <month>'
+        """
+        self.__rules[self.__get_id(nonterminal)] = [
+            [self.__to_symbol(token) for token in TOKEN_PATTERN.findall(expansion)]
+            for expansion in expansions
+        ]
+
+    def remove(self, nonterminal: str) -> None:
+        """Removes the rule of a nonterminal, references to it are kept"""
+        del self.__rules[self.__ids[nonterminal]]
+
+    def rename(self, mapping: Dict[str, str]) -> None:
+        """Renames nonterminals in the rules they define and in all expansions that refer to them
+
+        Parameters:
+        mapping (Dict[str, str]): The new name for each nonterminal that is renamed
+        """
+        renamed = {
+            self.__ids[old_name]: new_name
+            for old_name, new_name in mapping.items()
+            if old_name in self.__ids
+        }
+        for symbol in renamed:
+            del self.__ids[self.__names[symbol]]
+
+        for symbol, new_name in renamed.items():
+            if new_name in self.__ids:
+                raise ValueError(f"{new_name} is already part of the grammar")
+            self.__names[symbol] = new_name
+            self.__ids[new_name] = symbol
+
+    def remove_unreachable(self, start_symbol: str = "<start>") -> None:
+        """Removes all rules that cannot be reached from the start symbol"""
+        reachable = {self.__ids[start_symbol]}
+        pending = [self.__ids[start_symbol]]
+        while len(pending) > 0:
+            for expansion in self.__rules.get(pending.pop(), []):
+                for symbol in expansion:
+                    if isinstance(symbol, int) and symbol not in reachable:
+                        reachable.add(symbol)
+                        pending.append(symbol)
+
+        self.__rules = {
+            symbol: expansions
+            for symbol, expansions in self.__rules.items()
+            if symbol in reachable
+        }
+
+    def merge(self, other):
+        """Returns a grammar with the rules of both grammars
+
+        Parameters:
+        other (Grammar): A grammar whose nonterminals do not occur in this grammar
+
+        Returns:
+        Grammar: The combined grammar, rules of this grammar come first
+        """
+        for name in other.nonterminals:
+            if name in self:
+                raise ValueError(f"{name} is defined in both grammars")
+
+        grammar = self.copy()
+        symbols = [grammar.__get_id(name) for name in other.__names]
+        for symbol, expansions in other.__rules.items():
+            grammar.__rules[symbols[symbol]] = [
+                [
+                    symbols[element] if isinstance(element, int) else element
+                    for element in expansion
+                ]
+                for expansion in expansions
+            ]
+
+        return grammar
+
+    def to_dict(self) -> Dict[str, List[str]]:
+        """Returns the rules as mapping from nonterminals to expansions in BNF format"""
+        return {
+            self.__names[symbol]: [
+                self.__expansion_to_string(expansion) for expansion in expansions
+            ]
+            for symbol, expansions in self.__rules.items()
+        }
+
+    def to_table(self) -> Dict:
+        """Returns the symbol table and the rules in a JSON serialisable form, see from_table"""
+        return {
+            "nonterminals": list(self.__names),
+            "rules": [
+                [symbol, expansions] for symbol, expansions in self.__rules.items()
+            ],
+        }
+
+    @classmethod
+    def from_table(cls, table: Dict):
+        """Restores a grammar from the result of to_table without parsing it again
+
+        Parameters:
+        table (Dict): The symbol table and the rules
+
+        Returns:
+        Grammar: The restored grammar
+        """
+        grammar = cls()
+        grammar.__names = list(table["nonterminals"])
+        grammar.__ids = {name: symbol for symbol, name in enumerate(grammar.__names)}
+        grammar.__rules = {
+            symbol: [list(expansion) for expansion in expansions]
+            for symbol, expansions in table["rules"]
+        }
+        return grammar
+
+    def to_bnf(self) -> str:
+        """Serialises the grammar in BNF format, one rule per line"""
+        return "\n".join(
+            f'{nonterminal} ::= {" | ".join(expansions)}'
+            for nonterminal, expansions in self.to_dict().items()
+        )
+
+    def to_isla_grammar(self) -> Dict[str, List[str]]:
+        """Returns the grammar in the format of isla.language.parse_bnf
+
+        Terminals are unescaped and joined with the nonterminals of an expansion. A "<" in a terminal could be
+        mistaken for the start of a nonterminal, so like parse_bnf it is derived from a separate <langle> rule.
+        """
+        langle = "<langle>"
+        index = 0
+        while langle in self.__ids:
+            langle = f"<langle_{index}>"
+            index += 1
+
+        uses_langle = False
+        result: Dict[str, List[str]] = {}
+        for symbol, expansions in self.__rules.items():
+            result[self.__names[symbol]] = []
+            for expansion in expansions:
+                elements: List[str] = []
+                for element in expansion:
+                    if isinstance(element, int):
+                        elements.append(self.__names[element])
+                        continue
+
+                    terminal = _unquote(element)
+                    uses_langle = uses_langle or "<" in terminal
+                    elements.append(terminal.replace("<", langle))
+                result[self.__names[symbol]].append("".join(elements))
+
+        if uses_langle:
+            result[langle] = ["<"]
+
+        return result
+
+    @property
+    def size(self) -> Dict[str, int]:
+        """The number of rules, expansions and symbols of the grammar"""
+        return {
+            "rules": len(self.__rules),
+            "expansions": sum(len(expansions) for expansions in self.__rules.values()),
+            "symbols": sum(
+                len(expansion)
+                for expansions in self.__rules.values()
+                for expansion in expansions
+            ),
+        }
+
+    def optimize(
+        self, protected: Iterable[str] = ("<start>",), start_symbol: str = "<start>"
+    ) -> None:
+        """Shrinks the grammar without changing its language
+
+        Removes unproductive and unreachable rules, merges nonterminals with identical rules, inlines rules with a
+        single expansion that is trivial or used only once and factors unrolled repetitions like E | E E | E E E
+        into a chain of optional elements.
+        Protected nonterminals, e.g. the ones a formula refers to, keep their names and rules and no further
+        occurrences of them are introduced, so the formula keeps its meaning.
+
+        Parameters:
+        protected (Iterable[str]): Nonterminals that must not be removed, merged or inlined (default ("<start>",))
+        start_symbol (str): The start symbol of the grammar (default "<start>")
+        """
+        if start_symbol not in self:
+            return
+
+        protected_symbols = {
+            self.__ids[nonterminal]
+            for nonterminal in list(protected) + [start_symbol]
+            if nonterminal in self
+        }
+        self.__remove_unproductive(protected_symbols)
+        self.__factor_repetitions(protected_symbols)
+
+        size = None
+        while size != self.size:
+            size = self.size
+            self.__merge_identical(protected_symbols)
+            self.__inline_chains(protected_symbols)
+
+        self.__remove_unreachable(self.__ids[start_symbol], protected_symbols)
+
+    def __remove_unproductive(self, protected: Set[int]) -> None:
+        productive: Set[int] = set()
+        changed = True
+        while changed:
+            changed = False
+            for symbol, expansions in self.__rules.items():
+                if symbol not in productive and any(
+                    self.__is_productive(expansion, productive)
+                    for expansion in expansions
+                ):
+                    productive.add(symbol)
+                    changed = True
+
+        # Without a word for a protected nonterminal the formula would refer to a rule that is gone
+        if any(
+            symbol in self.__rules and symbol not in productive for symbol in protected
+        ):
+            return
+
+        self.__rules = {
+            symbol: [
+                expansion
+                for expansion in expansions
+                if self.__is_productive(expansion, productive)
+            ]
+            for symbol, expansions in self.__rules.items()
+            if symbol in productive
+        }
+
+    def __is_productive(self, expansion: Expansion, productive: Set[int]) -> bool:
+        return all(
+            not isinstance(element, int) or element in productive
+            for element in expansion
+        )
+
+    def __merge_identical(self, protected: Set[int]) -> None:
+        representatives: Dict[Tuple, int] = {}
+        replacements: Dict[int, int] = {}
+        for symbol, expansions in self.__rules.items():
+            if symbol in protected:
+                continue
+
+            signature = tuple(
+                sorted(_get_signature(expansion) for expansion in expansions)
+            )
+            if signature in representatives:
+                replacements[symbol] = representatives[signature]
+            else:
+                representatives[signature] = symbol
+
+        if len(replacements) == 0:
+            return
+
+        self.__rules = {
+            symbol: _deduplicate(
+                [
+                    [replacements.get(element, element) for element in expansion]
+                    for expansion in expansions
+                ]
+            )
+            for symbol, expansions in self.__rules.items()
+            if symbol not in replacements
+        }
+
+    def __inline_chains(self, protected: Set[int]) -> None:
+        uses: Dict[int, int] = {}
+        for expansions in self.__rules.values():
+            for expansion in expansions:
+                for element in expansion:
+                    if isinstance(element, int):
+                        uses[element] = uses.get(element, 0) + 1
+
+        inlined: Dict[int, Expansion] = {
+            symbol: expansions[0]
+            for symbol, expansions in self.__rules.items()
+            if symbol not in protected
+            and len(expansions) == 1
+            and symbol not in expansions[0]
+            and (len(expansions[0]) <= 1 or uses.get(symbol, 0) == 1)
+        }
+        if len(inlined) == 0:
+            return
+
+        resolved: Dict[int, Expansion] = {}
+
+        def resolve(symbol: int, visiting: Set[int]) -> Expansion:
+            if symbol in resolved:
+                return resolved[symbol]
+            if symbol not in inlined or symbol in visiting:
+                return [symbol]
+
+            visiting.add(symbol)
+            expansion: Expansion = []
+            for element in inlined[symbol]:
+                expansion.extend(
+                    resolve(element, visiting)
+                    if isinstance(element, int)
+                    else [element]
+                )
+            visiting.remove(symbol)
+            resolved[symbol] = expansion
+            return expansion
+
+        self.__rules = {
+            symbol: _deduplicate(
+                [
+                    [
+                        resolved_element
+                        for element in expansion
+                        for resolved_element in (
+                            resolve(element, set())
+                            if isinstance(element, int)
+                            else [element]
+                        )
+                    ]
+                    for expansion in expansions
+                ]
+            )
+            for symbol, expansions in self.__rules.items()
+            if symbol not in inlined
+        }
+
+    def __factor_repetitions(self, protected: Set[int]) -> None:
+        for symbol, expansions in list(self.__rules.items()):
+            repeated = expansions[0][0] if len(expansions[0]) > 0 else None
+            counts = [len(expansion) for expansion in expansions]
+            if (
+                symbol in protected
+                or len(expansions) < 3
+                or repeated is None
+                or any(
+                    any(element != repeated for element in expansion)
+                    for expansion in expansions
+                )
+                or counts != list(range(counts[0], counts[0] + len(counts)))
+            ):
+                continue
+
+            # E^min followed by max - min optional elements, each of them only if the one before is present
+            tails = [
+                self.__get_id(self.__get_free_name(f"{self.__names[symbol][:-1]}-tail"))
+                for _ in range(len(counts) - 1)
+            ]
+            for index, tail in enumerate(tails):
+                rest = [tails[index + 1]] if index + 1 < len(tails) else []
+                self.__rules[tail] = [[], [repeated] + rest]
+            self.__rules[symbol] = [[repeated] * counts[0] + [tails[0]]]
+
+    def __remove_unreachable(self, start: int, protected: Set[int]) -> None:
+        reachable = {start} | protected
+        pending = list(reachable)
+        while len(pending) > 0:
+            for expansion in self.__rules.get(pending.pop(), []):
+                for element in expansion:
+                    if isinstance(element, int) and element not in reachable:
+                        reachable.add(element)
+                        pending.append(element)
+
+        self.__rules = {
+            symbol: expansions
+            for symbol, expansions in self.__rules.items()
+            if symbol in reachable
+        }
+
+    def __get_free_name(self, prefix: str) -> str:
+        index = 1
+        while f"{prefix}-{index}>" in self.__ids:
+            index += 1
+        return f"{prefix}-{index}>"
+
+    def number_nonterminals(
+        self, start_number: int, skip: List[str] | None = None
+    ) -> Tuple[Dict[str, str], int]:
+        """Renames the nonterminals with rules to <nt1>, <nt2>, ... in the order of their definition
+
+        Parameters:
+        start_number (int): The number of the first nonterminal
+        skip (List[str] | None): Nonterminals that keep their names (default None)
+
+        Returns:
+        Tuple[Dict[str, str], int]: The new name for each nonterminal and the next free number
+        """
+        skip = [] if skip is None else skip
+        mapping: Dict[str, str] = {}
+        number = start_number
+        for nonterminal in self.nonterminals:
+            if nonterminal not in skip:
+                mapping[nonterminal] = f"<nt{number}>"
+                number += 1
+
+        self.rename(mapping)
+        return mapping, number
+
+    def __get_id(self, nonterminal: str) -> int:
+        if nonterminal not in self.__ids:
+            self.__ids[nonterminal] = len(self.__names)
+            self.__names.append(nonterminal)
+        return self.__ids[nonterminal]
+
+    def __to_symbol(self, token: str) -> Symbol:
+        return self.__get_id(token) if NONTERMINAL_PATTERN.fullmatch(token) else token
+
+    def __expansion_to_string(self, expansion: Expansion) -> str:
+        if len(expansion) == 0:
+            return '""'
+
+        return " ".join(
+            self.__names[element] if isinstance(element, int) else element
+            for element in expansion
+        )
+
+
+def rename_in_formula(formula: str | None, mapping: Dict[str, str]) -> str | None:
+    """Renames the nonterminals of a formula in a single pass
+
+    Parameters:
+    formula (str | None): The ISLa formula
+    mapping (Dict[str, str]): The new name for each nonterminal that is renamed
+
+    Returns:
+    str | None: The formula with the new names
+    """
+    if formula is None:
+        return None
+
+    return NONTERMINAL_PATTERN.sub(
+        lambda match: mapping.get(match.group(0), match.group(0)), formula
+    )
+
+
+def optimize_specification(
+    grammar: str, formula: str | None
+) -> Tuple[str, Dict[str, Tuple[int, int]]]:
+    """Runs Grammar.optimize on the grammar of a specification, protecting the nonterminals of the formula
+
+    Parameters:
+    grammar (str): The grammar in BNF format
+    formula (str | None): The ISLa formula
+
+    Returns:
+    Tuple[str, Dict[str, Tuple[int, int]]]: The grammar, unchanged if it could not be shrunk, and the sizes before
+    and after the optimisation
+    """
+    try:
+        structured_grammar = Grammar.from_bnf(grammar)
+    except ValueError:
+        return grammar, {}
+
+    before = structured_grammar.size
+    protected = NONTERMINAL_PATTERN.findall(formula) if formula is not None else []
+    structured_grammar.optimize(protected)
+    after = structured_grammar.size
+
+    metrics = {key: (before[key], after[key]) for key in before}
+    if after["symbols"] >= before["symbols"] and after["rules"] >= before["rules"]:
+        return grammar, metrics
+
+    return structured_grammar.to_bnf(), metrics
+
+
+def _get_signature(expansion: Expansion) -> Tuple:
+    return tuple(
+        ("nonterminal", element) if isinstance(element, int) else ("terminal", element)
+        for element in expansion
+    )
+
+
+def _deduplicate(expansions: List[Expansion]) -> List[Expansion]:
+    # Equal alternatives only make the grammar ambiguous
+    result: List[Expansion] = []
+    signatures: Set[Tuple] = set()
+    for expansion in expansions:
+        signature = _get_signature(expansion)
+        if signature not in signatures:
+            signatures.add(signature)
+            result.append(expansion)
+    return result
+
+
+def _unquote(terminal: str) -> str:
+    if len(terminal) >= 2 and terminal[0] == '"' and terminal[-1] == '"':
+        return instantiate_escaped_symbols(terminal[1:-1])
+    return terminal
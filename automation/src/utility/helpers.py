@@ -1,3 +1,4 @@
+import hashlib
 import json
 import math
 import os
@@ -36,15 +37,24 @@ class ConfigKey(Enum):
     ANALYSIS_ROUNDS = "analysis-rounds"
     BLOCK_ALL_REQUESTS = "block-all-requests"
     BLOCK_SUBMISSION = "block-submission"
+    CANDIDATE_CACHE = "candidate-cache"
     GENERATION = "generation"
     HTML_ONLY = "html-only"
+    INCREMENTAL = "incremental"
     INVALID = "invalid"
     MAGIC_VALUE_AMOUNT = "magic-value-amount"
+    PRE_GENERATE_VALUES = "pre-generate-values"
     REPETITIONS = "repetitions"
+    SOLVER_PARAMETERS = "solver-parameters"
+    SPECIFICATION_OVERRIDES = "specification-overrides"
     STOP_ON_SUCCESS = "stop-on-first-successful-submission"
     TESTING = "testing"
+    TIME_BUDGET = "time-budget"
+    TIMEOUT = "timeout"
     USE_DATALIST_OPTIONS = "use-datalist-options"
     VALID = "valid"
+    VALUE_CORPUS = "value-corpus"
+    WORKERS = "workers"
 
 
 class InputType(Enum):
@@ -251,6 +261,26 @@ def split_on_newline(input: str) -> List[str]:
     return re.split(r"\r\n|[\n\r\u2028\u2029]", input)
 
 
+def get_specification_hash(grammar: str, formula: str | None = None) -> str:
+    """Return a hash for a grammar and formula pair that ignores formatting differences.
+
+    Grammar lines are stripped and empty lines dropped, whitespace in the formula is collapsed outside of string literals.
+    """
+    grammar_lines = [line.strip() for line in split_on_newline(grammar)]
+    canonical_grammar = "\n".join(filter(None, grammar_lines))
+
+    canonical_formula = ""
+    if formula is not None:
+        parts = re.split(r'("(?:[^"\\]|\\.)*")', formula)
+        canonical_formula = "".join(
+            part if part.startswith('"') else re.sub(r"\s+", " ", part)
+            for part in parts
+        ).strip()
+
+    content = f"{canonical_grammar}\0{canonical_formula}"
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
 def sub_to_service_messages() -> None:
     ws = websocket.WebSocketApp(websocket_server_url, on_message=__on_ws_message)
     ws.run_forever()
@@ -0,0 +1,194 @@
+import os
+import re
+
+from isla.helpers import RE_NONTERMINAL
+from isla.language import parse_bnf
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Tuple
+
+from src.utility.helpers import load_file_content, pre_built_specifications_path
+
+"""
+Specification Registry module
+
+Loads the pre-built grammars and formulas once instead of reading them from disk for every form field.
+"""
+
+ParsedGrammar = Mapping[str, Tuple[str, ...]]
+
+# Placeholders of template grammars that SpecificationBuilder fills in, e.g. the options of a radio group
+TEMPLATE_PLACEHOLDERS = ["OPTIONS"]
+
+
+class PreBuiltSpecification:
+    """PreBuiltSpecification class
+
+    The grammar and the optional formula of one pre-built specification, e.g. date/date.
+    Template grammars are only valid BNF once their placeholders are filled in, so they are not parsed.
+    """
+
+    def __init__(self, name: str, grammar: str, formula: str | None) -> None:
+        self.__name = name
+        self.__grammar = grammar
+        self.__formula = formula
+        self.__is_template = any(
+            re.search(rf"\b{placeholder}\b", grammar) is not None
+            for placeholder in TEMPLATE_PLACEHOLDERS
+        )
+        self.__parsed_grammar: ParsedGrammar | None = (
+            None
+            if self.__is_template
+            else MappingProxyType(
+                {
+                    nonterminal: tuple(expansions)
+                    for nonterminal, expansions in parse_bnf(grammar).items()
+                }
+            )
+        )
+
+    @property
+    def name(self) -> str:
+        return self.__name
+
+    @property
+    def grammar(self) -> str:
+        return self.__grammar
+
+    @property
+    def formula(self) -> str | None:
+        return self.__formula
+
+    @property
+    def is_template(self) -> bool:
+        return self.__is_template
+
+    @property
+    def parsed_grammar(self) -> ParsedGrammar | None:
+        """The grammar as read-only mapping from nonterminals to their expansions, None for templates"""
+        return self.__parsed_grammar
+
+
+class SpecificationRegistry:
+    """SpecificationRegistry class
+
+    All pre-built specifications, loaded, parsed and validated once.
+    Specifications are named by their path relative to the directory without the file extension, e.g. binary/binary-required.
+    Files in the override directory replace the pre-built files with the same name or add new specifications.
+    """
+
+    def __init__(
+        self,
+        directory: str = pre_built_specifications_path,
+        override_directory: str | None = None,
+    ) -> None:
+        """Initializes the registry and loads all specifications
+
+        Parameters:
+        directory (str): The directory of the pre-built specifications (default pre_built_specifications_path)
+        override_directory (str | None): A directory with custom specifications in the same layout (default None)
+        """
+        files: Dict[str, Dict[str, str]] = {}
+        for root in [directory, override_directory]:
+            if root is not None:
+                self.__collect_files(root, files)
+
+        self.__specifications: Dict[str, PreBuiltSpecification] = {}
+        self.__problems: List[str] = []
+        for name, paths in sorted(files.items()):
+            if ".bnf" not in paths:
+                continue
+
+            grammar = load_file_content(paths[".bnf"])
+            formula = load_file_content(paths[".isla"]) if ".isla" in paths else None
+            try:
+                specification = PreBuiltSpecification(name, grammar, formula)
+            except Exception as e:
+                print(f"Error parsing pre-built grammar {name}:", e)
+                continue
+
+            self.__problems.extend(self.__validate(specification))
+            self.__specifications[name] = specification
+
+    @property
+    def names(self) -> List[str]:
+        return list(self.__specifications.keys())
+
+    @property
+    def problems(self) -> List[str]:
+        """Issues found while validating the specifications, e.g. nonterminals without a definition"""
+        return self.__problems
+
+    def get(self, name: str) -> PreBuiltSpecification:
+        if name not in self.__specifications:
+            raise KeyError(f"no pre-built specification named {name}")
+        return self.__specifications[name]
+
+    def get_grammar(self, name: str) -> str:
+        return self.get(name).grammar
+
+    def get_formula(self, name: str) -> str | None:
+        return self.get(name).formula
+
+    def __collect_files(self, root: str, files: Dict[str, Dict[str, str]]) -> None:
+        for directory, _, file_names in os.walk(root):
+            for file_name in file_names:
+                stem, extension = os.path.splitext(file_name)
+                if extension not in [".bnf", ".isla"]:
+                    continue
+
+                path = os.path.join(directory, file_name)
+                name = os.path.relpath(os.path.join(directory, stem), root)
+                files.setdefault(name.replace(os.sep, "/"), {})[extension] = path
+
+    def __validate(self, specification: PreBuiltSpecification) -> List[str]:
+        problems: List[str] = []
+        grammar = specification.parsed_grammar
+        if grammar is None:
+            return problems
+
+        referenced = {
+            symbol
+            for expansions in grammar.values()
+            for expansion in expansions
+            for symbol in RE_NONTERMINAL.findall(expansion)
+        }
+        if specification.formula is not None:
+            referenced.update(re.findall(r"<[^<> ]+>", specification.formula))
+
+        for nonterminal in sorted(referenced - set(grammar.keys())):
+            problems.append(f"{specification.name}: {nonterminal} is not defined")
+
+        if "<start>" not in grammar:
+            problems.append(f"{specification.name}: <start> is not defined")
+
+        for problem in problems:
+            print("Problem in pre-built specification", problem)
+
+        return problems
+
+
+_registry: SpecificationRegistry | None = None
+
+
+def get_specification_registry() -> SpecificationRegistry:
+    """Returns the registry of pre-built specifications, loading it on first use"""
+    global _registry
+    if _registry is None:
+        _registry = SpecificationRegistry()
+    return _registry
+
+
+def load_specification_registry(
+    override_directory: str | None = None,
+) -> SpecificationRegistry:
+    """Loads the registry of pre-built specifications at startup, optionally with custom specifications
+
+    Parameters:
+    override_directory (str | None): A directory with custom specifications in the layout of pre-built-specifications (default None)
+
+    Returns:
+    SpecificationRegistry: The registry that get_specification_registry returns from now on
+    """
+    global _registry
+    _registry = SpecificationRegistry(override_directory=override_directory)
+    return _registry
@@ -3,6 +3,7 @@ import sys
 import yaml
 
 from src.interaction.driver import TestAutomationDriver
+from src.interaction.specification_bundle import compile_specification
 from evaluation.util.helpers import EvaluationStub
 
 """
@@ -28,19 +29,32 @@ def main(argv):
     """Handle command line arguments and start the test automation."""
 
     try:
-        opts, _ = getopt.getopt(argv, "?h?s:", ["help", "specification-file="])
+        opts, _ = getopt.getopt(
+            argv, "?h?s:c", ["help", "specification-file=", "compile"]
+        )
     except getopt.GetoptError:
         print("Wrong format provided")
         print_help()
         sys.exit()
 
     specification_file = None
+    compile_only = False
     for opt, arg in opts:
         if opt in ("-?", "-h", "--help"):
             print_help()
             sys.exit()
         if opt in ("-s", "--specification-file"):
             specification_file = arg
+        if opt in ("-c", "--compile"):
+            compile_only = True
+
+    if compile_only:
+        bundle = compile_specification(
+            specification_file or "specification/specification.json"
+        )
+        if bundle is not None:
+            print("Compiled specification to", bundle.path)
+        sys.exit()
 
     config = yaml.safe_load(open("config/test_config.yml"))
     test_automation_driver = TestAutomationDriver(
@@ -58,10 +72,12 @@ def print_help():
         """usage: python test.py [option]
 Options and arguments:
 -?, -h, --help:                 Print this help message and exit
--s, --specification-file:       Optional path to a specification file that is used to generate inputs.
+-s, --specification-file:       Optional path to a specification file or a compiled specification bundle that is used to generate inputs.
                                 For an example of the structure of such a specification file see "automation\pre-built-specifications\specification_example.json"
                                 If no file is provided an existing specification file is used.
-                                Run 'analyse.py' to extract the secification for a given url automatically"""
+                                Run 'analyse.py' to extract the secification for a given url automatically
+-c, --compile:                  Validate the specification and compile it into a bundle next to the specification file, then exit.
+                                Bundles are also compiled on the first test run and whenever a file of the specification changes."""
     )
 
 
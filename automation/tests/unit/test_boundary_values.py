@@ -0,0 +1,36 @@
+import unittest
+
+from src.generation.boundary_values import BoundaryValueGenerator
+from src.generation.grammar_fuzzer import GrammarFuzzer
+from src.utility.helpers import load_file_content
+
+
+class TestBoundaryValueGenerator(unittest.TestCase):
+    number_grammar = load_file_content("pre-built-specifications/number/whole.bnf")
+    text_grammar = load_file_content("pre-built-specifications/text/one-line-text.bnf")
+
+    def test_number_boundaries(self) -> None:
+        generator = BoundaryValueGenerator.from_formula(
+            "((str.to.int(<start>) >= 10) and (str.to.int(<start>) <= 100)) and (str.to.int(<start>) mod 5 = 0)"
+        )
+
+        values = generator.get_invalid_values(GrammarFuzzer(self.number_grammar))
+        self.assertEqual(values, ["9", "101", "11"])
+
+    def test_length_boundaries(self) -> None:
+        generator = BoundaryValueGenerator.from_formula(
+            "(str.len(<start>) >= 3) and (str.len(<start>) <= 5)"
+        )
+
+        values = generator.get_invalid_values(GrammarFuzzer(self.text_grammar))
+        self.assertEqual([len(value) for value in values], [0, 2, 6])
+
+    def test_unmodelled_conjuncts_are_ignored(self) -> None:
+        formula = '((str.len(<start>) > 0) and (str.len(<start>) <= 4)) and (str.contains(<start>, "a") or str.contains(<start>, "b"))'
+        generator = BoundaryValueGenerator.from_formula(formula)
+
+        values = generator.get_invalid_values(GrammarFuzzer(self.text_grammar))
+        self.assertEqual([len(value) for value in values], [0, 5])
+        self.assertIsNone(
+            BoundaryValueGenerator.from_formula('str.contains(<start>, "a")')
+        )
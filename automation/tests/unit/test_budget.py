@@ -0,0 +1,51 @@
+import unittest
+
+from src.generation.budget import GenerationBudget
+
+
+class TestGenerationBudget(unittest.TestCase):
+    def test_timeout_adapts_to_observed_solve_time(self) -> None:
+        budget = GenerationBudget(max_timeout_seconds=60)
+        key = budget.get_key('<start> ::= "a"', None, "VALID")
+
+        self.assertEqual(budget.get_timeout(key), 60)
+        budget.record(key, 2.0, False)
+        self.assertEqual(budget.get_timeout(key), 6)
+        self.assertEqual(budget.get_timeout(key, 4), 4)
+
+    def test_native_values_do_not_adapt_the_timeout(self) -> None:
+        budget = GenerationBudget(max_timeout_seconds=60)
+        key = budget.get_key('<start> ::= "a"', None, "VALID")
+
+        budget.record(key, 0.001, False, solved=False)
+        self.assertEqual(budget.get_timeout(key), 60)
+        budget.record(key, 2.0, False)
+        budget.record(key, 0.001, False, 10, solved=False)
+        self.assertEqual(budget.get_timeout(key), 6)
+
+    def test_field_is_deprioritised_after_timeouts(self) -> None:
+        budget = GenerationBudget(max_timeout_seconds=60, max_consecutive_timeouts=2)
+        key = budget.get_key('<start> ::= "a"', "str.len(<start>) > 5", "VALID")
+
+        budget.record(key, 60, True)
+        self.assertFalse(budget.is_deprioritised(key))
+        budget.record(key, 60, True)
+        self.assertTrue(budget.is_deprioritised(key))
+        self.assertEqual(budget.get_timeout(key), 1)
+
+        budget.record(key, 0.5, False)
+        self.assertFalse(budget.is_deprioritised(key))
+
+    def test_exhausted_budget_skips_requests(self) -> None:
+        budget = GenerationBudget(total_seconds=10)
+        grammar = '<start> ::= "a"'
+        budget.set_label(grammar, None, "field")
+        key = budget.get_key(grammar, None, "VALID")
+
+        self.assertEqual(budget.get_timeout(key), 10)
+        budget.record(key, 10, True)
+        self.assertEqual(budget.get_timeout(key), 0)
+
+        report = budget.get_report()
+        self.assertEqual(report["field (valid)"]["skipped"], 1)
+        self.assertEqual(report["total"]["spent_seconds"], 10)
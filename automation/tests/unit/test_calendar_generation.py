@@ -0,0 +1,69 @@
+import unittest
+
+from datetime import date
+
+from src.analysis.constraint_extraction import SpecificationBuilder
+from src.analysis.html_analysis import (
+    HTMLConstraints,
+    HTMLElementReference,
+    HTMLInputSpecification,
+)
+from src.generation.calendar_generation import CalendarGenerator
+from src.generation.grammar_fuzzer import GrammarFuzzer
+
+
+class TestCalendarGenerator(unittest.TestCase):
+    def setUp(self) -> None:
+        self.builder = SpecificationBuilder()
+
+    def create_specification(self, constraints: HTMLConstraints):
+        return self.builder.create_specification_for_html_input(
+            HTMLInputSpecification(HTMLElementReference("id", "input"), constraints), 1
+        )
+
+    def test_date_values_stay_within_bounds(self) -> None:
+        grammar, formula = self.create_specification(
+            HTMLConstraints(type="date", min="2024-02-27", max="2024-03-02")
+        )
+        generator = CalendarGenerator.from_specification(grammar, formula)
+
+        self.assertEqual(generator.bounds, ("2024-02-27", "2024-03-02"))
+        for _ in range(20):
+            value = generator.sample_valid()
+            self.assertTrue(date(2024, 2, 27) <= date.fromisoformat(value))
+            self.assertTrue(date.fromisoformat(value) <= date(2024, 3, 2))
+
+    def test_invalid_values_are_in_grammar(self) -> None:
+        grammar, formula = self.create_specification(
+            HTMLConstraints(type="date", min="2024-02-27", required="")
+        )
+        generator = CalendarGenerator.from_specification(grammar, formula)
+        fuzzer = GrammarFuzzer(grammar)
+
+        for _ in range(20):
+            value = generator.sample_invalid()
+            self.assertFalse(generator.contains(value))
+            self.assertTrue(fuzzer.contains(value))
+
+    def test_calendar_rules(self) -> None:
+        grammar, formula = self.create_specification(HTMLConstraints(type="date"))
+        generator = CalendarGenerator.from_specification(grammar, formula)
+
+        self.assertTrue(generator.contains("2024-02-29"))
+        self.assertFalse(generator.contains("2023-02-29"))
+        self.assertFalse(generator.contains("1900-02-29"))
+        self.assertFalse(generator.contains("2024-04-31"))
+        self.assertFalse(generator.contains("2024-13-01"))
+
+    def test_modified_specifications_are_left_to_isla(self) -> None:
+        grammar, formula = self.create_specification(
+            HTMLConstraints(type="time", min="10:00")
+        )
+
+        self.assertIsNotNone(CalendarGenerator.from_specification(grammar, formula))
+        self.assertIsNone(
+            CalendarGenerator.from_specification(
+                grammar, f"({formula}) and (str.to.int(<minute>) mod 15 = 0)"
+            )
+        )
+        self.assertIsNone(CalendarGenerator.from_specification(grammar, None))
@@ -0,0 +1,69 @@
+import os
+import tempfile
+import unittest
+
+from src.analysis.candidate_cache import CandidateCache, get_candidate_key
+from src.analysis.constraint_extraction import (
+    ConstraintCandidateResult,
+    ConstraintCandidateType,
+)
+from src.analysis.html_analysis import HTMLElementReference
+
+
+class TestCandidateCache(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.database_path = os.path.join(self.directory.name, "candidates.db")
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def test_key_depends_on_field_and_scripts(self) -> None:
+        reference = HTMLElementReference("id", "name")
+        scripts = {"http://localhost/a.js": "a", "http://localhost/b.js": "b"}
+        key = get_candidate_key(reference, "text", scripts, "values")
+
+        self.assertEqual(
+            get_candidate_key(
+                reference, "text", dict(reversed(scripts.items())), "values"
+            ),
+            key,
+        )
+        self.assertNotEqual(
+            get_candidate_key(
+                HTMLElementReference("id", "other"), "text", scripts, "values"
+            ),
+            key,
+        )
+        self.assertNotEqual(
+            get_candidate_key(reference, "email", scripts, "values"), key
+        )
+        self.assertNotEqual(
+            get_candidate_key(
+                reference, "text", {"http://localhost/a.js": "c"}, "values"
+            ),
+            key,
+        )
+        self.assertNotEqual(get_candidate_key(reference, "text", scripts, "other"), key)
+
+    def test_candidates_persist_across_instances(self) -> None:
+        response = {
+            "candidates": [
+                {
+                    "type": ConstraintCandidateType.LITERAL_LENGTH_COMPARISON.value,
+                    "operator": "<=",
+                    "otherValue": "10",
+                }
+            ]
+        }
+        CandidateCache(self.database_path).put("key", response)
+
+        cache = CandidateCache(self.database_path)
+        self.assertIsNone(cache.get("other"))
+        self.assertEqual(
+            str(ConstraintCandidateResult(cache.get("key"))),
+            str(ConstraintCandidateResult(response)),
+        )
+
+        cache.put("key", {"candidates": []})
+        self.assertEqual(cache.get("key"), {"candidates": []})
@@ -0,0 +1,56 @@
+import os
+import tempfile
+import unittest
+
+from src.generation.corpus import ValueCorpus
+from src.generation.input_generation import InputGenerator, ValidityEnum
+
+
+class TestValueCorpus(unittest.TestCase):
+    grammar = """
+    <start> ::= <string>
+    <string> ::= <letter> | <letter><string>
+    <letter> ::= "a" | "b" | "c" | "d"
+    """
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.database_path = os.path.join(self.directory.name, "values.db")
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def test_values_are_stored_per_validity(self) -> None:
+        corpus = ValueCorpus(self.database_path)
+        corpus.add(self.grammar, None, ValidityEnum.VALID.value, ["a", "b", "a"])
+        corpus.add(self.grammar, None, ValidityEnum.INVALID.value, ["x"])
+
+        self.assertEqual(corpus.count(self.grammar, None, ValidityEnum.VALID.value), 2)
+        self.assertEqual(
+            corpus.sample(self.grammar, None, ValidityEnum.INVALID.value, 5), ["x"]
+        )
+
+    def test_values_are_stored_per_specification(self) -> None:
+        corpus = ValueCorpus(self.database_path)
+        corpus.add(self.grammar, "str.len(<start>) > 1", ValidityEnum.VALID.value, ["ab"])
+
+        self.assertEqual(corpus.count(self.grammar, None, ValidityEnum.VALID.value), 0)
+
+    def test_unchanged_specification_needs_no_solver(self) -> None:
+        formula = "str.len(<start>) > 2"
+        first_run = InputGenerator(corpus_path=self.database_path)
+        values = first_run.generate_inputs(self.grammar, formula, amount=3)
+
+        second_run = InputGenerator(
+            corpus_path=self.database_path, fresh_value_ratio=0.0
+        )
+        reused = second_run.generate_inputs(self.grammar, formula, amount=3)
+
+        self.assertEqual(second_run.solver_cache.misses, 0)
+        self.assertEqual(
+            sorted(v.value for v in values), sorted(v.value for v in reused)
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+import tempfile
+import unittest
+
+from src.analysis.fingerprinting import (
+    FINGERPRINT_FILE,
+    PreviousExtraction,
+    create_fingerprint_file,
+    get_field_fingerprint,
+    get_reference_key,
+)
+from src.analysis.html_analysis import (
+    HTMLConstraints,
+    HTMLElementReference,
+    HTMLInputSpecification,
+)
+from src.analysis.specification_model import FormSpecification
+
+
+class TestFingerprinting(unittest.TestCase):
+    settings = {"analysis": {"analysis-rounds": 1}}
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def __create_field(
+        self, access_value: str, maxlength: str | None = None
+    ) -> HTMLInputSpecification:
+        return HTMLInputSpecification(
+            HTMLElementReference("id", access_value),
+            HTMLConstraints(maxlength=maxlength, name=access_value),
+        )
+
+    def test_fingerprint_covers_constraints_and_scripts(self) -> None:
+        scripts = {"http://localhost/validation.js": "a"}
+        fingerprint = get_field_fingerprint(
+            self.__create_field("name", "10"), scripts, self.settings
+        )
+
+        self.assertEqual(
+            get_field_fingerprint(
+                self.__create_field("name", "10"), dict(scripts), self.settings
+            ),
+            fingerprint,
+        )
+        self.assertNotEqual(
+            get_field_fingerprint(
+                self.__create_field("name", "11"), scripts, self.settings
+            ),
+            fingerprint,
+        )
+        self.assertNotEqual(
+            get_field_fingerprint(
+                self.__create_field("name", "10"),
+                {"http://localhost/validation.js": "b"},
+                self.settings,
+            ),
+            fingerprint,
+        )
+        self.assertNotEqual(
+            get_field_fingerprint(
+                self.__create_field("name", "10"), scripts, {"analysis": None}
+            ),
+            fingerprint,
+        )
+
+    def test_only_unchanged_controls_are_reused(self) -> None:
+        fields = [self.__create_field(name) for name in ["first", "second", "third"]]
+        specification = FormSpecification(directory=self.directory.name)
+        for index, field in enumerate(fields, 1):
+            specification.add_control(
+                field.get_representation(f"{index}.bnf", f"{index}.isla")
+            )
+            specification.set_file(f"{index}.bnf", f'<start> ::= "{index}"')
+            specification.set_file(f"{index}.isla", "")
+        specification.combine_controls(fields[0].reference, fields[1].reference, 4)
+        specification.set_file("4.bnf", '<start> ::= "1" "2"')
+        specification.set_file("4.isla", "str.len(<start>) = 2")
+
+        fingerprints = {get_reference_key(f.reference): f.name for f in fields}
+        specification.set_file(
+            FINGERPRINT_FILE, create_fingerprint_file(specification, fingerprints)
+        )
+        specification.flush()
+
+        previous = PreviousExtraction.from_directory(self.directory.name)
+        self.assertTrue(previous.is_unchanged(fingerprints))
+        self.assertEqual(
+            previous.get_control(fields[2].reference, fingerprints)["grammar"],
+            '<start> ::= "3"',
+        )
+        combined = previous.get_control(fields[1].reference, fingerprints)
+        self.assertTrue(combined["control"]["combined"])
+        self.assertEqual(combined["formula"], "str.len(<start>) = 2")
+
+        # A changed field invalidates the combined control of both of its fields
+        fingerprints[get_reference_key(fields[0].reference)] = "changed"
+        self.assertFalse(previous.is_unchanged(fingerprints))
+        self.assertIsNone(previous.get_control(fields[1].reference, fingerprints))
+        self.assertIsNotNone(previous.get_control(fields[2].reference, fingerprints))
+        self.assertIsNone(
+            PreviousExtraction.from_directory(f"{self.directory.name}/missing")
+        )
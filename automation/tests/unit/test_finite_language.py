@@ -0,0 +1,39 @@
+import unittest
+
+from src.generation.finite_language import FiniteLanguage
+from src.generation.grammar_fuzzer import GrammarFuzzer
+from src.utility.helpers import load_file_content
+
+
+class TestFiniteLanguage(unittest.TestCase):
+    def test_enumerates_small_language(self) -> None:
+        grammar = load_file_content("pre-built-specifications/binary/binary.bnf")
+        language = FiniteLanguage.from_fuzzer(GrammarFuzzer(grammar))
+
+        self.assertEqual(language.words, ["0", "1"])
+
+    def test_recursive_grammar_is_not_enumerated(self) -> None:
+        grammar = load_file_content("pre-built-specifications/number/whole.bnf")
+
+        self.assertIsNone(FiniteLanguage.from_fuzzer(GrammarFuzzer(grammar)))
+
+    def test_size_threshold(self) -> None:
+        grammar = """
+        <start> ::= <digit><digit><digit>
+        <digit> ::= "0" | "1" | "2" | "3" | "4" | "5" | "6" | "7" | "8" | "9"
+        """
+        fuzzer = GrammarFuzzer(grammar)
+
+        self.assertIsNone(FiniteLanguage.from_fuzzer(fuzzer, max_size=999))
+        self.assertEqual(len(FiniteLanguage.from_fuzzer(fuzzer, max_size=1000)), 1000)
+
+    def test_split_by_formula(self) -> None:
+        grammar = """
+        <start> ::= <radio>
+        <radio> ::= "red" | "green" | "blue"
+        """
+        language = FiniteLanguage.from_fuzzer(GrammarFuzzer(grammar))
+
+        valid, invalid = language.split(lambda word: "e" in word and len(word) > 3)
+        self.assertEqual(valid, ["blue", "green"])
+        self.assertEqual(invalid, ["red"])
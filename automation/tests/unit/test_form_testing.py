@@ -1,9 +1,13 @@
+import asyncio
 import json
 import os
 import sys
+import threading
+import time
 import unittest
 
-from src.interaction.form_testing import SpecificationParser
+from src.generation.input_generation import GeneratedValue, ValidityEnum
+from src.interaction.form_testing import FormTester, SpecificationParser, ValuePool
 from src.utility.helpers import load_file_content
 
 test_data_path = "tests/unit/test_data/"
@@ -35,5 +39,77 @@ class TestSpecificationParser(unittest.TestCase):
         self.assertFalse(result)
 
 
+class TestValuePool(unittest.TestCase):
+    def test_pop_returns_values_in_order(self):
+        pool = ValuePool()
+        pool.put(ValidityEnum.VALID, GeneratedValue("a", ValidityEnum.VALID))
+        pool.put(ValidityEnum.INVALID, GeneratedValue("b", ValidityEnum.INVALID))
+        pool.put(ValidityEnum.VALID, GeneratedValue("c", ValidityEnum.VALID))
+
+        self.assertEqual(pool.pop(ValidityEnum.VALID).value, "a")
+        self.assertEqual(pool.pop(ValidityEnum.INVALID).value, "b")
+        self.assertEqual(pool.pop(ValidityEnum.VALID).value, "c")
+
+    def test_pop_waits_for_producer(self):
+        pool = ValuePool()
+        producer = threading.Timer(
+            0.1,
+            lambda: pool.put(ValidityEnum.VALID, GeneratedValue("a", ValidityEnum.VALID)),
+        )
+        producer.start()
+
+        self.assertEqual(pool.pop(ValidityEnum.VALID).value, "a")
+
+    def test_pop_on_closed_empty_pool(self):
+        pool = ValuePool()
+        pool.close()
+
+        self.assertIsNone(pool.pop(ValidityEnum.INVALID))
+
+
+class TestPipelinedRounds(unittest.TestCase):
+    def test_generation_overlaps_with_submission(self):
+        """
+        Test that the values of the next round are generated while the current round is submitted
+        """
+        config = {
+            "testing": {
+                "block-submission": False,
+                "pre-generate-values": False,
+                "repetitions": {"valid": 2, "invalid": 1},
+            }
+        }
+        tester = FormTester(None, "", {}, "", config)
+        tester._FormTester__generation_templates = []
+        tester._FormTester__generation_units = []
+        events = []
+
+        def generate(generator, requests):
+            events.append(("generate", "start"))
+            time.sleep(0.2)
+            events.append(("generate", "end"))
+
+        def run_round(generator, index, validity, validities, setup, automation):
+            events.append((f"round {index}", "start"))
+            time.sleep(0.2)
+            events.append((f"round {index}", "end"))
+
+        tester._FormTester__generate_into_pools = generate
+        tester._FormTester__run_round = run_round
+        tester._FormTester__plan_round = lambda validity: []
+
+        rounds = [ValidityEnum.VALID, ValidityEnum.VALID, ValidityEnum.INVALID]
+        asyncio.run(tester._FormTester__run_rounds_pipelined(None, rounds))
+
+        # The generation for round 1 starts before round 0 is finished
+        self.assertLess(
+            events.index(("generate", "start"), 2), events.index(("round 0", "end"))
+        )
+        self.assertEqual(
+            [e for e in events if e[0].startswith("round")],
+            [(f"round {i}", p) for i in range(3) for p in ["start", "end"]],
+        )
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,105 @@
+import unittest
+
+from isla.language import parse_bnf
+
+from src.generation.finite_language import FiniteLanguage
+from src.generation.grammar_fuzzer import GrammarFuzzer
+
+from src.utility.grammar import Grammar, optimize_specification, rename_in_formula
+
+
+class TestGrammar(unittest.TestCase):
+    grammar = """
+    <start> ::= <number>
+    <number> ::= <digit> | <digit><number>
+    <digit> ::= "0" | "1" | "<"
+    """
+
+    def test_serialisation_keeps_the_language(self) -> None:
+        grammar = Grammar.from_bnf(self.grammar)
+
+        self.assertEqual(grammar.nonterminals, ["<start>", "<number>", "<digit>"])
+        self.assertEqual(
+            grammar.to_bnf(),
+            '<start> ::= <number>\n<number> ::= <digit> | <digit> <number>\n<digit> ::= "0" | "1" | "<"',
+        )
+        self.assertEqual(grammar.to_isla_grammar(), parse_bnf(self.grammar))
+        self.assertEqual(grammar.terminals, {"0", "1", "<"})
+
+    def test_renaming_and_merging(self) -> None:
+        grammar = Grammar.from_bnf(self.grammar)
+        other = Grammar.from_bnf(self.grammar)
+        grammar.remove("<start>")
+        mapping, next_number = grammar.number_nonterminals(1)
+        other.number_nonterminals(next_number)
+
+        self.assertEqual(mapping, {"<number>": "<nt1>", "<digit>": "<nt2>"})
+        self.assertEqual(grammar.get_expansions("<nt1>"), ["<nt2>", "<nt2> <nt1>"])
+        self.assertEqual(
+            rename_in_formula("str.to.int(<number>) <= 10", mapping),
+            "str.to.int(<nt1>) <= 10",
+        )
+        with self.assertRaises(ValueError):
+            grammar.merge(Grammar.from_bnf("<nt1> ::= <nt2>"))
+
+        merged = grammar.merge(other)
+        self.assertEqual(
+            merged.nonterminals, ["<nt1>", "<nt2>", "<nt3>", "<nt4>", "<nt5>"]
+        )
+        self.assertEqual(merged.get_expansions("<nt4>"), ["<nt5>", "<nt5> <nt4>"])
+
+    def test_options_replace_rule(self) -> None:
+        grammar = Grammar.from_bnf("<start> ::= <radio>\n<radio> ::= OPTIONS")
+        grammar.set_expansions("<radio>", ['"a"', '"b"'])
+
+        self.assertEqual(grammar.to_bnf(), '<start> ::= <radio>\n<radio> ::= "a" | "b"')
+
+        grammar = Grammar.from_bnf(self.grammar)
+        grammar.set_expansions("<number>", ['"42"'])
+        grammar.remove_unreachable()
+        self.assertEqual(grammar.to_bnf(), '<start> ::= <number>\n<number> ::= "42"')
+
+    def test_optimisation_shrinks_the_grammar(self) -> None:
+        grammar = """
+        <start> ::= <pair> | <endless>
+        <pair> ::= <first> "-" <second>
+        <first> ::= <digit>
+        <second> ::= "0" | "1" | "<"
+        <digit> ::= "0" | "1" | "<"
+        <endless> ::= <endless> "x"
+        <unused> ::= "y"
+        """
+
+        optimized_grammar, metrics = optimize_specification(grammar, None)
+        self.assertEqual(
+            optimized_grammar,
+            '<start> ::= <second> "-" <second>\n<second> ::= "0" | "1" | "<"',
+        )
+        self.assertEqual(
+            metrics, {"rules": (7, 2), "expansions": (12, 4), "symbols": (15, 6)}
+        )
+
+        # Nonterminals of the formula keep their rules
+        optimized_grammar, _ = optimize_specification(grammar, "str.len(<first>) = 1")
+        self.assertEqual(
+            Grammar.from_bnf(optimized_grammar).nonterminals,
+            ["<start>", "<first>", "<second>"],
+        )
+        self.assertEqual(
+            optimize_specification(self.grammar, "str.to.int(<number>) > 1")[0],
+            self.grammar,
+        )
+
+    def test_optimisation_factors_repetitions(self) -> None:
+        grammar = Grammar.from_bnf(
+            '<start> ::= <n> "." <n>\n<n> ::= <d> | <d><d> | <d><d><d> | <d><d><d><d>\n<d> ::= "0" | "1"'
+        )
+        words = FiniteLanguage.from_fuzzer(GrammarFuzzer(grammar), 1000).words
+        grammar.optimize()
+
+        self.assertEqual(grammar.get_expansions("<n>"), ["<d> <n-tail-1>"])
+        self.assertEqual(grammar.get_expansions("<n-tail-3>"), ['""', "<d>"])
+        self.assertLess(grammar.size["symbols"], 15)
+        self.assertCountEqual(
+            FiniteLanguage.from_fuzzer(GrammarFuzzer(grammar), 1000).words, words
+        )
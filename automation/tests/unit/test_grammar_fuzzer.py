@@ -0,0 +1,44 @@
+import re
+import unittest
+
+from src.generation.grammar_fuzzer import GrammarFuzzer
+
+
+class TestGrammarFuzzer(unittest.TestCase):
+    grammar = """
+    <start> ::= <string>
+    <string> ::= <letter> | <letter><string>
+    <letter> ::= "a" | "b" | "c" | "d"
+    """
+
+    def test_words_are_in_grammar(self) -> None:
+        fuzzer = GrammarFuzzer(self.grammar)
+
+        for _ in range(50):
+            self.assertRegex(fuzzer.fuzz(), re.compile(r"^[abcd]+$"))
+
+    def test_length_budget(self) -> None:
+        fuzzer = GrammarFuzzer(self.grammar)
+
+        for _ in range(50):
+            self.assertTrue(5 <= len(fuzzer.fuzz(5, 8)) <= 8)
+
+    def test_minimal_derivation_costs(self) -> None:
+        grammar = """
+        <start> ::= <date>
+        <date> ::= <digit><digit> "-" <digit><digit>
+        <digit> ::= "0" | "1"
+        """
+        fuzzer = GrammarFuzzer(grammar)
+
+        self.assertEqual(fuzzer.min_word_length, 5)
+        self.assertEqual(fuzzer.max_word_length, 5)
+        self.assertEqual(GrammarFuzzer(self.grammar).max_word_length, float("inf"))
+
+    def test_zero_length_cycles_terminate(self) -> None:
+        grammar = """
+        <start> ::= <a>
+        <a> ::= <a> | "" | <a><a>
+        """
+
+        self.assertEqual(GrammarFuzzer(grammar).fuzz(3, 5), "")
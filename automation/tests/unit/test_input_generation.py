@@ -1,6 +1,17 @@
 import unittest
 
-from src.generation.input_generation import InputGenerator, ValidityEnum
+from itertools import islice
+
+from src.generation.budget import GenerationBudget
+from src.generation.input_generation import (
+    GenerationRequest,
+    InputGenerator,
+    ValidityEnum,
+)
+from src.generation.satisfiability import Satisfiability
+from src.generation.solver_cache import SolverCache
+from src.utility.grammar import optimize_specification
+from src.utility.helpers import load_file_content
 
 
 class TestValidInputGeneration(unittest.TestCase):
@@ -18,6 +29,17 @@ class TestValidInputGeneration(unittest.TestCase):
         self.assertEqual(value.validity, ValidityEnum.VALID)
         self.assertTrue(len(value.value) > 0)
 
+    def test_grammar_only_does_not_use_solver(self) -> None:
+        grammar = """
+        <start> ::= <string>
+        <string> ::= <letter> | <letter><string>
+        <letter> ::= "a" | "b" | "c" | "d"
+        """
+
+        values = self.generator.generate_inputs(grammar, amount=5)
+        self.assertTrue(all(v.validity == ValidityEnum.VALID for v in values))
+        self.assertEqual(len(self.generator.solver_cache), 0)
+
     def test_simple_grammar_and_formula(self) -> None:
         grammar = """
         <start> ::= <string>
@@ -64,6 +86,56 @@ class TestInvalidInputGeneration(unittest.TestCase):
         )[0].value
         self.assertTrue(len(value) <= 2)
 
+    def test_interval_formula_does_not_use_solver(self) -> None:
+        grammar = load_file_content("pre-built-specifications/number/whole.bnf")
+        formula = "(str.to.int(<start>) >= 5) and (str.to.int(<start>) <= 10)"
+
+        values = self.generator.generate_inputs(
+            grammar, formula, ValidityEnum.INVALID, amount=5
+        )
+        self.assertTrue(all(v.validity == ValidityEnum.INVALID for v in values))
+        self.assertTrue(all(not 5 <= int(v.value) <= 10 for v in values))
+        self.assertEqual(len(self.generator.solver_cache), 0)
+
+    def test_boundary_values_come_first(self) -> None:
+        grammar = load_file_content("pre-built-specifications/text/one-line-text.bnf")
+        formula = '((str.len(<start>) > 0) and (str.len(<start>) <= 3)) and (str.contains(<start>, "a") or str.contains(<start>, "b"))'
+
+        values = self.generator.generate_inputs(
+            grammar, formula, ValidityEnum.INVALID, amount=2
+        )
+        self.assertEqual([len(v.value) for v in values], [0, 4])
+        self.assertTrue(all(v.validity == ValidityEnum.INVALID for v in values))
+        self.assertEqual(len(self.generator.solver_cache), 0)
+
+    def test_exact_invalid_generation_for_finite_language(self) -> None:
+        grammar = """
+        <start> ::= <digit><digit>
+        <digit> ::= "0" | "1" | "2"
+        """
+        formula = 'str.contains(<start>, "2")'
+
+        values = self.generator.generate_inputs(
+            grammar, formula, ValidityEnum.INVALID, amount=10
+        )
+        self.assertTrue(all(v.validity == ValidityEnum.INVALID for v in values))
+        self.assertTrue(all(v.value in ["00", "01", "10", "11"] for v in values))
+
+    def test_calendar_specification_does_not_use_solver(self) -> None:
+        grammar = load_file_content("pre-built-specifications/time/time.bnf")
+        formula = f"({load_file_content('pre-built-specifications/time/time.isla')}) and (str.to.int(<hour>) >= 23 or (str.to.int(<hour>) = 23 and str.to.int(<minute>) >= 58))"
+
+        valid_values = self.generator.generate_inputs(grammar, formula, amount=3)
+        invalid_values = self.generator.generate_inputs(
+            grammar, formula, ValidityEnum.INVALID, amount=3
+        )
+
+        self.assertTrue(all(v.value in ["23:58", "23:59"] for v in valid_values))
+        self.assertTrue(
+            all(v.validity == ValidityEnum.INVALID for v in invalid_values)
+        )
+        self.assertEqual(len(self.generator.solver_cache), 0)
+
     def test_simple_invalid_generation_without_formula(self) -> None:
         grammar = """
         <start> ::= <string>
@@ -76,3 +148,216 @@ class TestInvalidInputGeneration(unittest.TestCase):
         )[0].value
         print(value)
         self.assertTrue(any(c not in value for c in "abcd"))
+
+
+class TestStreamingInputGeneration(unittest.TestCase):
+    def test_stream_reuses_live_solver(self) -> None:
+        generator = InputGenerator()
+        grammar = """
+        <start> ::= <string>
+        <string> ::= <letter> | <letter><string>
+        <letter> ::= "a" | "b" | "c" | "d"
+        """
+
+        stream = generator.stream_inputs(grammar, 'str.contains(<start>, "ab")')
+        values = list(islice(stream, 3))
+
+        self.assertTrue(all("ab" in v.value for v in values))
+        self.assertEqual(generator.solver_cache.misses, 1)
+        self.assertEqual(generator.solver_cache.hits, 0)
+
+    def test_unique_stream_ends_when_language_is_exhausted(self) -> None:
+        generator = InputGenerator()
+        grammar = """
+        <start> ::= <letter><letter>
+        <letter> ::= "a" | "b"
+        """
+
+        values = [v.value for v in generator.stream_inputs(grammar, unique=True)]
+
+        self.assertEqual(sorted(values), ["aa", "ab", "ba", "bb"])
+
+
+class TestBudgetedInputGeneration(unittest.TestCase):
+    grammar = """
+    <start> ::= <string>
+    <string> ::= <letter> | <letter><string>
+    <letter> ::= "a" | "b" | "c" | "d"
+    """
+
+    def test_generation_time_is_booked(self) -> None:
+        budget = GenerationBudget(total_seconds=120)
+        budget.set_label(self.grammar, 'str.contains(<start>, "ab")', "field")
+        generator = InputGenerator(budget=budget)
+
+        values = generator.generate_inputs(
+            self.grammar, 'str.contains(<start>, "ab")', amount=2
+        )
+
+        self.assertTrue(all(v.validity == ValidityEnum.VALID for v in values))
+        self.assertEqual(budget.get_report()["field (valid)"]["requests"], 2)
+        self.assertTrue(budget.spent_seconds > 0)
+
+    def test_native_values_do_not_shrink_the_timeout(self) -> None:
+        budget = GenerationBudget(total_seconds=120, max_timeout_seconds=30)
+        formula = "str.len(<start>) <= 5"
+        budget.set_label(self.grammar, formula, "field")
+        generator = InputGenerator(budget=budget)
+
+        # The length bound is sampled without ISLa
+        values = generator.generate_inputs(self.grammar, formula, amount=3)
+
+        self.assertTrue(all(v.validity == ValidityEnum.VALID for v in values))
+        self.assertEqual(generator.solver_runs, 0)
+        self.assertEqual(budget.get_report()["field (valid)"]["native_values"], 3)
+        key = budget.get_key(self.grammar, formula, "VALID")
+        self.assertEqual(budget.get_timeout(key), 30)
+
+    def test_verdict_is_reported_for_an_optimised_grammar(self) -> None:
+        grammar = load_file_content("pre-built-specifications/email/email.bnf")
+        formula = "str.len(<start>) >= 5 and str.len(<start>) <= 3"
+        budget = GenerationBudget(total_seconds=120)
+        budget.set_label(grammar, formula, "field")
+        generator = InputGenerator(budget=budget)
+
+        values = generator.generate_inputs(grammar, formula)
+
+        self.assertEqual(values[0].validity, ValidityEnum.INDETERMINATE)
+        # Verdicts are kept for the optimised grammar but reported on the field of the requested one
+        self.assertNotEqual(optimize_specification(grammar, formula)[0], grammar)
+        report = budget.get_report()
+        self.assertEqual(report["field (valid)"]["satisfiability"], "UNSAT")
+        self.assertEqual(set(report.keys()), {"field (valid)", "total"})
+
+    def test_exhausted_budget_yields_indeterminate_values(self) -> None:
+        generator = InputGenerator(budget=GenerationBudget(total_seconds=0))
+
+        values = generator.generate_inputs(self.grammar, 'str.contains(<start>, "ab")')
+
+        self.assertEqual(values[0].validity, ValidityEnum.INDETERMINATE)
+        self.assertEqual(len(generator.solver_cache), 0)
+
+
+    def test_unsatisfiable_formula_is_not_solved(self) -> None:
+        budget = GenerationBudget()
+        formula = '((str.len(<start>) > 5) and (str.contains(<start>, "ab"))) and (str.len(<start>) < 3)'
+        budget.set_label(self.grammar, formula, "field")
+        generator = InputGenerator(budget=budget)
+
+        values = generator.generate_inputs(self.grammar, formula, amount=2)
+
+        self.assertTrue(all(v.validity == ValidityEnum.INDETERMINATE for v in values))
+        self.assertEqual(len(generator.solver_cache), 0)
+        self.assertEqual(
+            budget.get_report()["field (valid)"]["satisfiability"], "UNSAT"
+        )
+
+class TestSolverCache(unittest.TestCase):
+    grammar = """
+    <start> ::= <string>
+    <string> ::= <letter> | <letter><string>
+    <letter> ::= "a" | "b" | "c" | "d"
+    """
+
+    def test_repeated_generation_reuses_solver(self) -> None:
+        generator = InputGenerator()
+        formula = 'str.contains(<start>, "ab")'
+
+        for _ in range(3):
+            generator.generate_inputs(self.grammar, formula)
+
+        self.assertEqual(generator.solver_cache.misses, 1)
+        self.assertEqual(generator.solver_cache.hits, 2)
+
+    def test_negated_formula_has_own_entry(self) -> None:
+        generator = InputGenerator()
+        grammar = """
+        <start> ::= <string>
+        <string> ::= "" | "a" <string> | "b" <string>
+        """
+        formula = 'str.contains(<start>, "ab")'
+
+        generator.generate_inputs(grammar, formula)
+        generator.generate_inputs(
+            grammar, formula, ValidityEnum.INVALID, timeout_seconds=5
+        )
+
+        self.assertEqual(generator.solver_cache.misses, 2)
+        self.assertEqual(len(generator.solver_cache), 2)
+
+    def test_formatting_does_not_change_key(self) -> None:
+        cache = SolverCache()
+        cache.get_solver(self.grammar, "str.len(<start>)  >  2")
+        cache.get_solver(self.grammar.replace("    ", ""), "str.len(<start>) > 2")
+
+        self.assertEqual(cache.hits, 1)
+
+    def test_least_recently_used_solver_is_evicted(self) -> None:
+        cache = SolverCache(max_size=2)
+        cache.get_solver(self.grammar, "str.len(<start>) > 1")
+        cache.get_solver(self.grammar, "str.len(<start>) > 2")
+        cache.get_solver(self.grammar, "str.len(<start>) > 1")
+        cache.get_solver(self.grammar, "str.len(<start>) > 3")
+
+        self.assertEqual(cache.evictions, 1)
+        cache.get_solver(self.grammar, "str.len(<start>) > 1")
+        self.assertEqual(cache.hits, 2)
+
+
+class TestParallelInputGeneration(unittest.TestCase):
+    grammar = """
+    <start> ::= <string>
+    <string> ::= <letter> | <letter><string>
+    <letter> ::= "a" | "b" | "c" | "d"
+    """
+
+    def setUp(self) -> None:
+        self.generator = InputGenerator(workers=2)
+
+    def tearDown(self) -> None:
+        self.generator.shutdown()
+
+    def test_results_keep_request_order(self) -> None:
+        results = self.generator.generate_inputs_in_parallel(
+            [
+                GenerationRequest(self.grammar, "str.len(<start>) > 3"),
+                GenerationRequest(self.grammar, "str.len(<start>) < 3", amount=2),
+            ]
+        )
+
+        self.assertEqual(len(results), 2)
+        self.assertTrue(len(results[0][0].value) > 3)
+        self.assertEqual(len(results[1]), 2)
+        self.assertTrue(all(len(v.value) < 3 for v in results[1]))
+
+    def test_worker_verdicts_reach_the_parent(self) -> None:
+        grammar = '<start> ::= "1" | "2"'
+        formula = "str.to.int(<start>) > 5"
+        results = self.generator.generate_inputs_in_parallel(
+            [
+                GenerationRequest(grammar, formula),
+                GenerationRequest(self.grammar, "str.len(<start>) > 3"),
+            ]
+        )
+
+        self.assertEqual(results[0][0].validity, ValidityEnum.INDETERMINATE)
+        self.assertEqual(
+            self.generator.get_verdict(grammar, formula, ValidityEnum.VALID),
+            Satisfiability.UNSAT,
+        )
+        self.assertEqual(
+            self.generator.get_verdict(grammar, formula, ValidityEnum.INVALID),
+            Satisfiability.SAT,
+        )
+
+    def test_serial_fallback(self) -> None:
+        generator = InputGenerator(workers=1)
+        results = generator.generate_inputs_in_parallel(
+            [
+                GenerationRequest(self.grammar, 'str.contains(<start>, "ab")'),
+                GenerationRequest(self.grammar, 'str.contains(<start>, "ab")'),
+            ]
+        )
+
+        self.assertEqual(generator.solver_cache.hits, 1)
+        self.assertTrue(all(r[0].validity == ValidityEnum.VALID for r in results))
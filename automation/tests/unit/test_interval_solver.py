@@ -0,0 +1,65 @@
+import unittest
+
+from src.generation.grammar_fuzzer import GrammarFuzzer
+from src.generation.interval_solver import IntervalSolver, split_conjunction
+from src.utility.helpers import load_file_content
+
+
+class TestIntervalSolver(unittest.TestCase):
+    number_grammar = load_file_content("pre-built-specifications/number/whole.bnf")
+    text_grammar = load_file_content("pre-built-specifications/text/one-line-text.bnf")
+
+    def test_detects_fragment(self) -> None:
+        solver = IntervalSolver.from_formula(
+            "((str.to.int(<start>) >= 10) and (str.to.int(<start>) <= 100)) and (str.to.int(<start>) mod 5 = 0)"
+        )
+
+        self.assertEqual(solver.bounds, (10, 100))
+        self.assertEqual(solver.step, 5)
+
+    def test_rejects_other_formulas(self) -> None:
+        self.assertIsNone(
+            IntervalSolver.from_formula("str.len(<start>) > 0 or str.len(<start>) < 5")
+        )
+        self.assertIsNone(IntervalSolver.from_formula("not (str.len(<start>) > 0)"))
+        self.assertIsNone(IntervalSolver.from_formula("str.to.int(<year>) >= 2000"))
+        self.assertIsNone(
+            IntervalSolver.from_formula(
+                "str.len(<start>) > 0 and str.to.int(<start>) < 5"
+            )
+        )
+
+    def test_number_values(self) -> None:
+        fuzzer = GrammarFuzzer(self.number_grammar)
+        solver = IntervalSolver.from_formula(
+            "(str.to.int(<start>) > 3) and (str.to.int(<start>) <= 30) and (str.to.int(<start>) mod 3 = 0)"
+        )
+
+        for _ in range(20):
+            valid = int(solver.sample_valid(fuzzer))
+            self.assertTrue(3 < valid <= 30 and valid % 3 == 0)
+
+            invalid = int(solver.sample_invalid(fuzzer))
+            self.assertFalse(3 < invalid <= 30 and invalid % 3 == 0)
+
+    def test_length_values(self) -> None:
+        fuzzer = GrammarFuzzer(self.text_grammar)
+        solver = IntervalSolver.from_formula(
+            "(str.len(<start>) >= 2) and (str.len(<start>) <= 4)"
+        )
+
+        for _ in range(20):
+            self.assertTrue(2 <= len(solver.sample_valid(fuzzer)) <= 4)
+            self.assertFalse(2 <= len(solver.sample_invalid(fuzzer)) <= 4)
+
+    def test_unsatisfiable_bounds(self) -> None:
+        solver = IntervalSolver.from_formula(
+            "str.to.int(<start>) >= 10 and str.to.int(<start>) <= 5"
+        )
+
+        self.assertFalse(solver.is_satisfiable())
+        self.assertIsNone(solver.sample_valid(GrammarFuzzer(self.number_grammar)))
+
+    def test_split_conjunction(self) -> None:
+        self.assertEqual(split_conjunction("((a) and (b)) and (c)"), ["a", "b", "c"])
+        self.assertIsNone(split_conjunction("(a) and ((b) or (c))"))
@@ -0,0 +1,42 @@
+import unittest
+
+from src.generation.grammar_fuzzer import GrammarFuzzer
+from src.generation.invalid_construction import InvalidValueConstructor
+
+
+class TestInvalidValueConstructor(unittest.TestCase):
+    def test_values_are_not_in_grammar(self) -> None:
+        grammar = """
+        <start> ::= <string>
+        <string> ::= <letter> | <letter><string>
+        <letter> ::= "a" | "b" | "c" | "d"
+        """
+        fuzzer = GrammarFuzzer(grammar)
+        constructor = InvalidValueConstructor(fuzzer, {"a", "b", "c", "d"})
+
+        self.assertTrue(constructor.can_guarantee_invalidity)
+        for _ in range(50):
+            self.assertFalse(fuzzer.contains(constructor.construct()))
+
+    def test_length_bounds_without_forbidden_characters(self) -> None:
+        grammar = """
+        <start> ::= <digit><digit>
+        <digit> ::= "0" | "1"
+        """
+        fuzzer = GrammarFuzzer(grammar)
+        alphabet = {chr(c) for c in range(128)}
+        constructor = InvalidValueConstructor(fuzzer, alphabet)
+
+        for _ in range(50):
+            self.assertNotEqual(len(constructor.construct()), 2)
+
+    def test_no_guarantee_for_unbounded_grammar_over_all_characters(self) -> None:
+        grammar = """
+        <start> ::= "" | "a" <start>
+        """
+        constructor = InvalidValueConstructor(
+            GrammarFuzzer(grammar), {chr(c) for c in range(128)}
+        )
+
+        self.assertFalse(constructor.can_guarantee_invalidity)
+        self.assertIsNone(constructor.construct())
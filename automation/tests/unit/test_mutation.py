@@ -0,0 +1,80 @@
+import string
+import unittest
+
+from src.generation.grammar_fuzzer import GrammarFuzzer
+from src.generation.mutation import BatchValueMutator, StructuralMutator
+
+
+class TestBatchValueMutator(unittest.TestCase):
+    def test_foreign_characters_come_first(self) -> None:
+        mutator = BatchValueMutator({"a", "b"}, batch_size=256)
+
+        mutants = mutator.mutate_batch("abba")
+
+        self.assertEqual(len(mutants), len(set(mutants)))
+        self.assertTrue(any(c not in "ab" for c in mutants[0]))
+
+    def test_configured_operators(self) -> None:
+        mutator = BatchValueMutator(
+            set(string.printable), mutations=1, batch_size=64, operators=["delete"]
+        )
+
+        mutants = mutator.mutate_batch("abc")
+
+        self.assertEqual(sorted(mutants), ["ab", "ac", "bc"])
+
+    def test_finds_value_outside_of_grammar(self) -> None:
+        fuzzer = GrammarFuzzer("""
+            <start> ::= <number>
+            <number> ::= <digit> | <digit><number>
+            <digit> ::= "0" | "1" | "2" | "3" | "4" | "5" | "6" | "7" | "8" | "9"
+            """)
+        mutator = BatchValueMutator(set(string.printable))
+
+        value = mutator.find_invalid("123", fuzzer.contains)
+
+        self.assertFalse(fuzzer.contains(value))
+
+    def test_foreign_characters_are_not_checked(self) -> None:
+        mutator = BatchValueMutator({"a", "b"}, batch_size=256)
+        checked = []
+
+        value = mutator.find_invalid("abba", lambda v: checked.append(v) or True)
+
+        self.assertTrue(any(c not in "ab" for c in value))
+        self.assertEqual(checked, [])
+
+
+class TestStructuralMutator(unittest.TestCase):
+    grammar = """
+    <start> ::= <date>
+    <date> ::= <year> "-" <month>
+    <year> ::= <digit><digit><digit><digit>
+    <month> ::= <digit><digit>
+    <digit> ::= "0" | "1" | "2" | "3" | "4" | "5" | "6" | "7" | "8" | "9"
+    """
+
+    def test_mutants_break_grammar_rules(self) -> None:
+        fuzzer = GrammarFuzzer(self.grammar)
+        mutator = StructuralMutator(fuzzer, set(string.digits + "-"))
+        tree = fuzzer.parse("2024-05")
+
+        value = mutator.find_invalid(tree, fuzzer.contains)
+
+        self.assertIsNotNone(value)
+        self.assertFalse(fuzzer.contains(value))
+
+    def test_repetitions_are_duplicated_and_dropped(self) -> None:
+        fuzzer = GrammarFuzzer(
+            """
+            <start> ::= <string>
+            <string> ::= <letter> | <letter><string>
+            <letter> ::= "a"
+            """
+        )
+        mutator = StructuralMutator(fuzzer, set(string.printable))
+        tree = fuzzer.parse("aaa")
+
+        mutants = {mutator.mutate(tree) for _ in range(100)}
+
+        self.assertTrue({"aa", "aaaa"} <= mutants)
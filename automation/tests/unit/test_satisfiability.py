@@ -0,0 +1,48 @@
+import unittest
+
+from src.generation.satisfiability import Satisfiability, SatisfiabilityChecker
+from src.utility.helpers import load_file_content
+
+
+class TestSatisfiabilityChecker(unittest.TestCase):
+    grammar = load_file_content("pre-built-specifications/text/one-line-text.bnf")
+
+    def setUp(self) -> None:
+        self.checker = SatisfiabilityChecker()
+
+    def test_contradicting_bounds(self) -> None:
+        formula = '((str.len(<start>) >= 5) and (str.contains(<start>, "a") or str.contains(<start>, "b"))) and (str.len(<start>) <= 3)'
+
+        self.assertEqual(
+            self.checker.get_verdict(self.grammar, formula, "VALID"),
+            Satisfiability.UNSAT,
+        )
+        self.assertEqual(
+            self.checker.get_verdict(self.grammar, formula, "INVALID"),
+            Satisfiability.UNKNOWN,
+        )
+
+    def test_negation_of_tautology(self) -> None:
+        formula = "str.len(<start>) >= 0"
+
+        self.assertEqual(
+            self.checker.get_verdict(self.grammar, formula, "INVALID"),
+            Satisfiability.UNSAT,
+        )
+        self.assertEqual(
+            self.checker.get_verdict(self.grammar, formula, "VALID"),
+            Satisfiability.UNKNOWN,
+        )
+
+    def test_learned_verdict_replaces_analysis(self) -> None:
+        formula = 'str.contains(<start>, "a")'
+        self.assertEqual(
+            self.checker.get_verdict(self.grammar, formula, "VALID"),
+            Satisfiability.UNKNOWN,
+        )
+
+        self.checker.record(self.grammar, formula, "VALID", Satisfiability.SAT)
+        self.assertEqual(
+            self.checker.get_verdict(self.grammar, formula, "VALID"),
+            Satisfiability.SAT,
+        )
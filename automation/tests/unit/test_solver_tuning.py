@@ -0,0 +1,75 @@
+import json
+import os
+import tempfile
+import unittest
+
+from src.generation.solver_cache import SolverCache
+from src.generation.solver_tuning import SolverTuner
+from src.utility.helpers import get_specification_hash
+
+
+class TestSolverTuner(unittest.TestCase):
+    grammar = """
+    <start> ::= <string>
+    <string> ::= <letter> | <letter><string>
+    <letter> ::= "a" | "b"
+    """
+    formula = 'str.contains(<start>, "ab")'
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.store_path = os.path.join(self.directory.name, "parameters.json")
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def test_working_configuration_is_stored(self) -> None:
+        tuner = SolverTuner(
+            self.store_path,
+            samples=1,
+            parameter_grid=[
+                {"unknown_option": 1},
+                {"max_number_free_instantiations": 5},
+            ],
+        )
+
+        parameters = tuner.get_parameters(self.grammar, self.formula)
+
+        self.assertEqual(parameters, {"max_number_free_instantiations": 5})
+        with open(self.store_path) as file:
+            stored = json.load(file)
+        self.assertEqual(
+            stored[get_specification_hash(self.grammar, self.formula)], parameters
+        )
+
+    def test_benchmark_is_bounded_by_the_request_timeout(self) -> None:
+        tuner = SolverTuner(
+            self.store_path,
+            samples=1,
+            parameter_grid=[{"max_number_free_instantiations": 5}],
+        )
+
+        # Without time for a single configuration the defaults are used and nothing is stored
+        self.assertEqual(tuner.get_parameters(self.grammar, self.formula, 0), {})
+        self.assertFalse(os.path.exists(self.store_path))
+
+    def test_stored_configuration_is_reused(self) -> None:
+        key = get_specification_hash(self.grammar, self.formula)
+        with open(self.store_path, "w") as file:
+            json.dump({key: {"max_number_smt_instantiations": 2}}, file)
+        tuner = SolverTuner(self.store_path, parameter_grid=[])
+
+        self.assertEqual(
+            tuner.get_parameters(self.grammar, self.formula),
+            {"max_number_smt_instantiations": 2},
+        )
+
+    def test_solver_cache_uses_tuned_configuration(self) -> None:
+        key = get_specification_hash(self.grammar, self.formula)
+        with open(self.store_path, "w") as file:
+            json.dump({key: {"max_number_smt_instantiations": 2}}, file)
+        cache = SolverCache(tuner=SolverTuner(self.store_path))
+
+        solver = cache.get_solver(self.grammar, self.formula, 10)
+
+        self.assertEqual(solver.max_number_smt_instantiations, 2)
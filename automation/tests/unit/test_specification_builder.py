@@ -4,7 +4,10 @@ from src.analysis.constraint_extraction import (
     ConstraintCandidateResult,
     ConstraintCandidateType,
     ConstraintOtherValueType,
+    ISLa,
     SpecificationBuilder,
+    combine_formulas,
+    parse_formula,
 )
 from src.analysis.html_analysis import (
     HTMLInputSpecification,
@@ -237,3 +240,63 @@ class TestSpecificationBuilder(unittest.TestCase):
             "and (str.to.int(<year>) >= 2000 or (str.to.int(<year>) = 2000 and str.to.int(<month>) >= 1 or (str.to.int(<month>) = 1 and str.to.int(<day>) >= 1)))) and (str.to.int(<year>) <= 2010 or (str.to.int(<year>) = 2010 and str.to.int(<month>) <= 12 or (str.to.int(<month>) = 12 and str.to.int(<day>) <= 24))",
             formula,
         )
+
+    def test_repeated_candidates_are_not_added_again(self) -> None:
+        candidates = ConstraintCandidateResult(
+            {
+                "candidates": [
+                    {
+                        "type": ConstraintCandidateType.LITERAL_LENGTH_COMPARISON.value,
+                        "operator": ">=",
+                        "otherValue": "3",
+                    }
+                ]
+            }
+        )
+        _, formula = self.builder.add_constraints_to_current_specification(
+            self.input_spec.reference, "number", candidates
+        )
+        _, repeated_formula = self.builder.add_constraints_to_current_specification(
+            self.input_spec.reference, "number", candidates
+        )
+
+        self.assertEqual(formula, repeated_formula)
+        self.assertEqual(formula.count("str.len(<number>) >= 3"), 1)
+
+
+class TestFormula(unittest.TestCase):
+    def test_bounds_are_merged(self) -> None:
+        formula = parse_formula("str.len(<start>) >= 3")
+        formula = combine_formulas(
+            formula, parse_formula("str.len(<start>) >= 5"), ISLa.AND
+        )
+        formula = combine_formulas(
+            formula, parse_formula("str.len(<start>) <= 10"), ISLa.AND
+        )
+        formula = combine_formulas(
+            formula, parse_formula("11 > str.len(<start>)"), ISLa.AND
+        )
+
+        self.assertEqual(
+            str(formula), "(str.len(<start>) >= 5) and (str.len(<start>) <= 10)"
+        )
+
+        formula = combine_formulas(
+            parse_formula("str.to.int(<start>) > 3"),
+            parse_formula("str.to.int(<start>) >= 0"),
+            ISLa.OR,
+        )
+        self.assertEqual(str(formula), "str.to.int(<start>) >= 0")
+
+    def test_constants_are_folded(self) -> None:
+        formula = parse_formula("str.len(<start>) > 0")
+
+        self.assertEqual(
+            combine_formulas(formula, parse_formula("2 > 1"), ISLa.AND), formula
+        )
+        self.assertEqual(
+            str(combine_formulas(formula, parse_formula("1 = 2"), ISLa.AND)), "false"
+        )
+        self.assertEqual(
+            str(combine_formulas(formula, parse_formula("2 >= 1"), ISLa.OR)), "true"
+        )
@@ -0,0 +1,121 @@
+import json
+import os
+import tempfile
+import unittest
+
+from src.interaction.form_testing import SpecificationParser
+from src.interaction.specification_bundle import (
+    SpecificationBundle,
+    compile_specification,
+    get_bundle_path,
+    load_specification_bundle,
+)
+
+
+class TestSpecificationBundle(unittest.TestCase):
+    grammar = '<start> ::= <number>\n<number> ::= <digit> | <digit><number>\n<digit> ::= "0" | "1"\n'
+    formula = "str.to.int(<number>) > 0"
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.specification_file = os.path.join(
+            self.directory.name, "specification.json"
+        )
+        self.__write(
+            "specification.json",
+            json.dumps(
+                {
+                    "url": "http://localhost",
+                    "controls": [
+                        {
+                            "reference": {"access_method": "id", "access_value": "a"},
+                            "name": "a",
+                            "type": "number",
+                            "grammar": "1.bnf",
+                            "formula": "1.isla",
+                        }
+                    ],
+                    "submit": {"access_method": "id", "access_value": "submit"},
+                }
+            ),
+        )
+        self.__write("1.bnf", self.grammar)
+        self.__write("1.isla", self.formula)
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def __write(self, file_name: str, content: str) -> None:
+        with open(os.path.join(self.directory.name, file_name), "w") as file:
+            file.write(content)
+
+    def test_bundle_holds_the_whole_specification(self) -> None:
+        compile_specification(self.specification_file)
+        bundle = SpecificationBundle.from_file(get_bundle_path(self.specification_file))
+
+        self.assertTrue(bundle.is_up_to_date())
+        self.assertEqual(bundle.specification["controls"][0]["name"], "a")
+        self.assertEqual(bundle.get_grammar("1.bnf"), self.grammar)
+        self.assertEqual(bundle.get_formula("1.isla"), self.formula)
+        self.assertEqual(
+            bundle.parsed_grammars[self.grammar].get_expansions("<number>"),
+            ["<digit>", "<digit> <number>"],
+        )
+
+        # The bundle can be passed instead of the specification file
+        parser = SpecificationParser(bundle.path)
+        specification, directory = parser.parse()
+        self.assertEqual(specification, bundle.specification)
+        self.assertEqual(directory, self.directory.name)
+
+    def test_changed_source_invalidates_the_bundle(self) -> None:
+        bundle = load_specification_bundle(self.specification_file)
+        self.assertEqual(bundle.get_formula("1.isla"), self.formula)
+
+        self.__write("1.isla", "str.to.int(<number>) > 1")
+        self.assertFalse(SpecificationBundle.from_file(bundle.path).is_up_to_date())
+        self.assertEqual(
+            load_specification_bundle(self.specification_file).get_formula("1.isla"),
+            "str.to.int(<number>) > 1",
+        )
+        self.assertTrue(SpecificationBundle.from_file(bundle.path).is_up_to_date())
+
+    def test_broken_control_does_not_block_the_others(self) -> None:
+        with open(self.specification_file) as file:
+            specification = json.load(file)
+        control = specification["controls"][0]
+        specification["controls"] = [
+            control,
+            control | {"name": "b", "grammar": "2.bnf", "formula": "2.isla"},
+            control | {"name": "c", "grammar": "3.bnf", "formula": "3.isla"},
+        ]
+        self.__write("specification.json", json.dumps(specification))
+        # Undefined nonterminals like in the pre-built month grammar are only reported
+        self.__write("2.bnf", '<start> ::= <month-or-empty>\n<month> ::= "1"')
+        self.__write("2.isla", "str.to.int(<month>) > 0")
+
+        bundle = compile_specification(self.specification_file)
+        self.assertEqual(
+            [control["name"] for control in bundle.specification["controls"]],
+            ["a", "b"],
+        )
+        self.assertEqual(bundle.get_formula("2.isla"), "str.to.int(<month>) > 0")
+        self.assertTrue(bundle.is_up_to_date())
+
+        # The left out control is compiled as soon as its files exist
+        self.__write("3.bnf", self.grammar)
+        self.__write("3.isla", "")
+        self.assertFalse(bundle.is_up_to_date())
+        self.assertEqual(
+            len(
+                load_specification_bundle(self.specification_file).specification[
+                    "controls"
+                ]
+            ),
+            3,
+        )
+
+    def test_unreadable_specification_is_not_compiled(self) -> None:
+        self.__write("specification.json", "{")
+        self.assertIsNone(compile_specification(self.specification_file))
+        self.assertFalse(os.path.exists(get_bundle_path(self.specification_file)))
@@ -0,0 +1,77 @@
+import json
+import os
+import tempfile
+import unittest
+
+from src.analysis.html_analysis import HTMLElementReference
+from src.analysis.specification_model import FormSpecification
+
+
+class TestFormSpecification(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.specification = FormSpecification(
+            "http://localhost",
+            {"access_method": "id", "access_value": "submit"},
+            self.directory.name,
+        )
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def test_flush_skips_unchanged_files(self) -> None:
+        self.specification.set_file("1.bnf", '<start> ::= "a"')
+        self.specification.set_file("1.isla", "")
+
+        self.assertEqual(
+            sorted(self.specification.flush()),
+            ["1.bnf", "1.isla", "specification.json"],
+        )
+        self.assertEqual(self.specification.flush(), [])
+
+        self.specification.set_file("1.isla", "str.len(<start>) > 0")
+        self.assertEqual(self.specification.flush(), ["1.isla"])
+        with open(os.path.join(self.directory.name, "1.isla")) as file:
+            self.assertEqual(file.read(), "str.len(<start>) > 0")
+
+        # A new model for the same directory does not rewrite identical files
+        specification = FormSpecification(
+            "http://localhost",
+            {"access_method": "id", "access_value": "submit"},
+            self.directory.name,
+        )
+        specification.set_file("1.bnf", '<start> ::= "a"')
+        self.assertEqual(specification.flush(), [])
+
+    def test_compared_controls_are_combined(self) -> None:
+        first = HTMLElementReference("id", "first")
+        second = HTMLElementReference("id", "second")
+        other = HTMLElementReference("id", "other")
+        for index, reference in enumerate([first, second, other], 1):
+            self.specification.add_control(
+                {
+                    "reference": reference.get_as_dict(),
+                    "grammar": f"{index}.bnf",
+                    "formula": f"{index}.isla",
+                }
+            )
+
+        self.assertTrue(self.specification.combine_controls(first, second, 2))
+        self.specification.flush()
+
+        with open(os.path.join(self.directory.name, "specification.json")) as file:
+            controls = json.load(file)["controls"]
+        self.assertEqual(controls[0]["reference"], other.get_as_dict())
+        self.assertEqual(
+            controls[1],
+            {
+                "combined": True,
+                "fields": [
+                    {"reference": first.get_as_dict()},
+                    {"reference": second.get_as_dict()},
+                ],
+                "grammar": "2.bnf",
+                "formula": "2.isla",
+            },
+        )
+        self.assertFalse(self.specification.combine_controls(first, other, 3))
@@ -0,0 +1,73 @@
+import os
+import tempfile
+import unittest
+
+from src.analysis.constraint_extraction import SpecificationBuilder
+from src.analysis.html_analysis import (
+    HTMLConstraints,
+    HTMLElementReference,
+    HTMLInputSpecification,
+)
+from src.utility.helpers import load_file_content, pre_built_specifications_path
+from src.utility.specification_registry import SpecificationRegistry
+
+
+class TestSpecificationRegistry(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def __write(self, path: str, content: str) -> None:
+        path = os.path.join(self.directory.name, path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as file:
+            file.write(content)
+
+    def test_pre_built_specifications_are_loaded_once(self) -> None:
+        registry = SpecificationRegistry()
+
+        self.assertEqual(
+            registry.get_grammar("date/date"),
+            load_file_content(f"{pre_built_specifications_path}/date/date.bnf"),
+        )
+        self.assertEqual(
+            registry.get_formula("date/date"),
+            load_file_content(f"{pre_built_specifications_path}/date/date.isla"),
+        )
+        self.assertIsNone(registry.get_formula("binary/binary-required"))
+        self.assertTrue(registry.get("radio-group/radio-group").is_template)
+        self.assertIn("<start>", registry.get("date/date").parsed_grammar)
+        with self.assertRaises(TypeError):
+            registry.get("date/date").parsed_grammar["<start>"] = ("<day>",)
+
+    def test_undefined_nonterminals_are_reported(self) -> None:
+        self.__write("text/broken.bnf", "<start> ::= <missing>\n")
+        self.__write("text/broken.isla", "str.len(<other>) > 0\n")
+        registry = SpecificationRegistry(self.directory.name)
+
+        self.assertEqual(
+            registry.problems,
+            [
+                "text/broken: <missing> is not defined",
+                "text/broken: <other> is not defined",
+            ],
+        )
+
+    def test_override_directory_replaces_pre_built_specification(self) -> None:
+        grammar = '<start> ::= <email>\n<email> ::= "a@b.c"\n'
+        self.__write("email/email.bnf", grammar)
+        registry = SpecificationRegistry(override_directory=self.directory.name)
+        builder = SpecificationBuilder(registry)
+
+        specification = HTMLInputSpecification(
+            HTMLElementReference("id", "input"), HTMLConstraints(type="email")
+        )
+        self.assertEqual(
+            builder.create_specification_for_html_input(specification, 0)[0], grammar
+        )
+        self.assertEqual(
+            registry.get_grammar("date/date"),
+            load_file_content(f"{pre_built_specifications_path}/date/date.bnf"),
+        )